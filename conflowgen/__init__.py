@@ -56,6 +56,9 @@ from conflowgen.reporting.output_style import DisplayAsMarkupLanguage, DisplayAs
 
 # List of enums
 from conflowgen.application.data_types.export_file_format import ExportFileFormat
+from conflowgen.application.data_types.export_engine import ExportEngine
+from conflowgen.application.data_types.transaction_scope import TransactionScope
+from conflowgen.application.data_types.generation_engine import GenerationEngine
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
@@ -2,6 +2,8 @@ import datetime
 import logging
 from typing import Union, Dict, Optional
 
+from conflowgen.application.data_types.generation_engine import GenerationEngine
+from conflowgen.application.data_types.transaction_scope import TransactionScope
 from conflowgen.application.repositories.container_flow_generation_properties_repository import \
     ContainerFlowGenerationPropertiesRepository
 from conflowgen.flow_generator.container_flow_generation_service import \
@@ -32,7 +34,8 @@ class ContainerFlowGenerationManager:
             maximum_dwell_time_of_export_containers_in_hours: Optional[int] = None,
             minimum_dwell_time_of_transshipment_containers_in_hours: Optional[int] = None,
             maximum_dwell_time_of_transshipment_containers_in_hours: Optional[int] = None,
-            transportation_buffer: Optional[float] = None
+            transportation_buffer: Optional[float] = None,
+            random_seed: Optional[int] = None
     ) -> None:
         """
         Args:
@@ -55,6 +58,8 @@ class ContainerFlowGenerationManager:
                 after the previous vehicle which has dropped off the transshipment container has arrived.
             transportation_buffer: Determines how many percent more of the inbound journey capacity is used at most to
                 transport containers on the outbound journey.
+            random_seed: If set, each generation with the same input data results in the same container flow.
+                Otherwise, a new seed is drawn for each generation and reported in the log.
         """
         properties = self.container_flow_generation_properties_repository.get_container_flow_generation_properties()
 
@@ -91,6 +96,9 @@ class ContainerFlowGenerationManager:
         if transportation_buffer is not None:
             properties.transportation_buffer = transportation_buffer
 
+        if random_seed is not None:
+            properties.random_seed = random_seed
+
         self.container_flow_generation_properties_repository.set_container_flow_generation_properties(
             properties
         )
@@ -117,7 +125,8 @@ class ContainerFlowGenerationManager:
             'maximum_dwell_time_of_export_containers_in_hours':
                 properties.maximum_dwell_time_of_export_containers_in_hours,
             'maximum_dwell_time_of_transshipment_containers_in_hours':
-                properties.maximum_dwell_time_of_transshipment_containers_in_hours
+                properties.maximum_dwell_time_of_transshipment_containers_in_hours,
+            'random_seed': properties.random_seed
         }
 
     def container_flow_data_exists(self) -> bool:
@@ -131,7 +140,16 @@ class ContainerFlowGenerationManager:
         """
         return self.container_flow_generation_service.container_flow_data_exists()
 
-    def generate(self, overwrite: bool = True) -> None:
+    def generate(
+            self,
+            overwrite: bool = True,
+            transaction_scope: TransactionScope = TransactionScope.run,
+            phases_per_transaction: int = 1,
+            number_of_processes: int = 1,
+            engine: Union[GenerationEngine, str] = GenerationEngine.peewee,
+            vacuum: bool = False,
+            defer_index_creation: bool = False
+    ) -> None:
         """
         Generate the synthetic container flow according to all the information stored in the database so far.
         This triggers a multistep procedure of generating vehicles and the containers which are delivered or picked up
@@ -142,8 +160,37 @@ class ContainerFlowGenerationManager:
         Consider checking for
         :meth:`.ContainerFlowGenerationManager.container_flow_data_exists`
         and skip invoking this method.
+
+        Args:
+            overwrite: Whether to overwrite an already existent container flow
+            transaction_scope: Which phases of the generation are committed to the database together.
+                By default, the whole generation is committed at once so that the previously generated container flow
+                is kept if the generation fails.
+            phases_per_transaction: The number of phases which are committed together if the transaction scope is
+                :attr:`.TransactionScope.phase`
+            number_of_processes: The number of processes which create the vehicles of the schedules and the
+                containers they deliver in parallel.
+                All data is still written by the invoking process.
+            engine: Whether the intermediate results of the generation are kept in the database or in memory, see
+                :class:`.GenerationEngine`.
+                The columnar engine writes the container flow within one transaction independent of the transaction
+                scope.
+            vacuum: Whether to shrink the database file after the generation.
+                When scenarios are generated repeatedly, the space of the removed container flows is otherwise only
+                reused but never returned to the file system.
+            defer_index_creation: Whether to drop the secondary indexes of the containers while the container flow
+                is generated and to create them once it is finished.
+                This speeds up inserting and updating the containers while the analyses still benefit from the
+                indexes afterwards.
         """
         if not overwrite and self.container_flow_data_exists():
             self.logger.debug("Data already exists and it was not asked to overwrite existent data, skip this.")
             return
-        self.container_flow_generation_service.generate()
+        self.container_flow_generation_service.generate(
+            transaction_scope=transaction_scope,
+            phases_per_transaction=phases_per_transaction,
+            number_of_processes=number_of_processes,
+            engine=GenerationEngine(engine),
+            vacuum=vacuum,
+            defer_index_creation=defer_index_creation
+        )
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Union
 
 from conflowgen.application.services.export_container_flow_service import \
     ExportContainerFlowService
+from conflowgen.application.data_types.export_engine import ExportEngine
 from conflowgen.application.data_types.export_file_format import ExportFileFormat
 
 
@@ -22,7 +23,8 @@ class ExportContainerFlowManager:
             folder_name: str,
             path_to_export_folder: Optional[str] = None,
             file_format: Optional[ExportFileFormat] = None,
-            overwrite: bool = False
+            overwrite: bool = False,
+            engine: Union[ExportEngine, str] = ExportEngine.joined
     ) -> str:
         """
         This extracts the container movement data from the SQL database to a folder of choice in a tabular data format.
@@ -33,6 +35,10 @@ class ExportContainerFlowManager:
                 defaults to ``<project root>/data/exports/``
             file_format: Desired tabular format, defaults to :class:`ExportFileFormat.csv`.
             overwrite: Whether to overwrite previously exported data, defaults to False
+            engine: Whether each table is read with a single joined query or row by row, see
+                :class:`ExportEngine`. Both engines export the same tables, defaults to
+                :class:`ExportEngine.joined`. The file formats :class:`ExportFileFormat.parquet` and
+                :class:`ExportFileFormat.feather` are always read batch by batch with joined queries.
 
         Returns:
             The path to the folder where the tabular data is located
@@ -43,6 +49,7 @@ class ExportContainerFlowManager:
             folder_name=folder_name,
             path_to_export_folder=path_to_export_folder,
             file_format=file_format,
-            overwrite=overwrite
+            overwrite=overwrite,
+            engine=ExportEngine(engine)
         )
         return path_to_target_folder
@@ -0,0 +1,23 @@
+import enum
+
+import enum_tools
+
+
+@enum_tools.documentation.document_enum
+class ExportEngine(enum.Enum):
+    """
+    The export engine determines how the tables of the container flow are read from the database.
+    Both engines export the same tables.
+    """
+
+    peewee = "peewee"
+    """
+    Each row is read as a model instance and each foreign key is resolved with a separate query.
+    This becomes slow for larger container flows.
+    """
+
+    joined = "joined"
+    """
+    Each table is read with a single query which joins the rows the foreign keys point to.
+    The values are converted column by column.
+    """
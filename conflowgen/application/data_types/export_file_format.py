@@ -36,3 +36,19 @@ class ExportFileFormat(enum.Enum):
     which is less than what large terminals nowadays handle within a month. Even with a hypothetical TEU factor of 2,
     this only reaches 1,572,864 TEU throughput per year.
     """
+
+    parquet = "parquet"
+    """
+    The Apache Parquet file format stores the tables column by column with their types, e.g., the enums as
+    dictionary-encoded categories, the points in time as timestamps, and the integers together with missing values.
+    The files are compressed and can be read in quickly by e.g. pandas, Apache Spark, or DuckDB.
+    Exporting to this file format requires the optional dependency pyarrow.
+    """
+
+    feather = "feather"
+    """
+    The Feather file format (version 2) is the Apache Arrow IPC file format which keeps the same column types as the
+    parquet file format.
+    It is meant for quickly exchanging data between tools, e.g. between Python and R, rather than for archiving.
+    Exporting to this file format requires the optional dependency pyarrow.
+    """
@@ -0,0 +1,23 @@
+import enum
+
+import enum_tools
+
+
+@enum_tools.documentation.document_enum
+class GenerationEngine(enum.Enum):
+    """
+    The generation engine determines how the intermediate results of the container flow generation are kept.
+    Both engines generate the same container flow for the same random seed.
+    """
+
+    peewee = "peewee"
+    """
+    Each phase of the generation reads its input from the database and writes its results back to the database.
+    """
+
+    columnar = "columnar"
+    """
+    All containers, vehicles, and trucks are kept in memory as columns until the last phase is completed.
+    Only then, the container flow is written to the database with a few bulk inserts within one transaction.
+    This is faster but requires enough memory to hold the whole container flow.
+    """
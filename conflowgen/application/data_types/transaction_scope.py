@@ -0,0 +1,33 @@
+import enum
+
+import enum_tools
+
+
+@enum_tools.documentation.document_enum
+class TransactionScope(enum.Enum):
+    """
+    The transaction scope determines which steps of the container flow generation are committed to the database
+    together.
+    Fewer commits speed up the generation while larger transactions keep the database consistent if the generation
+    fails.
+    """
+
+    run = "run"
+    """
+    The whole generation is committed at once.
+    If the generation fails, all changes are rolled back and the previously generated container flow is kept.
+    """
+
+    phase = "phase"
+    """
+    Each phase of the generation, e.g. the creation of the fleet or the assignment of the onward transportation, is
+    committed on its own.
+    If the generation fails, only the failed phase is rolled back and the database contains a partial container flow.
+    """
+
+    none = "none"
+    """
+    No enclosing transaction is used, i.e. each write is committed on its own unless the step itself groups its
+    writes.
+    This is the slowest option and only recommended for debugging.
+    """
@@ -63,3 +63,7 @@ class ContainerFlowGenerationProperties(BaseModel):
     transportation_buffer = FloatField(
         default=DEFAULT_TRANSPORTATION_BUFFER,
     )
+    random_seed = IntegerField(
+        null=True,
+        help_text="If set, the same container flow is generated each time for the same input data"
+    )
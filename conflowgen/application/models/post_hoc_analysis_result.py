@@ -0,0 +1,35 @@
+from peewee import AutoField, CharField, TextField, BlobField
+
+from conflowgen.domain_models.base_model import BaseModel
+
+
+class PostHocAnalysisResult(BaseModel):
+    """
+    The result of a post-hoc analysis which has been computed for the container flow described by the fingerprint.
+    """
+    id = AutoField()
+
+    fingerprint = CharField(
+        null=False,
+        help_text="The fingerprint of the input data and the generated container flow the result belongs to"
+    )
+
+    analysis = CharField(
+        null=False,
+        help_text="The qualified name of the method of the analysis which has computed the result"
+    )
+
+    arguments = TextField(
+        null=False,
+        help_text="The arguments the method has been called with"
+    )
+
+    result = BlobField(
+        null=False,
+        help_text="The pickled result"
+    )
+
+    class Meta:
+        indexes = (
+            (("analysis", "arguments"), True),
+        )
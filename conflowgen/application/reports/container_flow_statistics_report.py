@@ -21,7 +21,11 @@ class ContainerFlowStatisticsReport:
         self.logger.info(f"Use transportation buffer of {transportation_buffer} for reporting statistics.")
 
     def generate(self):
+        self.large_scheduled_vehicle_repository.reset_cache()
         vehicles_of_types = self.large_scheduled_vehicle_repository.load_all_vehicles()
+        self.large_scheduled_vehicle_repository.load_free_capacities(
+            vehicle for vehicles in vehicles_of_types.values() for vehicle in vehicles
+        )
         self._generate_free_capacity_statistics(vehicles_of_types)
 
     def _generate_free_capacity_statistics(self, vehicles_of_types):
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import enum
+import hashlib
+import io
+import logging
+import pickle
+import sys
+from typing import Any, List, Optional, Tuple
+
+from peewee import fn
+
+from conflowgen.application.models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.application.models.post_hoc_analysis_result import PostHocAnalysisResult
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.base_model import database_proxy
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.distribution_models.container_length_distribution import ContainerLengthDistribution
+from conflowgen.domain_models.distribution_models.container_weight_distribution import ContainerWeightDistribution
+from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
+from conflowgen.domain_models.distribution_models.storage_requirement_distribution import StorageRequirementDistribution
+from conflowgen.domain_models.distribution_models.truck_arrival_distribution import TruckArrivalDistribution
+from conflowgen.domain_models.large_vehicle_schedule import Schedule, Destination
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
+from conflowgen.tools.database_state_cache import DatabaseStateCache
+
+
+class AnalysisResultUnpickler(pickle.Unpickler):
+    """
+    Only restores the types the post-hoc analyses return. A database might have been shared by someone else, so
+    unpickling any other type, e.g. a function which is called while the result is restored, is rejected.
+    """
+
+    allowed_globals = {
+        ("builtins", "set"),
+        ("builtins", "frozenset"),
+        ("datetime", "date"),
+        ("datetime", "datetime"),
+        ("datetime", "time"),
+        ("datetime", "timedelta"),
+        ("numpy", "dtype"),
+        ("numpy.core.multiarray", "scalar"),
+        ("numpy._core.multiarray", "scalar"),
+    }
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) in self.allowed_globals:
+            return super().find_class(module, name)
+        if module.startswith("conflowgen.") and module in sys.modules:
+            found_class = getattr(sys.modules[module], name, None)
+            if isinstance(found_class, type) and (
+                    issubclass(found_class, enum.Enum)
+                    or (issubclass(found_class, tuple) and hasattr(found_class, "_fields"))  # a NamedTuple
+            ):
+                return found_class
+        raise pickle.UnpicklingError(f"The type {module}.{name} is not allowed in a stored analysis result")
+
+
+class PostHocAnalysisResultRepository:
+    """
+    Stores the results of the post-hoc analyses in the database next to the container flow they have been computed
+    for. Each result is stored together with the fingerprint of the container flow. As long as the fingerprint stays
+    the same, the stored result is returned instead of running the analysis again, also in another session.
+
+    The fingerprint covers the properties of the generation including the random seed, all distributions, the
+    schedules, and the number of generated rows. Changing the generated rows by hand without changing their number is
+    not detected, in that case the stored results must be removed with :meth:`clear`.
+    """
+
+    logger = logging.getLogger("conflowgen")
+
+    models_with_input_data = (
+        ContainerFlowGenerationProperties,
+        ContainerLengthDistribution,
+        ContainerWeightDistribution,
+        ModeOfTransportDistribution,
+        StorageRequirementDistribution,
+        TruckArrivalDistribution,
+        Schedule,
+        Destination,
+    )
+
+    models_with_generated_data = (
+        Container,
+        LargeScheduledVehicle,
+        Truck,
+        TruckArrivalInformationForDelivery,
+        TruckArrivalInformationForPickup,
+    )
+
+    _queries_of_fingerprint: Optional[List[Tuple[str, str, tuple]]] = None
+
+    _fingerprint: DatabaseStateCache[str] = DatabaseStateCache()
+
+    @classmethod
+    def get_fingerprint(cls) -> str:
+        """
+        Returns:
+            The fingerprint of the input data and the generated container flow in the database
+        """
+        return cls._fingerprint.get(cls._compute_fingerprint)
+
+    @classmethod
+    def _compute_fingerprint(cls) -> str:
+        existing_tables = set(database_proxy.get_tables())
+        fingerprint = hashlib.sha256()
+        for table_name, sql, params in cls._get_queries_of_fingerprint():  # pylint: disable=not-an-iterable
+            if table_name in existing_tables:
+                # The rows are not converted by their fields as only their representation matters
+                rows = database_proxy.execute_sql(sql, params).fetchall()
+                fingerprint.update(repr((table_name, rows)).encode("utf-8"))
+        return fingerprint.hexdigest()
+
+    @classmethod
+    def _get_queries_of_fingerprint(cls) -> List[Tuple[str, str, tuple]]:
+        # The queries are only turned into SQL once as this takes longer than running them on the small tables
+        if cls._queries_of_fingerprint is None:
+            queries = [
+                (model, model.select().order_by(
+                    *model._meta.sorted_fields  # pylint: disable=protected-access,no-member
+                ))
+                for model in cls.models_with_input_data
+            ] + [
+                (model, model.select(fn.COUNT(model._meta.primary_key)))  # pylint: disable=protected-access,no-member
+                for model in cls.models_with_generated_data
+            ]
+            cls._queries_of_fingerprint = [
+                (model._meta.table_name, *query.sql())  # pylint: disable=protected-access
+                for model, query in queries
+            ]
+        return cls._queries_of_fingerprint
+
+    @staticmethod
+    def get_result(fingerprint: str, analysis: str, arguments: str) -> Tuple[bool, Any]:
+        """
+        Args:
+            fingerprint: The fingerprint of the current container flow
+            analysis: The qualified name of the method of the analysis
+            arguments: The representation of the arguments the method is called with
+
+        Returns:
+            Whether a result has been stored for the current container flow, and if so the result
+        """
+        if not PostHocAnalysisResult.table_exists():  # the database has been created by an older version
+            return False, None
+        stored_result = PostHocAnalysisResult.select(PostHocAnalysisResult.result).where(
+            (PostHocAnalysisResult.fingerprint == fingerprint)
+            & (PostHocAnalysisResult.analysis == analysis)
+            & (PostHocAnalysisResult.arguments == arguments)
+        ).tuples().first()
+        if stored_result is None:
+            return False, None
+        try:
+            return True, AnalysisResultUnpickler(io.BytesIO(stored_result[0])).load()
+        except (pickle.UnpicklingError, EOFError, TypeError, ValueError) as error:
+            # e.g. the row has been changed outside of ConFlowGen
+            PostHocAnalysisResultRepository.logger.warning(
+                f"The stored result of {analysis} is ignored and computed again: {error}"
+            )
+            return False, None
+
+    @classmethod
+    def store_result(cls, fingerprint: str, analysis: str, arguments: str, result: Any) -> None:
+        """
+        Stores the result and removes all results which belong to another container flow.
+
+        Args:
+            fingerprint: The fingerprint of the current container flow
+            analysis: The qualified name of the method of the analysis
+            arguments: The representation of the arguments the method is called with
+            result: The result of the method
+        """
+        cls.logger.debug(f"Store result of {analysis}...")
+        # Neither the container facts nor the fingerprint depend on the stored results, so they can be kept
+        with ContainerFactsRepository.changes_not_affecting_containers(), \
+                cls._fingerprint.changes_not_affecting_value(), database_proxy.atomic():
+            PostHocAnalysisResult.create_table(safe=True)
+            PostHocAnalysisResult.delete().where(  # pylint: disable=no-value-for-parameter
+                PostHocAnalysisResult.fingerprint != fingerprint
+            ).execute()
+            PostHocAnalysisResult.replace(
+                fingerprint=fingerprint,
+                analysis=analysis,
+                arguments=arguments,
+                result=pickle.dumps(result)
+            ).execute()
+
+    @staticmethod
+    def clear() -> None:
+        """Removes all stored results."""
+        if PostHocAnalysisResult.table_exists():
+            PostHocAnalysisResult.delete().execute()  # pylint: disable=no-value-for-parameter
@@ -4,21 +4,25 @@ import enum
 import logging
 import os
 from functools import lru_cache
-from typing import Dict, Type, Optional
+from typing import Dict, Iterator, List, Type, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 # noinspection PyProtectedMember
-from peewee import ModelSelect
+from peewee import BooleanField, Case, DateTimeField, Field, JOIN, ModelSelect, fn
 
+from conflowgen.application.data_types.export_engine import ExportEngine
 from conflowgen.application.data_types.export_file_format import ExportFileFormat
 from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
     TruckArrivalInformationForPickup
-from conflowgen.domain_models.base_model import BaseModel
+from conflowgen.domain_models.base_model import BaseModel, database_proxy
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.field_types.container_length import ContainerLengthField
+from conflowgen.domain_models.field_types.mode_of_transport import ModeOfTransportField
+from conflowgen.domain_models.field_types.storage_requirement import StorageRequirementField
 from conflowgen.domain_models.large_vehicle_schedule import Destination
 from conflowgen.domain_models.vehicle import DeepSeaVessel, LargeScheduledVehicle, Feeder, Barge, Train, Truck, \
     AbstractLargeScheduledVehicle
@@ -40,6 +44,10 @@ class CastingException(Exception):
     pass
 
 
+class OptionalDependencyMissingException(Exception):
+    pass
+
+
 class ExportContainerFlowService:
     logger = logging.getLogger("conflowgen")
 
@@ -64,12 +72,85 @@ class ExportContainerFlowService:
         assert file_name.endswith(".xlsx")
         df.to_excel(file_name)
 
+    @classmethod
+    def _save_batches_as_parquet(
+            cls,
+            columns: List[Tuple[str, Field]],
+            batches: Iterator[pd.DataFrame],
+            file_name: str
+    ) -> None:
+        assert file_name.endswith(".parquet")
+        pyarrow = cls._import_pyarrow()
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        schema = cls._get_arrow_schema(columns)
+        writer = None
+        try:
+            for df_batch in batches:
+                table = cls._convert_batch_to_arrow_table(df_batch, columns, schema)
+                if writer is None:  # the schema of the table also contains the pandas metadata, e.g., the index
+                    writer = pyarrow.parquet.ParquetWriter(file_name, table.schema)
+                writer.write_table(table)  # each batch becomes at least one row group
+        finally:
+            if writer is not None:
+                writer.close()
+
+    @classmethod
+    def _save_batches_as_feather(
+            cls,
+            columns: List[Tuple[str, Field]],
+            batches: Iterator[pd.DataFrame],
+            file_name: str
+    ) -> None:
+        assert file_name.endswith(".feather")
+        pyarrow = cls._import_pyarrow()
+        import pyarrow.ipc  # pylint: disable=import-outside-toplevel
+        schema = cls._get_arrow_schema(columns)
+        # just like pyarrow.feather.write_feather, the record batches are compressed if the codec is available
+        options = pyarrow.ipc.IpcWriteOptions(compression="lz4" if pyarrow.Codec.is_available("lz4") else None)
+        writer = None
+        try:
+            for df_batch in batches:
+                table = cls._convert_batch_to_arrow_table(df_batch, columns, schema)
+                if writer is None:  # the schema of the table also contains the pandas metadata, e.g., the index
+                    writer = pyarrow.ipc.new_file(file_name, table.schema, options=options)
+                writer.write_table(table)  # each batch becomes one record batch
+        finally:
+            if writer is not None:
+                writer.close()
+
     enums_to_convert = (
         ContainerLength,
         StorageRequirement,
         ModeOfTransport
     )
 
+    # The fields which store the enums to convert
+    enum_fields_to_convert = (
+        ContainerLengthField,
+        StorageRequirementField,
+        ModeOfTransportField
+    )
+
+    # The enums which are stored by the fields, their values are the categories of the typed columns
+    enums_of_fields = {
+        ContainerLengthField: ContainerLength,
+        StorageRequirementField: StorageRequirement,
+        ModeOfTransportField: ModeOfTransport
+    }
+
+    # The tables which are exported and the model each table is read from
+    tables_to_export = {
+        "containers": Container,
+        "deep_sea_vessels": DeepSeaVessel,
+        "feeders": Feeder,
+        "barges": Barge,
+        "trains": Train,
+        "trucks": Truck
+    }
+
+    # For the file formats which are written batch by batch, this many rows are fetched from the database at once.
+    rows_per_batch = 100_000
+
     # For a row, this foreign key is resolved and leads to a flat representation.
     foreign_keys_to_resolve = {
         # Each of barge, feeder, deep sea vessel, and train are treated equally
@@ -133,6 +214,11 @@ class ExportContainerFlowService:
             ExportFileFormat.xls: self._save_as_xls,
             ExportFileFormat.xlsx: self._save_as_xlsx
         }
+        # These file formats keep the column types and are written batch by batch instead of from a whole data frame
+        self.save_batches_as_file_format_mapping = {
+            ExportFileFormat.parquet: self._save_batches_as_parquet,
+            ExportFileFormat.feather: self._save_batches_as_feather
+        }
 
     @classmethod
     def _convert_table_to_pandas_dataframe(
@@ -226,28 +312,250 @@ class ExportContainerFlowService:
         return df_table
 
     @classmethod
-    def _convert_sql_database_to_pandas_dataframe(cls) -> Dict[str, pd.DataFrame]:
+    def _select_table_with_joins(
+            cls,
+            model: Type[BaseModel]
+    ) -> Tuple[ModelSelect, List[Tuple[str, Field, Field]], Dict[str, List[str]]]:
+        """
+        Returns:
+            The query which joins the rows the foreign keys point to, for each selected column the name, the field
+            which converts its values, and the selected node, and for each foreign key the names of the columns it
+            adds.
+        """
+        foreign_keys_to_resolve = cls.foreign_keys_to_resolve.get(model, {})
+
+        selected_columns: List[Tuple[str, Field, Field]] = [
+            (field.name, field, field) for field in model._meta.sorted_fields  # pylint: disable=protected-access
+        ]
+        nested_columns_of_foreign_keys: Dict[str, List[str]] = {}
+        query = model.select()
+        for column, model_of_column in foreign_keys_to_resolve.items():
+            assert model_of_column not in cls.foreign_keys_to_resolve, "Only one level of foreign keys is supported"
+            cls.debug_once(f"Joining column {column} of model {model}...")
+            joined_model = model_of_column.alias()
+            query = query.join(
+                joined_model, JOIN.LEFT_OUTER, on=(getattr(model, column) == joined_model.id)
+            ).switch(model)
+            nested_columns_of_foreign_keys[column] = []
+            for nested_field in model_of_column._meta.sorted_fields:  # pylint: disable=protected-access
+                if nested_field.name == "id" or nested_field.name in cls.columns_to_drop.get(model_of_column, []):
+                    continue
+                nested_column = cls.columns_to_rename.get(model_of_column, {}).get(nested_field.name, nested_field.name)
+                nested_columns_of_foreign_keys[column].append(nested_column)
+                selected_columns.append((nested_column, nested_field, getattr(joined_model, nested_field.name)))
+        primary_key = model._meta.primary_key  # pylint: disable=protected-access
+        query = query.select(*[node for (_, _, node) in selected_columns]).order_by(primary_key)
+        return query, selected_columns, nested_columns_of_foreign_keys
 
-        df_container = cls._convert_table_to_pandas_dataframe(Container)
-        result = {
-            "containers": df_container,
+    @classmethod
+    def _get_names_of_exported_columns(
+            cls,
+            model: Type[BaseModel],
+            foreign_keys_in_use: List[str],
+            nested_columns_of_foreign_keys: Dict[str, List[str]]
+    ) -> Dict[str, str]:
+        """
+        Args:
+            model: The model the table is read from
+            foreign_keys_in_use: The foreign keys which point to a row at least once, ordered by their first use
+            nested_columns_of_foreign_keys: For each foreign key, the names of the columns it adds
+
+        Returns:
+            For each exported column, the name of the selected column and the name it is exported as
+        """
+        columns = [field.name for field in model._meta.sorted_fields]  # pylint: disable=protected-access
+        for column in foreign_keys_in_use:
+            columns.extend(nested_columns_of_foreign_keys[column])
+        columns = [column for column in columns if column not in cls.columns_to_drop.get(model, [])]
+        column_translation_for_model = cls.columns_to_rename.get(model, {})
+        overwritten_columns = set(column_translation_for_model.values())
+        return {
+            column: column_translation_for_model.get(column, column)
+            for column in columns
+            if column not in overwritten_columns
         }
 
-        large_schedule_vehicles_as_subtype = {
-            "deep_sea_vessels": DeepSeaVessel,
-            "feeders": Feeder,
-            "barges": Barge,
-            "trains": Train,
+    @classmethod
+    def _convert_table_to_pandas_dataframe_with_joins(cls, model: Type[BaseModel]) -> pd.DataFrame:
+        """
+        Creates the same data frame as :meth:`_convert_table_to_pandas_dataframe` but reads the table with a single
+        query. The rows the foreign keys point to are joined instead of being selected one by one, and the values are
+        converted column by column.
+        """
+        query, selected_columns, nested_columns_of_foreign_keys = cls._select_table_with_joins(model)
+
+        # The rows are fetched without converting each value by its field, instead each column is converted at once
+        rows = database_proxy.execute(query).fetchall()
+        if len(rows) == 0:
+            df_table = pd.DataFrame([])  # an empty table has no columns, just like with the other engine
+            if model in cls.columns_to_drop:
+                df_table = df_table.drop(columns=set(df_table.columns).intersection(cls.columns_to_drop[model]))
+            if model in cls.columns_to_rename:
+                df_table = df_table.rename(columns=cls.columns_to_rename[model])
+            return df_table
+
+        df_table = pd.DataFrame.from_records(rows, columns=[name for (name, _, _) in selected_columns])
+        df_table = cls._convert_columns(df_table, selected_columns)
+
+        # The columns of a foreign key are only present if the foreign key is used at all. They are ordered by the
+        # first row that uses the foreign key, just like when the values are added row by row.
+        foreign_keys_in_use = sorted(
+            [column for column in nested_columns_of_foreign_keys if df_table[column].notna().any()],
+            key=lambda c: df_table[c].notna().to_numpy().argmax()
+        )
+        exported_columns = cls._get_names_of_exported_columns(
+            model, foreign_keys_in_use, nested_columns_of_foreign_keys
+        )
+        df_table = df_table[list(exported_columns.keys())].rename(columns=exported_columns)
+        df_table = df_table.set_index("id", drop=True)
+
+        # use nullable int instead of float, just like the other engine
+        for column in df_table.columns:
+            if df_table[column].dtype == np.float64:
+                df_table[column] = df_table[column].astype("Int64")
+
+        return df_table
+
+    @classmethod
+    def _get_foreign_keys_in_order_of_first_use(cls, model: Type[BaseModel]) -> List[str]:
+        foreign_keys_to_resolve = cls.foreign_keys_to_resolve.get(model, {})
+        if not foreign_keys_to_resolve:
+            return []
+        primary_key = model._meta.primary_key  # pylint: disable=protected-access
+        first_uses = model.select(*[
+            fn.MIN(Case(None, [(getattr(model, column).is_null(False), primary_key)]))
+            for column in foreign_keys_to_resolve.keys()
+        ]).tuples().get()
+        first_use_of_foreign_keys_in_use = {
+            column: first_use
+            for (column, first_use) in zip(foreign_keys_to_resolve.keys(), first_uses)
+            if first_use is not None
         }
-        for file_name, large_schedule_vehicle_as_subtype in large_schedule_vehicles_as_subtype.items():
+        return sorted(first_use_of_foreign_keys_in_use.keys(), key=first_use_of_foreign_keys_in_use.get)
+
+    @classmethod
+    def _iterate_over_table_with_joins_in_batches(
+            cls,
+            model: Type[BaseModel]
+    ) -> Tuple[List[Tuple[str, Field]], Iterator[pd.DataFrame]]:
+        """
+        Reads the same table as :meth:`_convert_table_to_pandas_dataframe_with_joins` but fetches at most
+        :attr:`rows_per_batch` rows at once from the cursor so that only one batch is kept in memory.
+        In contrast to the whole data frame, the columns are also present if the table is empty.
+
+        Returns:
+            For each exported column, its name and the field which converts its values, and the batches
+        """
+        query, selected_columns, nested_columns_of_foreign_keys = cls._select_table_with_joins(model)
+        exported_columns = cls._get_names_of_exported_columns(
+            model, cls._get_foreign_keys_in_order_of_first_use(model), nested_columns_of_foreign_keys
+        )
+        field_of_selected_column = {name: field for (name, field, _) in selected_columns}
+        columns = [
+            (exported_column, field_of_selected_column[selected_column])
+            for (selected_column, exported_column) in exported_columns.items()
+        ]
+
+        def iterate_over_batches() -> Iterator[pd.DataFrame]:
+            cursor = database_proxy.execute(query)
+            rows = cursor.fetchmany(cls.rows_per_batch)
+            while True:  # an empty table still leads to one empty batch so that the columns are written
+                df_batch = pd.DataFrame.from_records(rows, columns=[name for (name, _, _) in selected_columns])
+                df_batch = cls._convert_columns(df_batch, selected_columns)
+                df_batch = df_batch[list(exported_columns.keys())].rename(columns=exported_columns)
+                yield df_batch.set_index("id", drop=True)
+                rows = cursor.fetchmany(cls.rows_per_batch)
+                if len(rows) == 0:
+                    break
+
+        return columns, iterate_over_batches()
+
+    @classmethod
+    def _import_pyarrow(cls):
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise OptionalDependencyMissingException(
+                "The file formats parquet and feather require the package pyarrow, "
+                "please install it, e.g., with 'pip install pyarrow'."
+            ) from error
+        return pyarrow
+
+    @classmethod
+    def _get_arrow_schema(cls, columns: List[Tuple[str, Field]]):
+        pyarrow = cls._import_pyarrow()
+        arrow_types_of_field_types = {
+            "AUTO": pyarrow.int64(),
+            "INT": pyarrow.int64(),
+            "BIGINT": pyarrow.int64(),
+            "BOOL": pyarrow.bool_(),
+            "DATETIME": pyarrow.timestamp("us"),
+            "FLOAT": pyarrow.float64(),
+            "DOUBLE": pyarrow.float64(),
+            "VARCHAR": pyarrow.string(),
+            "TEXT": pyarrow.string(),
+        }
+        fields = []
+        for name, field in columns:
+            if isinstance(field, cls.enum_fields_to_convert):
+                # the enum values are dictionary-encoded, e.g. read in by pandas as a categorical
+                enum_values = [member.value for member in cls.enums_of_fields[type(field)]]
+                arrow_type = pyarrow.dictionary(pyarrow.int8(), pyarrow.array(enum_values).type)
+            else:
+                arrow_type = arrow_types_of_field_types[field.field_type]
+            fields.append(pyarrow.field(name, arrow_type, nullable=(name != "id")))
+        return pyarrow.schema(fields)
+
+    @classmethod
+    def _convert_batch_to_arrow_table(cls, df_batch: pd.DataFrame, columns: List[Tuple[str, Field]], schema):
+        pyarrow = cls._import_pyarrow()
+        for name, field in columns:
+            if isinstance(field, cls.enum_fields_to_convert):
+                # all batches share the same categories so that the dictionary of the column does not change
+                df_batch[name] = pd.Categorical(
+                    df_batch[name],
+                    categories=[member.value for member in cls.enums_of_fields[type(field)]]
+                )
+            elif field.field_type in ("INT", "BIGINT") and name in df_batch.columns:
+                # use nullable int for every batch, no matter whether values are missing in this batch
+                df_batch[name] = df_batch[name].astype("Int64")
+        return pyarrow.Table.from_pandas(df_batch, schema=schema, preserve_index=True)
+
+    @classmethod
+    def _convert_columns(cls, df_table: pd.DataFrame, selected_columns: List[Tuple[str, Field, Field]]) -> pd.DataFrame:
+        for name, field, _ in selected_columns:
+            if isinstance(field, cls.enum_fields_to_convert):
+                # each distinct value is converted only once and checked by the field
+                df_table[name] = df_table[name].map({
+                    value: field.python_value(value).value for value in df_table[name].dropna().unique()
+                }).infer_objects()
+            elif isinstance(field, BooleanField):
+                df_table[name] = df_table[name].astype(bool)
+            elif isinstance(field, DateTimeField):
+                # each distinct value is parsed only once by the field, no matter whether it has microseconds
+                df_table[name] = pd.to_datetime(df_table[name].map({
+                    value: field.python_value(value) for value in df_table[name].dropna().unique()
+                }))
+        return df_table
+
+    @classmethod
+    def _convert_sql_database_to_pandas_dataframe(
+            cls,
+            engine: ExportEngine = ExportEngine.joined
+    ) -> Dict[str, pd.DataFrame]:
+
+        if engine == ExportEngine.joined:
+            convert_table_to_pandas_dataframe = cls._convert_table_to_pandas_dataframe_with_joins
+        else:
+            convert_table_to_pandas_dataframe = cls._convert_table_to_pandas_dataframe
+
+        result = {}
+        for file_name, model in cls.tables_to_export.items():
             cls.logger.debug(f"Gathering data for generating the '{file_name}' table...")
-            df = cls._convert_table_to_pandas_dataframe(large_schedule_vehicle_as_subtype)
+            df = convert_table_to_pandas_dataframe(model)
             if len(df) == 0:
                 cls.logger.info(f"No content found for the {file_name} table, the file will be empty.")
             result[file_name] = df
-
-        df_trucks = cls._convert_table_to_pandas_dataframe(Truck)
-        result["trucks"] = df_trucks
         return result
 
     def export(
@@ -255,9 +563,13 @@ class ExportContainerFlowService:
             folder_name: str,
             path_to_export_folder: Optional[str],
             file_format: ExportFileFormat,
-            overwrite: bool
+            overwrite: bool,
+            engine: ExportEngine = ExportEngine.joined
     ) -> str:
 
+        if file_format in self.save_batches_as_file_format_mapping:
+            self._import_pyarrow()  # fail before any folder is created
+
         if path_to_export_folder is None:
             path_to_export_folder = EXPORTS_DEFAULT_DIR
 
@@ -281,7 +593,12 @@ class ExportContainerFlowService:
             os.mkdir(path_to_target_folder)
 
         self.logger.info(f"Converting SQL database into file format '.{file_format.value}'")
-        dfs = self._convert_sql_database_to_pandas_dataframe()
+        if file_format in self.save_batches_as_file_format_mapping:
+            self._export_in_batches(path_to_target_folder, file_format)
+            self.logger.info("Export has finished successfully.")
+            return path_to_target_folder
+
+        dfs = self._convert_sql_database_to_pandas_dataframe(engine=engine)
         for file_name, df in dfs.items():
             full_file_name = file_name + "." + file_format.value
             path_to_file = os.path.join(
@@ -293,3 +610,15 @@ class ExportContainerFlowService:
             self.save_as_file_format_mapping[file_format](df, path_to_file)
         self.logger.info("Export has finished successfully.")
         return path_to_target_folder
+
+    def _export_in_batches(self, path_to_target_folder: str, file_format: ExportFileFormat) -> None:
+        for file_name, model in self.tables_to_export.items():
+            full_file_name = file_name + "." + file_format.value
+            path_to_file = os.path.join(
+                path_to_target_folder,
+                full_file_name
+            )
+            self.logger.debug(f"Saving file {full_file_name} batch by batch")
+            columns, batches = self._iterate_over_table_with_joins_in_batches(model)
+            # noinspection PyArgumentList
+            self.save_batches_as_file_format_mapping[file_format](columns, batches, path_to_file)
@@ -1,8 +1,10 @@
 import logging
 
 import peewee
+from playhouse.migrate import SqliteMigrator, migrate
 
 from conflowgen.application.models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.application.models.post_hoc_analysis_result import PostHocAnalysisResult
 from conflowgen.domain_models.arrival_information import TruckArrivalInformationForPickup, \
     TruckArrivalInformationForDelivery
 from conflowgen.domain_models.container import Container
@@ -16,6 +18,11 @@ from conflowgen.domain_models.vehicle import DeepSeaVessel, Feeder, LargeSchedul
 
 logger = logging.getLogger("conflowgen")
 
+# These columns have been added to tables after databases with these tables had already been created.
+columns_added_to_existing_tables = (
+    ContainerFlowGenerationProperties.random_seed,
+)
+
 
 def create_tables(sql_db_connection: peewee.Database) -> peewee.Database:
     logger.debug("Creating all tables...")
@@ -37,10 +44,28 @@ def create_tables(sql_db_connection: peewee.Database) -> peewee.Database:
         TruckArrivalDistribution,
         TruckArrivalInformationForPickup,
         TruckArrivalInformationForDelivery,
-        StorageRequirementDistribution
+        StorageRequirementDistribution,
+        PostHocAnalysisResult
     ])
     for table_with_index in (
         Destination,
     ):
         table_with_index.initialize_index()
     return sql_db_connection
+
+
+def add_missing_columns(sql_db_connection: peewee.Database) -> peewee.Database:
+    """
+    Adds the columns which are missing in a database that has been created by an older version.
+    """
+    migrator = SqliteMigrator(sql_db_connection)
+    for field in columns_added_to_existing_tables:
+        table_name = field.model._meta.table_name  # pylint: disable=protected-access
+        if not sql_db_connection.table_exists(table_name):
+            continue  # the table is not used in this database, so no column is missing
+        existing_columns = [column.name for column in sql_db_connection.get_columns(table_name)]
+        if field.column_name in existing_columns:
+            continue
+        logger.debug(f"Adding missing column {field.column_name} to table {table_name}...")
+        migrate(migrator.add_column(table_name, field.column_name, field))
+    return sql_db_connection
@@ -4,7 +4,7 @@ from typing import List, Tuple, Optional
 
 from peewee import SqliteDatabase
 
-from conflowgen.database_connection.create_tables import create_tables
+from conflowgen.database_connection.create_tables import create_tables, add_missing_columns
 from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.distribution_seeders import seed_all_distributions
 
@@ -105,6 +105,7 @@ class SqliteDatabaseConnection:
         else:
             if not reset:
                 self.logger.debug(f"Open existing database at {path_to_sqlite_database}")
+                add_missing_columns(self.sqlite_db_connection)
             else:
                 self.logger.debug(f"Open new database at {path_to_sqlite_database}")
         return self.sqlite_db_connection
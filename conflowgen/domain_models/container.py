@@ -1,6 +1,9 @@
+from typing import List
+
 from peewee import AutoField, BooleanField
 from peewee import ForeignKeyField
 from peewee import IntegerField
+from peewee import ModelIndex
 
 from .base_model import BaseModel
 from .field_types.container_length import ContainerLengthField
@@ -81,6 +84,40 @@ class Container(BaseModel):
                   "explicitly to pick up the container so that the maximum dwell time is not exceeded."
     )
 
+    class Meta:
+        # Besides the indexes peewee creates for each foreign key, these indexes cover the columns the containers are
+        # most frequently filtered and grouped by.
+        indexes = (
+            (("picked_up_by", "delivered_by"), False),
+            (("picked_up_by_large_scheduled_vehicle", "length"), False),
+            (("delivered_by_large_scheduled_vehicle", "length"), False),
+            (("storage_requirement", "delivered_by", "picked_up_by"), False),
+        )
+
+    @classmethod
+    def get_secondary_indexes(cls) -> List[ModelIndex]:
+        """
+        Returns:
+            The indexes declared in the meta class of the model.
+        """
+        return [
+            ModelIndex(cls, [cls._meta.combined[field_name] for field_name in field_names], unique=unique)
+            for field_names, unique in cls._meta.indexes  # pylint: disable=no-member
+        ]
+
+    @classmethod
+    def create_secondary_indexes(cls) -> None:
+        """Creates the indexes declared in the meta class of the model unless they already exist."""
+        for index in cls.get_secondary_indexes():
+            cls._meta.database.execute(cls._schema._create_index(index, safe=True))  # pylint: disable=no-member
+
+    @classmethod
+    def drop_secondary_indexes(cls) -> None:
+        """Drops the indexes declared in the meta class of the model so that many containers are inserted and updated
+        faster. Afterwards, they should be recreated by :meth:`.create_secondary_indexes`."""
+        for index in cls.get_secondary_indexes():
+            cls._meta.database.execute(cls._schema._drop_index(index, safe=True))  # pylint: disable=no-member
+
     def __repr__(self):
         return "<Container " \
                f"weight: {self.weight}; " \
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import math
-import random
-from typing import Dict, MutableSequence, Sequence
+from typing import Dict, Sequence, List, Any, NamedTuple, Tuple
 
+import numpy as np
+
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_repositories.container_length_distribution_repository import \
     ContainerLengthDistributionRepository
@@ -18,7 +20,25 @@ from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTranspor
 from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
 from conflowgen.domain_models.repositories.large_scheduled_vehicle_repository import LargeScheduledVehicleRepository
 from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle, LargeScheduledVehicle
-from conflowgen.tools.distribution_approximator import DistributionApproximator
+from conflowgen.tools.bulk_operations import insert_many_and_get_ids
+from conflowgen.tools.distribution_approximator import DistributionApproximator, SamplerExhaustedException
+
+
+class ContainerDistributions(NamedTuple):
+    """All distributions the attributes of a container are drawn from."""
+    mode_of_transportation: Dict[ModeOfTransport, Dict[ModeOfTransport, float]]
+    container_length: Dict[ContainerLength, float]
+    container_weight: Dict[ContainerLength, Dict[int, float]]
+    storage_requirement: Dict[ContainerLength, Dict[StorageRequirement, float]]
+
+
+class SampledContainers(NamedTuple):
+    """The attributes of the containers delivered by one vehicle, each attribute as a separate column."""
+    lengths: List[ContainerLength]
+    weights: List[int]
+    storage_requirements: List[StorageRequirement]
+    picked_up_by: List[ModeOfTransport]
+    capacity_is_exhausted: bool
 
 
 class ContainerFactory:
@@ -28,12 +48,14 @@ class ContainerFactory:
 
     ignored_capacity = ContainerLength.get_factor(ContainerLength.other)
 
-    def __init__(self):
+    def __init__(self, random_number_generator: np.random.Generator | None = None):
         self.mode_of_transportation_distribution = None
         self.container_length_distribution = None
         self.container_weight_distribution = None
         self.storage_requirement_distribution = None
         self.large_scheduled_vehicle_repository = LargeScheduledVehicleRepository()
+        self.random_number_generator = random_number_generator or np.random.default_rng()
+        self.length_approximator_for_containers_delivered_by_truck: DistributionApproximator | None = None
 
     def reload_distributions(self):
         """The user might change the distributions at any time, so reload them at a meaningful point of time!"""
@@ -42,6 +64,21 @@ class ContainerFactory:
         self.container_weight_distribution = ContainerWeightDistributionRepository.get_distribution()
         self.storage_requirement_distribution = ContainerStorageRequirementDistributionRepository.get_distribution()
 
+    def get_distributions(self) -> ContainerDistributions:
+        return ContainerDistributions(
+            mode_of_transportation=self.mode_of_transportation_distribution,
+            container_length=self.container_length_distribution,
+            container_weight=self.container_weight_distribution,
+            storage_requirement=self.storage_requirement_distribution
+        )
+
+    def set_distributions(self, distributions: ContainerDistributions) -> None:
+        """Sets the distributions without loading them from the database, e.g. in another process."""
+        self.mode_of_transportation_distribution = distributions.mode_of_transportation
+        self.container_length_distribution = distributions.container_length
+        self.container_weight_distribution = distributions.container_weight
+        self.storage_requirement_distribution = distributions.storage_requirement
+
     def create_containers_for_large_scheduled_vehicle(
             self,
             large_scheduled_vehicle_as_subtype: AbstractLargeScheduledVehicle
@@ -52,8 +89,6 @@ class ContainerFactory:
 
         self.large_scheduled_vehicle_repository.reset_cache()
 
-        created_containers: MutableSequence[Container] = []
-
         delivered_by = large_scheduled_vehicle_as_subtype.get_mode_of_transport()
 
         large_scheduled_vehicle: LargeScheduledVehicle = large_scheduled_vehicle_as_subtype.large_scheduled_vehicle
@@ -61,34 +96,117 @@ class ContainerFactory:
         free_capacity_in_teu = self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
             large_scheduled_vehicle_as_subtype
         )
+        sampled_containers = self.sample_containers_for_large_scheduled_vehicle(
+            delivered_by=delivered_by,
+            free_capacity_in_teu=free_capacity_in_teu,
+            vehicle_name=large_scheduled_vehicle.vehicle_name
+        )
+        if (sampled_containers.capacity_is_exhausted
+                and not large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation):
+            large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation = True
+            large_scheduled_vehicle.save()
+
+        container_ids = self.insert_containers_of_large_scheduled_vehicles(
+            delivered_by=delivered_by,
+            large_scheduled_vehicle_ids=[large_scheduled_vehicle.id],
+            containers_of_vehicles=[sampled_containers]
+        )
+        if len(container_ids) == 0:
+            return []
+        # the ids of the inserted containers are consecutive
+        return list(
+            Container.select().where(Container.id.between(container_ids[0], container_ids[-1])).order_by(Container.id)
+        )
+
+    @staticmethod
+    def insert_containers_of_large_scheduled_vehicles(
+            delivered_by: ModeOfTransport,
+            large_scheduled_vehicle_ids: Sequence[int],
+            containers_of_vehicles: Sequence[SampledContainers]
+    ) -> List[int]:
+        """
+        Writes the containers the large vehicles deliver to a terminal with a few multi-row inserts instead of one
+        statement per container.
+
+        Args:
+            delivered_by: The vehicle type of the vehicles
+            large_scheduled_vehicle_ids: The id of each large vehicle
+            containers_of_vehicles: The containers each large vehicle delivers, in the same order as the ids
+
+        Returns:
+            The ids of the inserted containers in the order of the vehicles
+        """
+        fields = [
+            Container.weight,
+            Container.length,
+            Container.storage_requirement,
+            Container.delivered_by,
+            Container.picked_up_by,  # this field is adjusted as needed
+            Container.picked_up_by_initial,  # this field is later never touched again
+            Container.delivered_by_large_scheduled_vehicle
+        ]
+        rows = [
+            (weight, length, storage_requirement, delivered_by, picked_up_by, picked_up_by, large_scheduled_vehicle_id)
+            for large_scheduled_vehicle_id, containers in zip(large_scheduled_vehicle_ids, containers_of_vehicles)
+            for length, weight, storage_requirement, picked_up_by in zip(
+                containers.lengths, containers.weights, containers.storage_requirements, containers.picked_up_by
+            )
+        ]
+        with database_proxy.atomic():
+            return insert_many_and_get_ids(Container, rows, fields=fields)
+
+    def sample_containers_for_large_scheduled_vehicle(
+            self,
+            delivered_by: ModeOfTransport,
+            free_capacity_in_teu: float,
+            vehicle_name: str
+    ) -> SampledContainers:
+        """
+        Draws the attributes of all containers a large vehicle delivers to a terminal without accessing the database.
+        Thus, this can also run in another process.
+
+        Args:
+            delivered_by: The vehicle type of the vehicle
+            free_capacity_in_teu: The free capacity of the vehicle for its inbound journey
+            vehicle_name: The name of the vehicle, only used for reporting errors
+
+        Returns:
+            The attributes of the containers, each as a separate column
+        """
 
         # this is based on the assumption that the smallest container is a 20' container
         maximum_number_of_containers = int(math.ceil(free_capacity_in_teu))
         self._load_distribution_approximators(maximum_number_of_containers, delivered_by)
 
-        while (self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
-                large_scheduled_vehicle_as_subtype
-        ) > self.ignored_capacity):
-            container = self._create_single_container_for_large_scheduled_vehicle(
-                delivered_by_large_scheduled_vehicle_as_subtype=large_scheduled_vehicle_as_subtype
-            )
-            created_containers.append(container)
-            is_exhausted = self.large_scheduled_vehicle_repository.block_capacity_for_inbound_journey(
-                vehicle=large_scheduled_vehicle_as_subtype,
-                container=container
-            )
-            if is_exhausted and not large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation:
-                large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation = True
-                large_scheduled_vehicle.save()
+        # First only the lengths are drawn as they determine how many containers fit onto the vehicle
+        lengths: List[ContainerLength] = []
+        capacity_is_exhausted = False
+        while free_capacity_in_teu > self.ignored_capacity:
+            length = self.distribution_approximators["length"].sample()
+            lengths.append(length)
+            used_capacity_in_teu = ContainerLength.get_factor(container_length=length)
+            free_capacity_in_teu -= used_capacity_in_teu
+            assert free_capacity_in_teu >= 0, \
+                f"The vehicle {vehicle_name} does not have sufficient free capacity (in TEU): " \
+                f"{free_capacity_in_teu} after loading a container of {used_capacity_in_teu} TEU."
+            if free_capacity_in_teu < self.ignored_capacity:
+                capacity_is_exhausted = True
 
-        free_capacity = self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
-            large_scheduled_vehicle_as_subtype
-        )
-        assert free_capacity >= 0, \
-               f"The vehicle {large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.vehicle_name} does not " \
-               f"have sufficient free capacity (in TEU): {free_capacity}."
+        # All other attributes are drawn at once for all containers of the vehicle
+        weights, storage_requirements = self._sample_weights_and_storage_requirements(lengths)
+        picked_up_by_approximator = self.distribution_approximators["picked_up_by"]
+        picked_up_by = [
+            picked_up_by_approximator.categories[picked_up_by_index]
+            for picked_up_by_index in picked_up_by_approximator.sample_many(len(lengths))
+        ]
 
-        return created_containers
+        return SampledContainers(
+            lengths=lengths,
+            weights=weights,
+            storage_requirements=storage_requirements,
+            picked_up_by=picked_up_by,
+            capacity_is_exhausted=capacity_is_exhausted
+        )
 
     def _load_distribution_approximators(
             self,
@@ -98,10 +216,14 @@ class ContainerFactory:
         self.distribution_approximators: Dict[str, DistributionApproximator] = {
             "length": DistributionApproximator.from_distribution(
                 self.container_length_distribution,
-                number_of_containers),
+                number_of_containers,
+                precompute_sequence=True,
+                random_number_generator=self.random_number_generator),
             "picked_up_by": DistributionApproximator.from_distribution(
                 self.mode_of_transportation_distribution[delivered_by],
-                number_of_containers)
+                number_of_containers,
+                precompute_sequence=True,
+                random_number_generator=self.random_number_generator)
         }
 
     @staticmethod
@@ -119,45 +241,83 @@ class ContainerFactory:
                 weight = 4
         return weight
 
-    def _create_single_container_for_large_scheduled_vehicle(
+    def _sample_weights_and_storage_requirements(
             self,
-            delivered_by_large_scheduled_vehicle_as_subtype: AbstractLargeScheduledVehicle
-    ) -> Container:
-        """Creates a generic single container delivered by a specific large scheduled vehicle"""
-
-        delivered_by = delivered_by_large_scheduled_vehicle_as_subtype.get_mode_of_transport()
-        delivered_by_large_scheduled_vehicle = \
-            delivered_by_large_scheduled_vehicle_as_subtype.large_scheduled_vehicle
-
-        length = self.distribution_approximators["length"].sample()
-        weight = random.choices(
-            population=list(self.container_weight_distribution[length].keys()),
-            weights=list(self.container_weight_distribution[length].values()),
-            k=1
-        )[0]
-        picked_up_by = self.distribution_approximators["picked_up_by"].sample()
-        storage_requirement = random.choices(
-            population=list(self.storage_requirement_distribution[length].keys()),
-            weights=list(self.storage_requirement_distribution[length].values()),
-            k=1
-        )[0]
+            lengths: Sequence[ContainerLength]
+    ) -> Tuple[List[int], List[StorageRequirement]]:
+        """Draws the weight and the storage requirement for each container, one vectorized draw per container
+        length."""
+        indices_per_length: Dict[ContainerLength, List[int]] = {}
+        for i, length in enumerate(lengths):
+            indices_per_length.setdefault(length, []).append(i)
+
+        weights: List[int | None] = [None] * len(lengths)
+        storage_requirements: List[StorageRequirement | None] = [None] * len(lengths)
+        for length, indices in indices_per_length.items():
+            weights_of_length = self._sample_from_distribution(self.container_weight_distribution[length], len(indices))
+            storage_requirements_of_length = self._sample_from_distribution(
+                self.storage_requirement_distribution[length], len(indices)
+            )
+            for i, weight, storage_requirement in zip(indices, weights_of_length, storage_requirements_of_length):
+                new_weight = self._update_weight_according_to_container_type(
+                    storage_requirement=storage_requirement,
+                    length=length
+                )
+                weights[i] = new_weight if new_weight is not None else weight
+                storage_requirements[i] = storage_requirement
+        return weights, storage_requirements
+
+    def _sample_from_distribution(self, distribution: Dict[Any, float], size: int) -> List[Any]:
+        population = list(distribution.keys())
+        probabilities = np.array(list(distribution.values()), dtype=np.float64)
+        chosen_indices = self.random_number_generator.choice(
+            len(population),
+            size=size,
+            p=probabilities / probabilities.sum()
+        )
+        return [population[i] for i in chosen_indices]
+
+    def start_session_for_containers_delivered_by_truck(self, number_of_containers: int) -> None:
+        """All containers delivered by truck which are created until the session is ended draw their length from one
+        shared distribution approximator. Thus, the lengths of these containers match the distribution exactly.
+
+        Args:
+            number_of_containers: The number of containers which are at most created during the session
+        """
+        self.length_approximator_for_containers_delivered_by_truck = DistributionApproximator.from_distribution(
+            self.container_length_distribution,
+            number_of_containers,
+            precompute_sequence=True,
+            random_number_generator=self.random_number_generator
+        )
+
+    def end_session_for_containers_delivered_by_truck(self) -> None:
+        self.length_approximator_for_containers_delivered_by_truck = None
+
+    def _sample_length_of_container_delivered_by_truck(self) -> ContainerLength:
+        if self.length_approximator_for_containers_delivered_by_truck is not None:
+            try:
+                return self.length_approximator_for_containers_delivered_by_truck.sample()
+            except SamplerExhaustedException:
+                self.end_session_for_containers_delivered_by_truck()
+        self._load_distribution_approximators(
+            number_of_containers=1,
+            delivered_by=ModeOfTransport.truck
+        )
+        return self.distribution_approximators["length"].sample()
+
+    def sample_container_for_delivering_truck(self) -> Tuple[ContainerLength, int, StorageRequirement]:
+        """Draws the length, weight, and storage requirement of a single container delivered by a truck without
+        accessing the database."""
+        length = self._sample_length_of_container_delivered_by_truck()
+        weight = self._sample_from_distribution(self.container_weight_distribution[length], 1)[0]
+        storage_requirement = self._sample_from_distribution(self.storage_requirement_distribution[length], 1)[0]
         new_weight = self._update_weight_according_to_container_type(
             storage_requirement=storage_requirement,
             length=length
         )
         weight = new_weight if new_weight is not None else weight
-        container = Container.create(
-            weight=weight,
-            length=length,
-            storage_requirement=storage_requirement,
-            delivered_by=delivered_by,
-            picked_up_by=picked_up_by,  # this field is adjusted as needed
-            picked_up_by_initial=picked_up_by,  # this field is later never touched again
-            delivered_by_large_scheduled_vehicle=delivered_by_large_scheduled_vehicle,
-            delivered_by_truck=None
-        )
-        container.save()
-        return container
+        return length, weight, storage_requirement
 
     def create_container_for_delivering_truck(
             self,
@@ -168,27 +328,7 @@ class ContainerFactory:
         picked_up_by_large_scheduled_vehicle = picked_up_by_large_scheduled_vehicle_subtype.large_scheduled_vehicle
         picked_up_by = picked_up_by_large_scheduled_vehicle_subtype.get_mode_of_transport()
 
-        self._load_distribution_approximators(
-            number_of_containers=1,
-            delivered_by=ModeOfTransport.truck
-        )
-
-        length = self.distribution_approximators["length"].sample()
-        weight = random.choices(
-            population=list(self.container_weight_distribution[length].keys()),
-            weights=list(self.container_weight_distribution[length].values()),
-            k=1
-        )[0]
-        storage_requirement = random.choices(
-            population=list(self.storage_requirement_distribution[length].keys()),
-            weights=list(self.storage_requirement_distribution[length].values()),
-            k=1
-        )[0]
-        new_weight = self._update_weight_according_to_container_type(
-            storage_requirement=storage_requirement,
-            length=length
-        )
-        weight = new_weight if new_weight is not None else weight
+        length, weight, storage_requirement = self.sample_container_for_delivering_truck()
         container = Container.create(
             weight=weight,
             length=length,
@@ -1,8 +1,9 @@
 import datetime
-from typing import List
+from typing import Callable, List, NamedTuple
 
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
-from conflowgen.domain_models.vehicle import DeepSeaVessel, Feeder, Train, Barge
+from conflowgen.domain_models.vehicle import DeepSeaVessel, Feeder, Train, Barge, AbstractLargeScheduledVehicle
 from .vehicle_factory import VehicleFactory
 
 
@@ -50,45 +51,83 @@ def create_arrivals_within_time_range(
         return []
 
 
+class ScheduledVehicle(NamedTuple):
+    """A vehicle of a schedule before it is created."""
+    vehicle_name: str
+    scheduled_arrival: datetime.datetime
+
+
 class FleetFactory:
 
     def __init__(self):
         self.vehicle_factory = VehicleFactory()
 
-    def create_feeder_fleet(
-            self,
-            schedule: Schedule,
+    @staticmethod
+    def get_scheduled_vehicles(
+            service_name: str,
+            vehicle_type: ModeOfTransport,
+            vehicle_arrives_at: datetime.date,
+            vehicle_arrives_every_k_days: int,
+            vehicle_arrives_at_time: datetime.time,
             first_at: datetime.date,
             latest_at: datetime.date
-    ) -> List[Feeder]:
-        """Creates a collection of feeder vessels.
-        This factory creates a new vessel for each port call to reduce interdependence.
-        Here, randomness might kick in later.
+    ) -> List[ScheduledVehicle]:
+        """Determines the name and the arrival of each vehicle of a schedule.
+        As no database is accessed, this can also run in another process.
         """
-
-        feeders = []
-
         arrivals = create_arrivals_within_time_range(
             first_at,
-            schedule.vehicle_arrives_at,
+            vehicle_arrives_at,
             latest_at,
-            schedule.vehicle_arrives_every_k_days,
-            schedule.vehicle_arrives_at_time
+            vehicle_arrives_every_k_days,
+            vehicle_arrives_at_time
         )
+        return [
+            ScheduledVehicle(
+                vehicle_name=f"{service_name}_{vehicle_type.value}_{i + 1}",
+                scheduled_arrival=arrival
+            )
+            for i, arrival in enumerate(arrivals)
+        ]
 
-        for i, arrival in enumerate(arrivals):
-            moved_capacity = schedule.average_moved_capacity  # here we can add randomness later
-            vehicle_name = f"{schedule.service_name}_feeder_{i + 1}"
-            feeder = self.vehicle_factory.create_feeder(
-                vehicle_name=vehicle_name,
+    def _create_fleet(
+            self,
+            schedule: Schedule,
+            first_at: datetime.date,
+            latest_at: datetime.date,
+            create_vehicle: Callable[..., AbstractLargeScheduledVehicle]
+    ) -> List[AbstractLargeScheduledVehicle]:
+        scheduled_vehicles = self.get_scheduled_vehicles(
+            service_name=schedule.service_name,
+            vehicle_type=schedule.vehicle_type,
+            vehicle_arrives_at=schedule.vehicle_arrives_at,
+            vehicle_arrives_every_k_days=schedule.vehicle_arrives_every_k_days,
+            vehicle_arrives_at_time=schedule.vehicle_arrives_at_time,
+            first_at=first_at,
+            latest_at=latest_at
+        )
+        return [
+            create_vehicle(
+                vehicle_name=scheduled_vehicle.vehicle_name,
                 capacity_in_teu=schedule.average_vehicle_capacity,
-                moved_capacity=moved_capacity,
-                scheduled_arrival=arrival,
+                moved_capacity=schedule.average_moved_capacity,  # here we can add randomness later
+                scheduled_arrival=scheduled_vehicle.scheduled_arrival,
                 schedule=schedule
             )
-            feeders.append(feeder)
+            for scheduled_vehicle in scheduled_vehicles
+        ]
 
-        return feeders
+    def create_feeder_fleet(
+            self,
+            schedule: Schedule,
+            first_at: datetime.date,
+            latest_at: datetime.date
+    ) -> List[Feeder]:
+        """Creates a collection of feeder vessels.
+        This factory creates a new vessel for each port call to reduce interdependence.
+        Here, randomness might kick in later.
+        """
+        return self._create_fleet(schedule, first_at, latest_at, self.vehicle_factory.create_feeder)
 
     def create_deep_sea_vessel_fleet(
             self,
@@ -100,31 +139,7 @@ class FleetFactory:
         This factory creates a new vessel for each port call to reduce interdependence.
         Here, randomness might kick in later.
         """
-
-        deep_sea_vessels = []
-
-        arrivals = create_arrivals_within_time_range(
-            first_at,
-            schedule.vehicle_arrives_at,
-            latest_at,
-            schedule.vehicle_arrives_every_k_days,
-            schedule.vehicle_arrives_at_time
-        )
-
-        for i, arrival in enumerate(arrivals):
-            moved_capacity = schedule.average_moved_capacity  # here we can add randomness later
-            vehicle_name = f"{schedule.service_name}_deep_sea_vessel_{i + 1}"
-
-            deep_sea_vessel = self.vehicle_factory.create_deep_sea_vessel(
-                vehicle_name=vehicle_name,
-                capacity_in_teu=schedule.average_vehicle_capacity,
-                moved_capacity=moved_capacity,
-                scheduled_arrival=arrival,
-                schedule=schedule
-            )
-            deep_sea_vessels.append(deep_sea_vessel)
-
-        return deep_sea_vessels
+        return self._create_fleet(schedule, first_at, latest_at, self.vehicle_factory.create_deep_sea_vessel)
 
     def create_train_fleet(
             self,
@@ -134,31 +149,7 @@ class FleetFactory:
     ) -> List[Train]:
         """Creates a collection of trains.
         """
-
-        trains = []
-
-        arrivals = create_arrivals_within_time_range(
-            first_at,
-            schedule.vehicle_arrives_at,
-            latest_at,
-            schedule.vehicle_arrives_every_k_days,
-            schedule.vehicle_arrives_at_time
-        )
-
-        for i, arrival in enumerate(arrivals):
-            moved_capacity = schedule.average_moved_capacity  # here we can add randomness later
-            vehicle_name = f"{schedule.service_name}_train_{i + 1}"
-
-            train = self.vehicle_factory.create_train(
-                vehicle_name=vehicle_name,
-                capacity_in_teu=schedule.average_vehicle_capacity,
-                moved_capacity=moved_capacity,
-                scheduled_arrival=arrival,
-                schedule=schedule
-            )
-            trains.append(train)
-
-        return trains
+        return self._create_fleet(schedule, first_at, latest_at, self.vehicle_factory.create_train)
 
     def create_barge_fleet(
             self,
@@ -168,28 +159,4 @@ class FleetFactory:
     ) -> List[Barge]:
         """Creates a collection of barges.
         """
-
-        barges = []
-
-        arrivals = create_arrivals_within_time_range(
-            first_at,
-            schedule.vehicle_arrives_at,
-            latest_at,
-            schedule.vehicle_arrives_every_k_days,
-            schedule.vehicle_arrives_at_time
-        )
-
-        for i, arrival in enumerate(arrivals):
-            moved_capacity = schedule.average_moved_capacity  # here we can add randomness later
-            vehicle_name = f"{schedule.service_name}_barge_{i + 1}"
-
-            barge = self.vehicle_factory.create_barge(
-                vehicle_name=vehicle_name,
-                capacity_in_teu=schedule.average_vehicle_capacity,
-                moved_capacity=moved_capacity,
-                scheduled_arrival=arrival,
-                schedule=schedule
-            )
-            barges.append(barge)
-
-        return barges
+        return self._create_fleet(schedule, first_at, latest_at, self.vehicle_factory.create_barge)
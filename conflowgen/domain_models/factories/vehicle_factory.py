@@ -75,6 +75,20 @@ class VehicleFactory:
         )
         return truck
 
+    @staticmethod
+    def check_capacities_of_large_vehicle(capacity_in_teu: int, moved_capacity: int) -> None:
+        if capacity_in_teu < 0:
+            raise UnrealisticValuesException(f"Vehicle capacity must be positive but it was {capacity_in_teu}")
+
+        if moved_capacity < 0:
+            raise UnrealisticValuesException(f"Vehicle must move positive amount but it was {moved_capacity}")
+
+        if moved_capacity > capacity_in_teu:
+            raise UnrealisticValuesException(
+                f"Vehicle can't move more than its capacity but for the vehicle with an overall capacity of "
+                f"{capacity_in_teu} the moved capacity was set to {moved_capacity}"
+            )
+
     def _create_large_vehicle(
             self,
             capacity_in_teu: int,
@@ -88,17 +102,7 @@ class VehicleFactory:
         Checks all parameters for logical consistency and only then creates the new large vehicle.
         """
 
-        if capacity_in_teu < 0:
-            raise UnrealisticValuesException(f"Vehicle capacity must be positive but it was {capacity_in_teu}")
-
-        if moved_capacity < 0:
-            raise UnrealisticValuesException(f"Vehicle must move positive amount but it was {moved_capacity}")
-
-        if moved_capacity > capacity_in_teu:
-            raise UnrealisticValuesException(
-                f"Vehicle can't move more than its capacity but for the vehicle with an overall capacity of "
-                f"{capacity_in_teu} the moved capacity was set to {moved_capacity}"
-            )
+        self.check_capacities_of_large_vehicle(capacity_in_teu=capacity_in_teu, moved_capacity=moved_capacity)
 
         if vehicle_name is None:
             vehicle_name = schedule.service_name + self._get_unique_suffix()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+from typing import ContextManager
+
+import pandas as pd
+from peewee import fn, JOIN
+
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.base_model import database_proxy
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength, CONTAINER_LENGTH_TO_OCCUPIED_TEU
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
+from conflowgen.tools.database_state_cache import DatabaseStateCache
+
+
+class ContainerFactsRepository:
+    """
+    Provides the facts of all containers as one data frame with a row for each container. The frame is built with a
+    single query and then kept in memory as long as the database does not change. Thus, several analyses can be run
+    one after another without reading the containers again.
+
+    The frame contains the following columns:
+
+    * ``id``: The id of the container
+    * ``length``: The :class:`.ContainerLength` of the container
+    * ``teu``: The TEU factor of the container
+    * ``storage_requirement``: The :class:`.StorageRequirement` of the container
+    * ``delivered_by``, ``picked_up_by_initial``, ``picked_up_by``: The :class:`.ModeOfTransport` of the vehicles
+    * ``delivered_by_large_scheduled_vehicle``, ``delivered_by_truck``, ``picked_up_by_large_scheduled_vehicle``,
+      ``picked_up_by_truck``: The ids of the vehicles, missing if the container is moved by another type of vehicle
+    * ``enters_yard``, ``leaves_yard``: The points in time the container is delivered and picked up, given in seconds
+      since the epoch (the fraction of a second is cut off)
+    """
+
+    logger = logging.getLogger("conflowgen")
+
+    vehicle_id_columns = (
+        "delivered_by_large_scheduled_vehicle",
+        "delivered_by_truck",
+        "picked_up_by_large_scheduled_vehicle",
+        "picked_up_by_truck",
+    )
+
+    _container_facts: DatabaseStateCache[pd.DataFrame] = DatabaseStateCache()
+
+    @classmethod
+    def get_container_facts(cls) -> pd.DataFrame:
+        """
+        Returns:
+            The facts of all containers. The frame is shared, so it must not be modified.
+        """
+        return cls._container_facts.get(cls._load_container_facts)
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drops the facts so that they are loaded again the next time they are requested. This is required after the
+        containers have been changed by another connection to the database."""
+        cls._container_facts.invalidate()
+
+    @classmethod
+    def changes_not_affecting_containers(cls) -> ContextManager[None]:
+        """Keeps the facts while rows are changed which the facts do not depend on, e.g. rows of other tables."""
+        return cls._container_facts.changes_not_affecting_value()
+
+    @classmethod
+    def _load_container_facts(cls) -> pd.DataFrame:
+        cls.logger.debug("Load the facts of all containers...")
+        delivering_truck_arrival = TruckArrivalInformationForDelivery.alias()
+        picking_up_truck_arrival = TruckArrivalInformationForPickup.alias()
+        delivering_vehicle = LargeScheduledVehicle.alias()
+        picking_up_vehicle = LargeScheduledVehicle.alias()
+        delivering_truck = Truck.alias()
+        picking_up_truck = Truck.alias()
+
+        columns = {
+            "id": Container.id,
+            "length": Container.length,
+            "storage_requirement": Container.storage_requirement,
+            "delivered_by": Container.delivered_by,
+            "picked_up_by_initial": Container.picked_up_by_initial,
+            "picked_up_by": Container.picked_up_by,
+            "delivered_by_large_scheduled_vehicle": Container.delivered_by_large_scheduled_vehicle,
+            "delivered_by_truck": Container.delivered_by_truck,
+            "picked_up_by_large_scheduled_vehicle": Container.picked_up_by_large_scheduled_vehicle,
+            "picked_up_by_truck": Container.picked_up_by_truck,
+            "enters_yard": fn.strftime("%s", fn.COALESCE(
+                delivering_truck_arrival.realized_container_delivery_time, delivering_vehicle.scheduled_arrival
+            )).cast("INTEGER"),
+            "leaves_yard": fn.strftime("%s", fn.COALESCE(
+                picking_up_truck_arrival.realized_container_pickup_time, picking_up_vehicle.scheduled_arrival
+            )).cast("INTEGER"),
+        }
+        query = Container.select(*columns.values()).join(
+            delivering_truck, JOIN.LEFT_OUTER, on=(Container.delivered_by_truck == delivering_truck.id)
+        ).join(
+            delivering_truck_arrival, JOIN.LEFT_OUTER,
+            on=(delivering_truck.truck_arrival_information_for_delivery == delivering_truck_arrival.id)
+        ).switch(Container).join(
+            delivering_vehicle, JOIN.LEFT_OUTER,
+            on=(Container.delivered_by_large_scheduled_vehicle == delivering_vehicle.id)
+        ).switch(Container).join(
+            picking_up_truck, JOIN.LEFT_OUTER, on=(Container.picked_up_by_truck == picking_up_truck.id)
+        ).join(
+            picking_up_truck_arrival, JOIN.LEFT_OUTER,
+            on=(picking_up_truck.truck_arrival_information_for_pickup == picking_up_truck_arrival.id)
+        ).switch(Container).join(
+            picking_up_vehicle, JOIN.LEFT_OUTER,
+            on=(Container.picked_up_by_large_scheduled_vehicle == picking_up_vehicle.id)
+        ).order_by(Container.id)
+
+        # The rows are fetched without converting each value by its field, instead each column is converted at once
+        rows = database_proxy.execute(query).fetchall()
+        container_facts = pd.DataFrame.from_records(rows, columns=list(columns.keys()))
+
+        container_facts["id"] = container_facts["id"].astype("int64")
+        container_facts["length"] = container_facts["length"].map(
+            {container_length.value: container_length for container_length in ContainerLength}
+        ).astype(object)
+        container_facts.insert(2, "teu", container_facts["length"].map(CONTAINER_LENGTH_TO_OCCUPIED_TEU).astype(float))
+        container_facts["storage_requirement"] = container_facts["storage_requirement"].map(
+            {storage_requirement.value: storage_requirement for storage_requirement in StorageRequirement}
+        ).astype(object)
+        modes_of_transport = {mode_of_transport.value: mode_of_transport for mode_of_transport in ModeOfTransport}
+        for column in ("delivered_by", "picked_up_by_initial", "picked_up_by"):
+            container_facts[column] = container_facts[column].map(modes_of_transport).astype(object)
+        for column in cls.vehicle_id_columns + ("enters_yard", "leaves_yard"):
+            container_facts[column] = container_facts[column].astype("Int64")
+        return container_facts
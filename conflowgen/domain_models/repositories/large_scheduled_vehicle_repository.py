@@ -1,5 +1,7 @@
 import logging
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Iterable
+
+from peewee import fn, Value
 
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
@@ -31,7 +33,11 @@ class LargeScheduledVehicleRepository:
         for vehicle_type in ModeOfTransport.get_scheduled_vehicles():
             large_schedule_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
                 vehicle_type)
-            result[vehicle_type] = list(large_schedule_vehicle_as_subtype.select().join(LargeScheduledVehicle))
+            result[vehicle_type] = list(
+                large_schedule_vehicle_as_subtype.select(
+                    large_schedule_vehicle_as_subtype, LargeScheduledVehicle
+                ).join(LargeScheduledVehicle)
+            )
         return result
 
     def block_capacity_for_inbound_journey(
@@ -75,6 +81,49 @@ class LargeScheduledVehicleRepository:
         self.free_capacity_for_outbound_journey_buffer[vehicle] = new_free_capacity_in_teu
         return new_free_capacity_in_teu <= self.ignored_capacity
 
+    def load_free_capacities(
+            self,
+            vehicles: Iterable[AbstractLargeScheduledVehicle],
+            for_inbound_journey: bool = True,
+            for_outbound_journey: bool = True
+    ) -> None:
+        """Fills the free capacity caches of all provided vehicles at once. Instead of counting the containers of each
+        vehicle and container length separately, a single aggregate query collects the loaded containers of all
+        vehicles. For the outbound journey, the transportation buffer must have been set before.
+        """
+        vehicles = list(vehicles)
+        if len(vehicles) == 0 or not (for_inbound_journey or for_outbound_journey):
+            return
+        if for_outbound_journey:
+            assert self.transportation_buffer is not None, "First .set_transportation_buffer() must be invoked"
+
+        number_containers_for_inbound_journey: Dict[int, Dict[ContainerLength, int]] = {}
+        number_containers_for_outbound_journey: Dict[int, Dict[ContainerLength, int]] = {}
+        for large_scheduled_vehicle_id, is_inbound_journey, container_length, number_containers in (
+                self._get_number_containers_of_all_vehicles(for_inbound_journey, for_outbound_journey)
+        ):
+            number_containers_of_journey = (
+                number_containers_for_inbound_journey if is_inbound_journey
+                else number_containers_for_outbound_journey
+            )
+            number_containers_of_journey.setdefault(large_scheduled_vehicle_id, {})[container_length] = \
+                number_containers
+
+        for vehicle in vehicles:
+            large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
+            if for_inbound_journey:
+                self.free_capacity_for_inbound_journey_buffer[vehicle] = self._calculate_free_capacity_in_teu(
+                    vehicle=vehicle,
+                    maximum_capacity=large_scheduled_vehicle.moved_capacity,
+                    loaded_containers=number_containers_for_inbound_journey.get(large_scheduled_vehicle.id, {})
+                )
+            if for_outbound_journey:
+                self.free_capacity_for_outbound_journey_buffer[vehicle] = self._calculate_free_capacity_in_teu(
+                    vehicle=vehicle,
+                    maximum_capacity=self._get_maximum_capacity_for_outbound_journey(large_scheduled_vehicle),
+                    loaded_containers=number_containers_for_outbound_journey.get(large_scheduled_vehicle.id, {})
+                )
+
     def get_free_capacity_for_inbound_journey(self, vehicle: AbstractLargeScheduledVehicle) -> float:
         """Get the free capacity for the inbound journey on a vehicle that moves according to a schedule in TEU.
         """
@@ -102,12 +151,8 @@ class LargeScheduledVehicleRepository:
 
         large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
 
-        total_moved_capacity_for_onward_transportation_in_teu = \
-            large_scheduled_vehicle.moved_capacity * (1 + self.transportation_buffer)
-        maximum_capacity_of_vehicle = large_scheduled_vehicle.capacity_in_teu
-        total_moved_capacity_for_onward_transportation_in_teu = min(
-            total_moved_capacity_for_onward_transportation_in_teu,
-            maximum_capacity_of_vehicle
+        total_moved_capacity_for_onward_transportation_in_teu = self._get_maximum_capacity_for_outbound_journey(
+            large_scheduled_vehicle
         )
 
         free_capacity_in_teu = self._get_free_capacity_in_teu(
@@ -118,22 +163,50 @@ class LargeScheduledVehicleRepository:
         self.free_capacity_for_outbound_journey_buffer[vehicle] = free_capacity_in_teu
         return free_capacity_in_teu
 
-    @staticmethod
+    def _get_maximum_capacity_for_outbound_journey(self, large_scheduled_vehicle: LargeScheduledVehicle) -> float:
+        return self.get_maximum_capacity_for_outbound_journey(
+            moved_capacity=large_scheduled_vehicle.moved_capacity,
+            capacity_in_teu=large_scheduled_vehicle.capacity_in_teu
+        )
+
+    def get_maximum_capacity_for_outbound_journey(self, moved_capacity: int, capacity_in_teu: int) -> float:
+        """The capacity in TEU a vehicle offers for its outbound journey, considering the transportation buffer."""
+        total_moved_capacity_for_onward_transportation_in_teu = moved_capacity * (1 + self.transportation_buffer)
+        maximum_capacity_of_vehicle = capacity_in_teu
+        return min(
+            total_moved_capacity_for_onward_transportation_in_teu,
+            maximum_capacity_of_vehicle
+        )
+
+    @classmethod
     def _get_free_capacity_in_teu(
+            cls,
             vehicle: AbstractLargeScheduledVehicle,
             maximum_capacity: int,
             container_counter: Callable[[AbstractLargeScheduledVehicle, ContainerLength], int]
     ) -> float:
-        loaded_20_foot_containers = container_counter(vehicle, ContainerLength.twenty_feet)
-        loaded_40_foot_containers = container_counter(vehicle, ContainerLength.forty_feet)
-        loaded_45_foot_containers = container_counter(vehicle, ContainerLength.forty_five_feet)
-        loaded_other_containers = container_counter(vehicle, ContainerLength.other)
-        free_capacity_in_teu = (
-                maximum_capacity
-                - loaded_20_foot_containers * ContainerLength.get_factor(ContainerLength.twenty_feet)
-                - loaded_40_foot_containers * ContainerLength.get_factor(ContainerLength.forty_feet)
-                - loaded_45_foot_containers * ContainerLength.get_factor(ContainerLength.forty_five_feet)
-                - loaded_other_containers * ContainerLength.get_factor(ContainerLength.other)
+        loaded_containers = {
+            container_length: container_counter(vehicle, container_length)
+            for container_length in ContainerLength
+        }
+        return cls._calculate_free_capacity_in_teu(
+            vehicle=vehicle,
+            maximum_capacity=maximum_capacity,
+            loaded_containers=loaded_containers
+        )
+
+    @staticmethod
+    def _calculate_free_capacity_in_teu(
+            vehicle: AbstractLargeScheduledVehicle,
+            maximum_capacity: float,
+            loaded_containers: Dict[ContainerLength, int]
+    ) -> float:
+        loaded_20_foot_containers = loaded_containers.get(ContainerLength.twenty_feet, 0)
+        loaded_40_foot_containers = loaded_containers.get(ContainerLength.forty_feet, 0)
+        loaded_45_foot_containers = loaded_containers.get(ContainerLength.forty_five_feet, 0)
+        loaded_other_containers = loaded_containers.get(ContainerLength.other, 0)
+        free_capacity_in_teu = LargeScheduledVehicleRepository.subtract_loaded_containers(
+            maximum_capacity, loaded_containers
         )
         assert free_capacity_in_teu >= 0, f"vehicle {vehicle} of type {vehicle.get_mode_of_transport()} with the " \
                                           f"name '{vehicle.large_scheduled_vehicle.vehicle_name}' " \
@@ -146,6 +219,58 @@ class LargeScheduledVehicleRepository:
                                           f"loaded_other_containers: {loaded_other_containers}"
         return free_capacity_in_teu
 
+    @staticmethod
+    def subtract_loaded_containers(maximum_capacity: float, loaded_containers: Dict[ContainerLength, int]) -> float:
+        """Returns the capacity in TEU which is left after loading the given number of containers of each length."""
+        return (
+            maximum_capacity
+            - loaded_containers.get(ContainerLength.twenty_feet, 0) * ContainerLength.get_factor(
+                ContainerLength.twenty_feet)
+            - loaded_containers.get(ContainerLength.forty_feet, 0) * ContainerLength.get_factor(
+                ContainerLength.forty_feet)
+            - loaded_containers.get(ContainerLength.forty_five_feet, 0) * ContainerLength.get_factor(
+                ContainerLength.forty_five_feet)
+            - loaded_containers.get(ContainerLength.other, 0) * ContainerLength.get_factor(ContainerLength.other)
+        )
+
+    @staticmethod
+    def _get_number_containers_of_all_vehicles(
+            for_inbound_journey: bool,
+            for_outbound_journey: bool
+    ) -> Iterable[tuple]:
+        """Returns the number of containers of each container length for each vehicle in the form
+        (large scheduled vehicle id, is inbound journey, container length, number of containers).
+        """
+        queries = []
+        if for_inbound_journey:
+            queries.append(Container.select(
+                Container.delivered_by_large_scheduled_vehicle,
+                Value(True),
+                Container.length,
+                fn.COUNT(Container.id)
+            ).where(
+                Container.delivered_by_large_scheduled_vehicle.is_null(False)
+            ).group_by(
+                Container.delivered_by_large_scheduled_vehicle,
+                Container.length
+            ))
+        if for_outbound_journey:
+            queries.append(Container.select(
+                Container.picked_up_by_large_scheduled_vehicle,
+                Value(False),
+                Container.length,
+                fn.COUNT(Container.id)
+            ).where(
+                Container.picked_up_by_large_scheduled_vehicle.is_null(False)
+            ).group_by(
+                Container.picked_up_by_large_scheduled_vehicle,
+                Container.length
+            ))
+        query = queries[0]
+        for further_query in queries[1:]:
+            query = query.union_all(further_query)
+        return query.tuples()
+
     @classmethod
     def _get_number_containers_for_outbound_journey(
             cls,
@@ -1,23 +1,158 @@
+from __future__ import annotations
+
+import bisect
 import datetime
-from typing import List
+from typing import List, Dict, Iterable, Callable, Tuple
 import logging
 
+import numpy as np
+
 from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.container_length import ContainerLength, CONTAINER_LENGTH_TO_OCCUPIED_TEU
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.repositories.large_scheduled_vehicle_repository import LargeScheduledVehicleRepository
 from conflowgen.domain_models.vehicle import LargeScheduledVehicle, AbstractLargeScheduledVehicle
+from conflowgen.tools.weighted_sampler import WeightedSampler
+
+
+class DepartingVehicleIndex:
+    """
+    Keeps all vehicles of one vehicle type sorted by their scheduled arrival. This way, the vehicles arriving within a
+    time range are found by bisection in memory instead of querying the database. For each possible container length,
+    the vehicles which can still load such a container are weighted by their free capacity so that a vehicle within a
+    time range can be drawn without looking at each candidate.
+
+    By default, the vehicles are model instances. Any other hashable representation of a vehicle, e.g. its position in
+    a column, works as well if the scheduled arrival can be looked up for it.
+    """
+
+    required_capacities_in_teu = sorted(set(CONTAINER_LENGTH_TO_OCCUPIED_TEU.values()))
+
+    def __init__(
+            self,
+            vehicles: Iterable[AbstractLargeScheduledVehicle],
+            get_free_capacity: Callable[[AbstractLargeScheduledVehicle], float],
+            random_number_generator: np.random.Generator | None = None,
+            get_scheduled_arrival: Callable[[AbstractLargeScheduledVehicle], datetime.datetime] | None = None
+    ):
+        if get_scheduled_arrival is None:
+            get_scheduled_arrival = self._get_scheduled_arrival_of_model_instance
+        vehicles_sorted_by_arrival = sorted(vehicles, key=get_scheduled_arrival)
+        self.scheduled_arrivals: List[datetime.datetime] = [
+            get_scheduled_arrival(vehicle) for vehicle in vehicles_sorted_by_arrival
+        ]
+        self.vehicles: List[AbstractLargeScheduledVehicle] = vehicles_sorted_by_arrival
+        free_capacities = [get_free_capacity(vehicle) for vehicle in vehicles_sorted_by_arrival]
+        self.samplers: Dict[float, WeightedSampler] = {
+            required_capacity_in_teu: WeightedSampler(
+                vehicles_sorted_by_arrival,
+                [
+                    self._get_weight(free_capacity_in_teu, required_capacity_in_teu)
+                    for free_capacity_in_teu in free_capacities
+                ],
+                random_number_generator=random_number_generator
+            )
+            for required_capacity_in_teu in self.required_capacities_in_teu
+        }
+        # a vehicle that can not even load the smallest container is as good as removed
+        self.sampler_of_all_vehicles = self.samplers[self.required_capacities_in_teu[0]]
+
+    @staticmethod
+    def _get_scheduled_arrival_of_model_instance(vehicle: AbstractLargeScheduledVehicle) -> datetime.datetime:
+        return vehicle.large_scheduled_vehicle.scheduled_arrival
+
+    @staticmethod
+    def _get_weight(free_capacity_in_teu: float, required_capacity_in_teu: float) -> float:
+        return free_capacity_in_teu if free_capacity_in_teu >= required_capacity_in_teu else 0
+
+    def __len__(self) -> int:
+        return len(self.sampler_of_all_vehicles)
+
+    def _get_positions(self, start: datetime.datetime, end: datetime.datetime) -> Tuple[int, int]:
+        """Both start and end are inclusive, the same as in the SQL query this replaces."""
+        return bisect.bisect_left(self.scheduled_arrivals, start), bisect.bisect_right(self.scheduled_arrivals, end)
+
+    def get_vehicles_arriving_between(
+            self,
+            start: datetime.datetime,
+            end: datetime.datetime
+    ) -> List[AbstractLargeScheduledVehicle]:
+        index_of_first_vehicle, index_after_last_vehicle = self._get_positions(start, end)
+        return [
+            vehicle for vehicle in self.vehicles[index_of_first_vehicle:index_after_last_vehicle]
+            if self.sampler_of_all_vehicles.get_weight(vehicle) > 0
+        ]
+
+    def pick_vehicle_arriving_between(
+            self,
+            start: datetime.datetime,
+            end: datetime.datetime,
+            required_capacity_in_teu: float
+    ) -> AbstractLargeScheduledVehicle | None:
+        """Picks a vehicle with the probability of its free capacity among all vehicles which arrive within the time
+        range and have sufficient free capacity left."""
+        index_of_first_vehicle, index_after_last_vehicle = self._get_positions(start, end)
+        return self.samplers[required_capacity_in_teu].sample(index_of_first_vehicle, index_after_last_vehicle)
+
+    def update(self, vehicle: AbstractLargeScheduledVehicle, free_capacity_in_teu: float) -> None:
+        for required_capacity_in_teu, sampler in self.samplers.items():
+            sampler.update(vehicle, self._get_weight(free_capacity_in_teu, required_capacity_in_teu))
+
+    def remove(self, vehicle: AbstractLargeScheduledVehicle) -> None:
+        for sampler in self.samplers.values():
+            sampler.remove(vehicle)
 
 
 class ScheduleRepository:
 
+    # a vehicle with less free capacity than this can not take any further container
+    smallest_required_capacity_in_teu = min(CONTAINER_LENGTH_TO_OCCUPIED_TEU.values())
+
     def __init__(self):
         self.logger = logging.getLogger("conflowgen")
         self.large_scheduled_vehicle_repository = LargeScheduledVehicleRepository()
+        self.departing_vehicle_indices: Dict[ModeOfTransport, DepartingVehicleIndex] | None = None
+        self.random_number_generator = np.random.default_rng()
+
+    def set_random_number_generator(self, random_number_generator: np.random.Generator) -> None:
+        self.random_number_generator = random_number_generator
 
     def set_transportation_buffer(self, transportation_buffer: float):
         self.large_scheduled_vehicle_repository.set_transportation_buffer(transportation_buffer)
 
+    def build_departure_index(self) -> None:
+        """Loads all vehicles once and keeps them sorted by arrival in memory. As long as the index exists,
+        :meth:`.get_departing_vehicles` does not query the database anymore. This requires that no vehicles are added,
+        removed, or rescheduled while the index is in use, i.e. it should only live as long as a generation step.
+        """
+        vehicles_of_types = self.large_scheduled_vehicle_repository.load_all_vehicles()
+        self.large_scheduled_vehicle_repository.load_free_capacities(
+            (vehicle for vehicles in vehicles_of_types.values() for vehicle in vehicles),
+            for_inbound_journey=False
+        )
+        self.departing_vehicle_indices = {}
+        for vehicle_type, vehicles in vehicles_of_types.items():
+            vehicles_with_free_capacity = [
+                vehicle for vehicle in vehicles
+                if (self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
+                    >= self.smallest_required_capacity_in_teu)
+            ]
+            self.departing_vehicle_indices[vehicle_type] = DepartingVehicleIndex(
+                vehicles_with_free_capacity,
+                self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey,
+                random_number_generator=self.random_number_generator
+            )
+        self.logger.debug("Departure index of vehicles adhering to a schedule has been built.")
+
+    def set_departure_index(self, departing_vehicle_indices: Dict[ModeOfTransport, DepartingVehicleIndex]) -> None:
+        """Uses indices which have been built elsewhere, e.g. from vehicles which only exist in memory. As long as the
+        index is set, :meth:`.pick_departing_vehicle` returns the vehicles in the representation of the index.
+        """
+        self.departing_vehicle_indices = departing_vehicle_indices
+
+    def reset_departure_index(self) -> None:
+        self.departing_vehicle_indices = None
+
     def get_departing_vehicles(
             self,
             start: datetime.datetime,
@@ -29,16 +164,21 @@ class ScheduleRepository:
         """
         assert start <= end
 
-        # Get type, i.e. Feeder, DeepSeaVessel, etc.
-        large_scheduled_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
-            vehicle_type
-        )
+        if self.departing_vehicle_indices is not None:
+            vehicles = self.departing_vehicle_indices[vehicle_type].get_vehicles_arriving_between(start, end)
+        else:
+            # Get type, i.e. Feeder, DeepSeaVessel, etc.
+            large_scheduled_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
+                vehicle_type
+            )
 
-        # Get all vehicles in the time range
-        vehicles = large_scheduled_vehicle_as_subtype.select().join(LargeScheduledVehicle).where(
-            (large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.scheduled_arrival >= start)
-            & (large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.scheduled_arrival <= end)
-        )
+            # Get all vehicles in the time range
+            vehicles = large_scheduled_vehicle_as_subtype.select(
+                large_scheduled_vehicle_as_subtype, LargeScheduledVehicle
+            ).join(LargeScheduledVehicle).where(
+                (large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.scheduled_arrival >= start)
+                & (large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.scheduled_arrival <= end)
+            )
 
         # Check for each of the vehicles how much it has already loaded
         required_capacity_in_teu = ContainerLength.get_factor(required_capacity)
@@ -57,6 +197,34 @@ class ScheduleRepository:
 
         return vehicles_with_sufficient_capacity
 
+    def pick_departing_vehicle(
+            self,
+            start: datetime.datetime,
+            end: datetime.datetime,
+            vehicle_type: ModeOfTransport,
+            required_capacity: ContainerLength
+    ) -> AbstractLargeScheduledVehicle | None:
+        """Picks one of the available vehicles with the probability of its free capacity.
+
+        Returns:
+            The picked vehicle or None if no vehicle is available
+        """
+        assert start <= end
+        if self.departing_vehicle_indices is not None:
+            return self.departing_vehicle_indices[vehicle_type].pick_vehicle_arriving_between(
+                start, end, ContainerLength.get_factor(required_capacity)
+            )
+        available_vehicles = self.get_departing_vehicles(start, end, vehicle_type, required_capacity)
+        if len(available_vehicles) == 0:
+            return None
+        free_capacities = np.array([
+            self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
+            for vehicle in available_vehicles
+        ], dtype=np.float64)
+        return available_vehicles[
+            self.random_number_generator.choice(len(available_vehicles), p=free_capacities / free_capacities.sum())
+        ]
+
     def block_capacity_for_outbound_journey(
             self,
             vehicle: AbstractLargeScheduledVehicle,
@@ -64,7 +232,13 @@ class ScheduleRepository:
     ) -> bool:
         """Updates the cache for faster execution
         """
-        return self.large_scheduled_vehicle_repository.block_capacity_for_outbound_journey(
+        vehicle_capacity_is_exhausted = self.large_scheduled_vehicle_repository.block_capacity_for_outbound_journey(
             vehicle=vehicle,
             container=container
         )
+        if self.departing_vehicle_indices is not None:
+            free_capacity_in_teu = self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(
+                vehicle
+            )
+            self.departing_vehicle_indices[vehicle.get_mode_of_transport()].update(vehicle, free_capacity_in_teu)
+        return vehicle_capacity_is_exhausted
@@ -1,7 +1,8 @@
 from __future__ import annotations
 import logging
-import random
-from typing import Dict
+from typing import Dict, List, Hashable, Callable
+
+import numpy as np
 
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_repositories.mode_of_transport_distribution_repository import \
@@ -10,7 +11,8 @@ from conflowgen.domain_models.factories.container_factory import ContainerFactor
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.repositories.large_scheduled_vehicle_repository import LargeScheduledVehicleRepository
-from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle
+from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle, LargeScheduledVehicle
+from conflowgen.tools.weighted_sampler import WeightedSampler
 
 
 class AllocateSpaceForContainersDeliveredByTruckService:
@@ -22,9 +24,16 @@ class AllocateSpaceForContainersDeliveredByTruckService:
         self.mode_of_transport_distribution_repository = ModeOfTransportDistributionRepository()
         self.mode_of_transport_distribution: Dict[ModeOfTransport, Dict[ModeOfTransport, float]] | None = None
         self.large_scheduled_vehicle_repository = LargeScheduledVehicleRepository()
-        self.container_factory = ContainerFactory()
-
-    def reload_distribution(self, transportation_buffer: float):
+        self.random_number_generator = np.random.default_rng()
+        self.container_factory = ContainerFactory(random_number_generator=self.random_number_generator)
+
+    def reload_distribution(
+            self,
+            transportation_buffer: float,
+            random_number_generator: np.random.Generator | None = None
+    ):
+        self.random_number_generator = random_number_generator or np.random.default_rng()
+        self.container_factory.random_number_generator = self.random_number_generator
         self.mode_of_transport_distribution = self.mode_of_transport_distribution_repository.get_distribution()
         self.large_scheduled_vehicle_repository.set_transportation_buffer(
             transportation_buffer=transportation_buffer
@@ -50,17 +59,69 @@ class AllocateSpaceForContainersDeliveredByTruckService:
         """Allocates space for containers on vehicles that are delivered by trucks.
         """
         self.container_factory.reload_distributions()
+        self.large_scheduled_vehicle_repository.reset_cache()
+
+        number_containers_to_allocate = self._get_number_containers_to_allocate()
+
+        vehicles = self.large_scheduled_vehicle_repository.load_all_vehicles()
+        self.large_scheduled_vehicle_repository.load_free_capacities(
+            (vehicle for vehicles_of_type in vehicles.values() for vehicle in vehicles_of_type),
+            for_inbound_journey=False
+        )
+        free_capacities = {
+            vehicle: self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
+            for vehicles_of_type in vehicles.values()
+            for vehicle in vehicles_of_type
+        }
+
+        self.allocate_on_vehicles(
+            number_containers_to_allocate=number_containers_to_allocate,
+            vehicles=vehicles,
+            free_capacities=free_capacities,
+            create_container=self._create_container,
+            mark_capacity_as_exhausted=self._mark_capacity_as_exhausted
+        )
+
+        self.logger.info("All containers that need to be delivered by truck have been assigned to a vehicle that moves "
+                         "according to a schedule.")
+
+    def _create_container(self, vehicle: AbstractLargeScheduledVehicle) -> ContainerLength:
+        container = self.container_factory.create_container_for_delivering_truck(vehicle)
+        return container.length
+
+    @staticmethod
+    def _mark_capacity_as_exhausted(vehicle: AbstractLargeScheduledVehicle) -> None:
+        large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
+        large_scheduled_vehicle.capacity_exhausted_while_allocating_space_for_export_containers = True
+        large_scheduled_vehicle.save()
+
+    def allocate_on_vehicles(
+            self,
+            number_containers_to_allocate: int,
+            vehicles: Dict[ModeOfTransport, List[Hashable]],
+            free_capacities: Dict[Hashable, float],
+            create_container: Callable[[Hashable], ContainerLength],
+            mark_capacity_as_exhausted: Callable[[Hashable], None]
+    ) -> None:
+        """Draws the vehicles the containers delivered by truck are picked up by. The vehicles can be model instances
+        or any other hashable representation.
+
+        Args:
+            number_containers_to_allocate: The number of containers which are at most allocated
+            vehicles: The vehicles of each vehicle type
+            free_capacities: The free capacity of each vehicle for its outbound journey, updated in place
+            create_container: Creates a container picked up by the vehicle and returns its length
+            mark_capacity_as_exhausted: Is invoked for each vehicle that is no further tried
+        """
         truck_to_other_vehicle_distribution: Dict[ModeOfTransport, float] = \
             self.mode_of_transport_distribution[ModeOfTransport.truck].copy()
         if truck_to_other_vehicle_distribution[ModeOfTransport.truck] > 0:
             raise NotImplementedError()
 
-        self.large_scheduled_vehicle_repository.reset_cache()
-
-        number_containers_to_allocate = self._get_number_containers_to_allocate()
+        self.container_factory.start_session_for_containers_delivered_by_truck(number_containers_to_allocate)
 
         # A list of vehicles that have free capacity for further containers. The entries are removed in a lazy fashion.
-        vehicles = self.large_scheduled_vehicle_repository.load_all_vehicles()
+        vehicles = dict(vehicles)
 
         for vehicle_type, frequency in list(truck_to_other_vehicle_distribution.items()):
             if vehicle_type not in vehicles:  # this class is only concerned about large scheduled vehicles
@@ -70,6 +131,16 @@ class AllocateSpaceForContainersDeliveredByTruckService:
                 del vehicles[vehicle_type]
                 del truck_to_other_vehicle_distribution[vehicle_type]
 
+        # Make it more likely that a container ends up on a large vessel than on a smaller one
+        vehicle_samplers: Dict[ModeOfTransport, WeightedSampler] = {
+            vehicle_type: WeightedSampler(
+                vehicles_of_type,
+                [free_capacities[vehicle] for vehicle in vehicles_of_type],
+                random_number_generator=self.random_number_generator
+            )
+            for vehicle_type, vehicles_of_type in vehicles.items()
+        }
+
         abort = False
 
         for i in range(number_containers_to_allocate):
@@ -98,51 +169,39 @@ class AllocateSpaceForContainersDeliveredByTruckService:
                 ]
 
                 # pick vehicle type
-                vehicle_type: ModeOfTransport = random.choices(
-                    population=vehicle_types,
-                    weights=frequency_of_vehicle_types
-                )[0]
-                vehicles_of_type = vehicles[vehicle_type]
-                if len(vehicles_of_type) == 0:  # Ensure that if no vehicle is left, this mode of transport is ignored
+                vehicle_type: ModeOfTransport = vehicle_types[
+                    self.random_number_generator.choice(len(vehicle_types), p=frequency_of_vehicle_types)
+                ]
+                vehicle_sampler = vehicle_samplers[vehicle_type]
+                # Ensure that if no vehicle with free capacity is left, this mode of transport is ignored
+                if len(vehicle_sampler) == 0:
                     del truck_to_other_vehicle_distribution[vehicle_type]
                     self.logger.info(f"Vehicle type '{vehicle_type}' is exhausted and is no further tried. This "
                                      f"happened at container number {i} of {number_containers_to_allocate} (i.e., "
                                      f"at {(i / number_containers_to_allocate * 100):.2f}%).")
                     continue  # try again with another vehicle type (refers to while loop)
 
-                # Make it more likely that a container ends up on a large vessel than on a smaller one
-                vehicle_distribution = {
-                    vehicle: self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
-                    for vehicle in vehicles_of_type
-                }
-                all_free_capacities = list(vehicle_distribution.values())
-                if sum(all_free_capacities) == 0:  # if there is no free vehicles left of a certain type...
-                    del truck_to_other_vehicle_distribution[vehicle_type]   # drop this type and...
-                    continue  # try again
-                vehicle: AbstractLargeScheduledVehicle = random.choices(
-                    population=list(vehicle_distribution.keys()),
-                    weights=list(vehicle_distribution.values())
-                )[0]
-
-                free_capacity_of_vehicle = self.large_scheduled_vehicle_repository.\
-                    get_free_capacity_for_outbound_journey(vehicle)
+                vehicle = vehicle_sampler.sample()
+
+                free_capacity_of_vehicle = free_capacities[vehicle]
                 if free_capacity_of_vehicle <= self.ignored_capacity:
-                    large_scheduled_vehicle: AbstractLargeScheduledVehicle = vehicle.large_scheduled_vehicle
-                    large_scheduled_vehicle.capacity_exhausted_while_allocating_space_for_export_containers = True
-                    large_scheduled_vehicle.save()
-                    vehicles_of_type.remove(vehicle)  # Ignore the vehicle which would be overloaded if chosen
-                    vehicle_name: str = vehicle.large_scheduled_vehicle.vehicle_name
-                    self.logger.debug(f"Vehicle '{vehicle_name}' of type '{vehicle_type}' has no remaining capacity "
-                                      f"and is no further tried - free capacity of {free_capacity_of_vehicle:.2f} "
-                                      f"TEU is less than the required {self.ignored_capacity} TEU.")
+                    mark_capacity_as_exhausted(vehicle)
+                    vehicle_sampler.remove(vehicle)  # Ignore the vehicle which would be overloaded if chosen
+                    self.logger.debug(f"A vehicle of type '{vehicle_type}' has no remaining capacity and is no "
+                                      f"further tried - free capacity of {free_capacity_of_vehicle:.2f} TEU is less "
+                                      f"than the required {self.ignored_capacity} TEU.")
                     continue  # try again (possibly new vehicle type, definitely not same vehicle again)
 
-                container = self.container_factory.create_container_for_delivering_truck(vehicle)
-                self.large_scheduled_vehicle_repository.block_capacity_for_outbound_journey(vehicle, container)
+                container_length = create_container(vehicle)
+                used_capacity_in_teu = ContainerLength.get_factor(container_length)
+                assert free_capacity_of_vehicle >= used_capacity_in_teu, \
+                    f"A vehicle of type '{vehicle_type}' is overloaded, free capacity in TEU: " \
+                    f"{free_capacity_of_vehicle}, used capacity in TEU: {used_capacity_in_teu}"
+                free_capacities[vehicle] = free_capacity_of_vehicle - used_capacity_in_teu
+                vehicle_sampler.update(vehicle, free_capacities[vehicle])
                 break  # success, no further looping to search for a suitable vehicle
 
             if abort:  # Not enough vehicles of any kind could be found
                 break  # break out of for loop
 
-        self.logger.info("All containers that need to be delivered by truck have been assigned to a vehicle that moves "
-                         "according to a schedule.")
+        self.container_factory.end_session_for_containers_delivered_by_truck()
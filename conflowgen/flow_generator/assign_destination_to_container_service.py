@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import logging
-import random
-from typing import Iterable, Dict
+from typing import Iterable, Dict, List
+
+import numpy as np
 
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_repositories.container_destination_distribution_repository import \
     ContainerDestinationDistributionRepository
 from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
 from conflowgen.domain_models.vehicle import LargeScheduledVehicle
+from conflowgen.tools.bulk_operations import update_field_in_bulk
 
 
 class AssignDestinationToContainerService:
@@ -18,9 +20,11 @@ class AssignDestinationToContainerService:
     def __init__(self):
         self.repository = ContainerDestinationDistributionRepository()
         self.distribution: Dict[Schedule, Dict[Destination, float]] | None = None
+        self.random_number_generator = np.random.default_rng()
         self.reload_distribution()
 
-    def reload_distribution(self):
+    def reload_distribution(self, random_number_generator: np.random.Generator | None = None):
+        self.random_number_generator = random_number_generator or np.random.default_rng()
         self.distribution = self.repository.get_distribution()
         self.logger.debug("Loading destination distribution...")
         for schedule, distribution_for_schedule in self.distribution.items():
@@ -37,32 +41,52 @@ class AssignDestinationToContainerService:
         in the following. This step can only be done if the next destinations of the vehicle are determined in the
         schedule (this is an optional user input). The frequency is expressed in boxes.
         """
-        destination_with_distinct_schedules: Iterable[Destination] = Destination.select(
-            Destination.belongs_to_schedule).distinct()
-        schedules = [
-            destination.belongs_to_schedule
-            for destination in destination_with_distinct_schedules  # pylint: disable=not-an-iterable
-        ]
+        schedules = self.get_schedules_with_destinations()
         schedule: Schedule
         number_iterations = len(schedules)
         for i, schedule in enumerate(schedules):
             self.logger.debug(f"Assign destinations to containers that leave the terminal with the service "
                               f"'{schedule.service_name}' of the vehicle type {schedule.vehicle_type}, "
                               f"progress: {i+1} / {number_iterations} ({100*(i + 1)/number_iterations:.2f}%)")
-            containers_moving_according_to_schedule: Iterable[Container] = Container.select().join(
-                LargeScheduledVehicle, on=Container.picked_up_by_large_scheduled_vehicle
-            ).where(
-                Container.picked_up_by_large_scheduled_vehicle.schedule == schedule
+            ids_of_containers_moving_according_to_schedule: List[int] = [
+                container_id for (container_id, ) in Container.select(Container.id).join(
+                    LargeScheduledVehicle, on=Container.picked_up_by_large_scheduled_vehicle
+                ).where(
+                    LargeScheduledVehicle.schedule == schedule
+                ).order_by(Container.id).tuples()
+            ]
+            sampled_destinations = self.sample_destinations(
+                schedule, len(ids_of_containers_moving_according_to_schedule)
+            )
+            update_field_in_bulk(
+                Container,
+                Container.destination,
+                {
+                    container_id: sampled_destination.id
+                    for container_id, sampled_destination in zip(
+                        ids_of_containers_moving_according_to_schedule, sampled_destinations
+                    )
+                }
             )
-            distribution_for_schedule = self.distribution[schedule]
-            destinations = list(distribution_for_schedule.keys())
-            frequency_of_destinations = list(distribution_for_schedule.values())
 
-            container: Container
-            for container in containers_moving_according_to_schedule:
-                sampled_destination = random.choices(
-                    population=destinations,
-                    weights=frequency_of_destinations
-                )[0]
-                container.destination = sampled_destination
-                container.save()
+    @staticmethod
+    def get_schedules_with_destinations() -> List[Schedule]:
+        destination_with_distinct_schedules: Iterable[Destination] = Destination.select(
+            Destination.belongs_to_schedule).distinct()
+        return [
+            destination.belongs_to_schedule
+            for destination in destination_with_distinct_schedules  # pylint: disable=not-an-iterable
+        ]
+
+    def sample_destinations(self, schedule: Schedule, number_of_containers: int) -> List[Destination]:
+        """Draws the next destination of each container leaving the terminal with a vehicle of the schedule."""
+        distribution_for_schedule = self.distribution[schedule]
+        destinations = list(distribution_for_schedule.keys())
+        frequency_of_destinations = np.array(list(distribution_for_schedule.values()), dtype=np.float64)
+        probability_of_destinations = frequency_of_destinations / frequency_of_destinations.sum()
+        return [
+            destinations[destination_index]
+            for destination_index in self.random_number_generator.choice(
+                len(destinations), size=number_of_containers, p=probability_of_destinations
+            )
+        ]
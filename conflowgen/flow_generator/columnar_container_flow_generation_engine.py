@@ -0,0 +1,544 @@
+"""
+Generates the container flow in memory. Containers, vehicles, and trucks are kept as NumPy structured arrays and are
+only written to the database once all phases are completed.
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+from typing import List, Dict, Sequence, Any
+
+import numpy as np
+
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForPickup, \
+    TruckArrivalInformationForDelivery
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.repositories.large_scheduled_vehicle_repository import LargeScheduledVehicleRepository
+from conflowgen.domain_models.repositories.schedule_repository import DepartingVehicleIndex, ScheduleRepository
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, AbstractLargeScheduledVehicle, Truck
+from conflowgen.flow_generator.allocate_space_for_containers_delivered_by_truck_service import \
+    AllocateSpaceForContainersDeliveredByTruckService
+from conflowgen.flow_generator.assign_destination_to_container_service import AssignDestinationToContainerService
+from conflowgen.flow_generator.large_scheduled_vehicle_creation_service import LargeScheduledVehicleCreationService
+from conflowgen.flow_generator.large_scheduled_vehicle_for_onward_transportation_manager import \
+    LargeScheduledVehicleForOnwardTransportationManager
+from conflowgen.flow_generator.truck_for_export_containers_manager import TruckForExportContainersManager
+from conflowgen.flow_generator.truck_for_import_containers_manager import TruckForImportContainersManager
+from conflowgen.tools.bulk_operations import insert_many, insert_many_and_get_ids
+
+# Enum members are stored by their position in these lists
+MODES_OF_TRANSPORT: List[ModeOfTransport] = list(ModeOfTransport)
+CONTAINER_LENGTHS: List[ContainerLength] = list(ContainerLength)
+STORAGE_REQUIREMENTS: List[StorageRequirement] = list(StorageRequirement)
+
+CODE_OF_MODE_OF_TRANSPORT: Dict[ModeOfTransport, int] = {
+    mode_of_transport: code for code, mode_of_transport in enumerate(MODES_OF_TRANSPORT)
+}
+CODE_OF_CONTAINER_LENGTH: Dict[ContainerLength, int] = {
+    container_length: code for code, container_length in enumerate(CONTAINER_LENGTHS)
+}
+CODE_OF_STORAGE_REQUIREMENT: Dict[StorageRequirement, int] = {
+    storage_requirement: code for code, storage_requirement in enumerate(STORAGE_REQUIREMENTS)
+}
+
+# References between the arrays are stored as positions, a missing reference is marked by this value
+NO_ROW = -1
+
+VEHICLE_DTYPE = np.dtype([
+    ("vehicle_type", np.int8),
+    ("schedule", np.int64),
+    ("capacity_in_teu", np.int64),
+    ("moved_capacity", np.int64),
+    ("scheduled_arrival", "datetime64[us]"),
+    ("capacity_exhausted_while_determining_onward_transportation", np.bool_),
+    ("capacity_exhausted_while_allocating_space_for_export_containers", np.bool_),
+])
+
+CONTAINER_DTYPE = np.dtype([
+    ("weight", np.int64),
+    ("length", np.int8),
+    ("storage_requirement", np.int8),
+    ("delivered_by", np.int8),
+    ("picked_up_by_initial", np.int8),
+    ("picked_up_by", np.int8),
+    ("delivered_by_large_scheduled_vehicle", np.int64),
+    ("delivered_by_truck", np.int64),
+    ("picked_up_by_large_scheduled_vehicle", np.int64),
+    ("picked_up_by_truck", np.int64),
+    ("destination", np.int64),  # the id of the destination as the destinations are not generated
+    ("emergency_pickup", np.bool_),
+])
+
+TRUCK_DTYPE = np.dtype([
+    ("delivers_container", np.bool_),
+    ("picks_up_container", np.bool_),
+    ("arrival", "datetime64[us]"),
+])
+
+
+class ColumnarContainerFlowGenerationEngine:
+    """
+    Runs the same phases as the default engine and draws from the same random number generators in the same order.
+    Thus, the same container flow is generated for the same seed. Each phase reads and writes columns in memory instead
+    of the database and the vehicle that a container is assigned to is referenced by its position in the array of
+    vehicles. All decisions are delegated to the same services the default engine uses, only the storage differs.
+    """
+
+    def __init__(
+            self,
+            large_scheduled_vehicle_creation_service: LargeScheduledVehicleCreationService,
+            large_scheduled_vehicle_for_onward_transportation_manager:
+            LargeScheduledVehicleForOnwardTransportationManager,
+            truck_for_import_containers_manager: TruckForImportContainersManager,
+            allocate_space_for_containers_delivered_by_truck_service: AllocateSpaceForContainersDeliveredByTruckService,
+            truck_for_export_containers_manager: TruckForExportContainersManager,
+            assign_destination_to_container_service: AssignDestinationToContainerService
+    ):
+        self.logger = logging.getLogger("conflowgen")
+        self.large_scheduled_vehicle_creation_service = large_scheduled_vehicle_creation_service
+        self.large_scheduled_vehicle_for_onward_transportation_manager = \
+            large_scheduled_vehicle_for_onward_transportation_manager
+        self.truck_for_import_containers_manager = truck_for_import_containers_manager
+        self.allocate_space_for_containers_delivered_by_truck_service = \
+            allocate_space_for_containers_delivered_by_truck_service
+        self.truck_for_export_containers_manager = truck_for_export_containers_manager
+        self.assign_destination_to_container_service = assign_destination_to_container_service
+
+        self.vehicles = np.zeros(0, dtype=VEHICLE_DTYPE)
+        self.vehicle_names: List[str] = []
+        self.containers = np.zeros(0, dtype=CONTAINER_DTYPE)
+        self.trucks = np.zeros(0, dtype=TRUCK_DTYPE)
+
+    def generate(self, number_of_processes: int = 1) -> None:
+        """Runs all phases in memory. Nothing is written to the database.
+
+        Args:
+            number_of_processes: The number of processes which create the vehicles and their containers in parallel
+        """
+        self.logger.info("Create fleet including their delivered containers for given time range for each schedule...")
+        self._create_fleet(number_of_processes)
+        self.logger.info("Assign containers arriving by vehicles adhering a schedule for onward transportation...")
+        self._choose_departing_vehicles_for_containers()
+        self.logger.info("Generate trucks that pick up containers...")
+        self._generate_trucks_for_picking_up()
+        self.logger.info("Generate containers that are delivered by trucks...")
+        self._allocate_space_for_containers_delivered_by_truck()
+        self.logger.info("Generate trucks that deliver containers...")
+        self._generate_trucks_for_delivering()
+        self.logger.info("Assign containers to next destinations...")
+        self._assign_destinations()
+        self.logger.info(f"Generated {len(self.vehicles)} vehicles adhering to a schedule, {len(self.trucks)} trucks, "
+                         f"and {len(self.containers)} containers in memory.")
+
+    def _create_fleet(self, number_of_processes: int) -> None:
+        tasks = self.large_scheduled_vehicle_creation_service.get_sampling_tasks()
+        vehicle_rows = []
+        container_rows = []
+        self.vehicle_names = []
+        for sampled_vehicles in self.large_scheduled_vehicle_creation_service.sample(
+                tasks, number_of_processes=number_of_processes
+        ):
+            vehicle_type = CODE_OF_MODE_OF_TRANSPORT[sampled_vehicles.vehicle_type]
+            for vehicle_name, scheduled_arrival, containers in zip(
+                    sampled_vehicles.vehicle_names,
+                    sampled_vehicles.scheduled_arrivals,
+                    sampled_vehicles.containers_of_vehicles
+            ):
+                vehicle = len(vehicle_rows)
+                vehicle_rows.append((
+                    vehicle_type,
+                    sampled_vehicles.schedule_id,
+                    sampled_vehicles.capacity_in_teu,
+                    sampled_vehicles.moved_capacity,
+                    scheduled_arrival,
+                    containers.capacity_is_exhausted,
+                    False
+                ))
+                self.vehicle_names.append(vehicle_name)
+                for length, weight, storage_requirement, picked_up_by in zip(
+                        containers.lengths, containers.weights, containers.storage_requirements,
+                        containers.picked_up_by
+                ):
+                    container_rows.append((
+                        weight,
+                        CODE_OF_CONTAINER_LENGTH[length],
+                        CODE_OF_STORAGE_REQUIREMENT[storage_requirement],
+                        vehicle_type,
+                        CODE_OF_MODE_OF_TRANSPORT[picked_up_by],
+                        CODE_OF_MODE_OF_TRANSPORT[picked_up_by],
+                        vehicle,
+                        NO_ROW,
+                        NO_ROW,
+                        NO_ROW,
+                        NO_ROW,
+                        False
+                    ))
+        self.vehicles = np.array(vehicle_rows, dtype=VEHICLE_DTYPE)
+        self.containers = np.array(container_rows, dtype=CONTAINER_DTYPE)
+        self.trucks = np.zeros(0, dtype=TRUCK_DTYPE)
+
+    def _get_vehicles_of_types(self) -> Dict[ModeOfTransport, List[int]]:
+        vehicle_types = self.vehicles["vehicle_type"]
+        return {
+            vehicle_type: np.flatnonzero(vehicle_types == CODE_OF_MODE_OF_TRANSPORT[vehicle_type]).tolist()
+            for vehicle_type in ModeOfTransport.get_scheduled_vehicles()
+        }
+
+    def _get_free_capacities_for_outbound_journey(
+            self,
+            large_scheduled_vehicle_repository: LargeScheduledVehicleRepository
+    ) -> List[float]:
+        """Counts the containers each vehicle picks up for each container length at once."""
+        picked_up_by_large_scheduled_vehicle = self.containers["picked_up_by_large_scheduled_vehicle"]
+        is_loaded = picked_up_by_large_scheduled_vehicle != NO_ROW
+        number_loaded_containers = np.zeros((len(self.vehicles), len(CONTAINER_LENGTHS)), dtype=np.int64)
+        np.add.at(
+            number_loaded_containers,
+            (picked_up_by_large_scheduled_vehicle[is_loaded], self.containers["length"][is_loaded]),
+            1
+        )
+        free_capacities = []
+        for moved_capacity, capacity_in_teu, number_loaded_containers_of_vehicle in zip(
+                self.vehicles["moved_capacity"].tolist(),
+                self.vehicles["capacity_in_teu"].tolist(),
+                number_loaded_containers.tolist()
+        ):
+            maximum_capacity = large_scheduled_vehicle_repository.get_maximum_capacity_for_outbound_journey(
+                moved_capacity=moved_capacity,
+                capacity_in_teu=capacity_in_teu
+            )
+            free_capacity_in_teu = large_scheduled_vehicle_repository.subtract_loaded_containers(
+                maximum_capacity,
+                {
+                    CONTAINER_LENGTHS[code]: number_containers
+                    for code, number_containers in enumerate(number_loaded_containers_of_vehicle)
+                    if number_containers > 0
+                }
+            )
+            assert free_capacity_in_teu >= 0, f"The vehicle {self.vehicle_names[len(free_capacities)]} is " \
+                                              f"overloaded, free capacity in TEU: {free_capacity_in_teu}"
+            free_capacities.append(free_capacity_in_teu)
+        return free_capacities
+
+    def _choose_departing_vehicles_for_containers(self) -> None:
+        manager = self.large_scheduled_vehicle_for_onward_transportation_manager
+        schedule_repository = manager.schedule_repository
+        free_capacities = self._get_free_capacities_for_outbound_journey(manager.large_scheduled_vehicle_repository)
+        scheduled_arrivals: List[datetime.datetime] = self.vehicles["scheduled_arrival"].tolist()
+        vehicle_types: List[ModeOfTransport] = [
+            MODES_OF_TRANSPORT[vehicle_type] for vehicle_type in self.vehicles["vehicle_type"].tolist()
+        ]
+        departing_vehicle_indices: Dict[ModeOfTransport, DepartingVehicleIndex] = {
+            vehicle_type: DepartingVehicleIndex(
+                [
+                    vehicle for vehicle in vehicles_of_type
+                    if free_capacities[vehicle] >= ScheduleRepository.smallest_required_capacity_in_teu
+                ],
+                free_capacities.__getitem__,
+                random_number_generator=manager.random_number_generator,
+                get_scheduled_arrival=scheduled_arrivals.__getitem__
+            )
+            for vehicle_type, vehicles_of_type in self._get_vehicles_of_types().items()
+        }
+        schedule_repository.set_departure_index(departing_vehicle_indices)
+
+        # The same order as the container ids in the database, shuffled by the same generator
+        container_indices = np.flatnonzero(np.isin(
+            self.containers["picked_up_by"],
+            [CODE_OF_MODE_OF_TRANSPORT[vehicle_type] for vehicle_type in ModeOfTransport.get_scheduled_vehicles()]
+        )).astype(np.int64)
+        manager.random_number_generator.shuffle(container_indices)
+
+        delivered_by = self.containers["delivered_by"].tolist()
+        picked_up_by = self.containers["picked_up_by"].tolist()
+        lengths = self.containers["length"].tolist()
+        delivered_by_large_scheduled_vehicle = self.containers["delivered_by_large_scheduled_vehicle"].tolist()
+        number_assigned_containers = 0
+        number_not_assignable_containers = 0
+        for container in container_indices.tolist():
+            container_delivered_by = MODES_OF_TRANSPORT[delivered_by[container]]
+            initial_departing_vehicle_type = MODES_OF_TRANSPORT[picked_up_by[container]]
+            length = CONTAINER_LENGTHS[lengths[container]]
+            assert delivered_by_large_scheduled_vehicle[container] != NO_ROW, \
+                "Only containers delivered by vehicles adhering to a schedule exist at this point"
+            container_arrival = scheduled_arrivals[delivered_by_large_scheduled_vehicle[container]]
+            minimum_dwell_time_in_hours, maximum_dwell_time_in_hours = manager.get_dwell_times(
+                delivered_by=container_delivered_by,
+                picked_up_by=initial_departing_vehicle_type
+            )
+            start = container_arrival + datetime.timedelta(hours=minimum_dwell_time_in_hours)
+            end = container_arrival + datetime.timedelta(hours=maximum_dwell_time_in_hours)
+
+            vehicle = schedule_repository.pick_departing_vehicle(
+                start=start,
+                end=end,
+                vehicle_type=initial_departing_vehicle_type,
+                required_capacity=length
+            )
+            if vehicle is not None:
+                number_assigned_containers += 1
+            else:
+                number_not_assignable_containers += 1
+                self.containers["emergency_pickup"][container] = True
+                self.containers["picked_up_by"][container] = CODE_OF_MODE_OF_TRANSPORT[ModeOfTransport.truck]
+                vehicle = manager.pick_alternative_departing_vehicle(
+                    delivered_by=container_delivered_by,
+                    excluded_vehicle_type=ModeOfTransport.truck,
+                    start=start,
+                    end=end,
+                    required_capacity=length
+                )
+            if vehicle is None:
+                continue
+
+            vehicle_type = vehicle_types[vehicle]
+            self.containers["picked_up_by"][container] = CODE_OF_MODE_OF_TRANSPORT[vehicle_type]
+            self.containers["picked_up_by_large_scheduled_vehicle"][container] = vehicle
+            used_capacity_in_teu = ContainerLength.get_factor(length)
+            free_capacity_in_teu = free_capacities[vehicle] - used_capacity_in_teu
+            assert free_capacity_in_teu >= 0, f"The vehicle {self.vehicle_names[vehicle]} is overloaded, free " \
+                                              f"capacity in TEU: {free_capacities[vehicle]}, used capacity in TEU: " \
+                                              f"{used_capacity_in_teu}"
+            free_capacities[vehicle] = free_capacity_in_teu
+            departing_vehicle_indices[vehicle_type].update(vehicle, free_capacity_in_teu)
+            if free_capacity_in_teu <= LargeScheduledVehicleRepository.ignored_capacity:
+                self.vehicles["capacity_exhausted_while_determining_onward_transportation"][vehicle] = True
+
+        schedule_repository.reset_departure_index()
+        manager.number_assigned_containers = number_assigned_containers
+        manager.number_not_assignable_containers = number_not_assignable_containers
+        self.logger.info(f"{number_assigned_containers} containers have been assigned to their initially drawn "
+                         f"vehicle type, {number_not_assignable_containers} containers required an alternative.")
+
+    def _add_trucks(
+            self,
+            delivers_container: bool,
+            arrivals: Sequence[datetime.datetime]
+    ) -> np.ndarray:
+        """Appends the trucks and returns their positions."""
+        trucks = np.zeros(len(arrivals), dtype=TRUCK_DTYPE)
+        trucks["delivers_container"] = delivers_container
+        trucks["picks_up_container"] = not delivers_container
+        trucks["arrival"] = np.array(arrivals, dtype="datetime64[us]")
+        positions = np.arange(len(self.trucks), len(self.trucks) + len(trucks), dtype=np.int64)
+        self.trucks = np.concatenate([self.trucks, trucks])
+        return positions
+
+    def _generate_trucks_for_picking_up(self) -> None:
+        container_indices = np.flatnonzero(
+            self.containers["picked_up_by"] == CODE_OF_MODE_OF_TRANSPORT[ModeOfTransport.truck]
+        )
+        delivering_vehicles = self.containers["delivered_by_large_scheduled_vehicle"][container_indices]
+        assert (delivering_vehicles != NO_ROW).all(), \
+            "Only containers delivered by vehicles adhering to a schedule exist at this point"
+        container_arrival_times = self.vehicles["scheduled_arrival"][delivering_vehicles].tolist()
+        truck_arrival_times = self.truck_for_import_containers_manager.get_container_pickup_times(
+            container_arrival_times
+        )
+        self.containers["picked_up_by_truck"][container_indices] = self._add_trucks(
+            delivers_container=False,
+            arrivals=truck_arrival_times
+        )
+
+    def _allocate_space_for_containers_delivered_by_truck(self) -> None:
+        service = self.allocate_space_for_containers_delivered_by_truck_service
+        service.container_factory.reload_distributions()
+        number_containers_to_allocate = int(np.count_nonzero(
+            self.containers["picked_up_by"] == CODE_OF_MODE_OF_TRANSPORT[ModeOfTransport.truck]
+        ))
+        free_capacities = dict(enumerate(
+            self._get_free_capacities_for_outbound_journey(service.large_scheduled_vehicle_repository)
+        ))
+        vehicle_types = self.vehicles["vehicle_type"].tolist()
+        container_rows = []
+
+        def create_container(vehicle: int) -> ContainerLength:
+            length, weight, storage_requirement = service.container_factory.sample_container_for_delivering_truck()
+            container_rows.append((
+                weight,
+                CODE_OF_CONTAINER_LENGTH[length],
+                CODE_OF_STORAGE_REQUIREMENT[storage_requirement],
+                CODE_OF_MODE_OF_TRANSPORT[ModeOfTransport.truck],
+                vehicle_types[vehicle],
+                vehicle_types[vehicle],
+                NO_ROW,
+                NO_ROW,
+                vehicle,
+                NO_ROW,
+                NO_ROW,
+                False
+            ))
+            return length
+
+        def mark_capacity_as_exhausted(vehicle: int) -> None:
+            self.vehicles["capacity_exhausted_while_allocating_space_for_export_containers"][vehicle] = True
+
+        service.allocate_on_vehicles(
+            number_containers_to_allocate=number_containers_to_allocate,
+            vehicles=self._get_vehicles_of_types(),
+            free_capacities=free_capacities,
+            create_container=create_container,
+            mark_capacity_as_exhausted=mark_capacity_as_exhausted
+        )
+        self.containers = np.concatenate([self.containers, np.array(container_rows, dtype=CONTAINER_DTYPE)])
+
+    def _generate_trucks_for_delivering(self) -> None:
+        container_indices = np.flatnonzero(
+            self.containers["delivered_by"] == CODE_OF_MODE_OF_TRANSPORT[ModeOfTransport.truck]
+        )
+        departing_vehicles = self.containers["picked_up_by_large_scheduled_vehicle"][container_indices]
+        assert (departing_vehicles != NO_ROW).all(), \
+            "Each container delivered by truck is picked up by a vehicle adhering to a schedule"
+        container_departure_times = self.vehicles["scheduled_arrival"][departing_vehicles].tolist()
+        truck_arrival_times = self.truck_for_export_containers_manager.get_container_delivery_times(
+            container_departure_times
+        )
+        self.containers["delivered_by_truck"][container_indices] = self._add_trucks(
+            delivers_container=True,
+            arrivals=truck_arrival_times
+        )
+
+    def _assign_destinations(self) -> None:
+        service = self.assign_destination_to_container_service
+        picked_up_by_large_scheduled_vehicle = self.containers["picked_up_by_large_scheduled_vehicle"]
+        schedule_of_container = np.full(len(self.containers), NO_ROW, dtype=np.int64)
+        is_picked_up_by_large_scheduled_vehicle = picked_up_by_large_scheduled_vehicle != NO_ROW
+        schedule_of_container[is_picked_up_by_large_scheduled_vehicle] = self.vehicles["schedule"][
+            picked_up_by_large_scheduled_vehicle[is_picked_up_by_large_scheduled_vehicle]
+        ]
+        for schedule in service.get_schedules_with_destinations():
+            container_indices = np.flatnonzero(schedule_of_container == schedule.id)
+            destinations = service.sample_destinations(schedule, len(container_indices))
+            self.containers["destination"][container_indices] = [destination.id for destination in destinations]
+
+    def write(self) -> None:
+        """Inserts all vehicles, trucks, and containers. This must run within a transaction, see
+        :func:`.insert_many_and_get_ids`.
+        """
+        large_scheduled_vehicle_ids = self._write_vehicles()
+        truck_ids = self._write_trucks()
+        self._write_containers(large_scheduled_vehicle_ids, truck_ids)
+        self.logger.info(f"Wrote {len(self.vehicles)} vehicles adhering to a schedule, {len(self.trucks)} trucks, "
+                         f"and {len(self.containers)} containers to the database.")
+
+    def _write_vehicles(self) -> List[int]:
+        scheduled_arrivals = self.vehicles["scheduled_arrival"].tolist()
+        large_scheduled_vehicle_ids = insert_many_and_get_ids(
+            LargeScheduledVehicle,
+            list(zip(
+                self.vehicle_names,
+                self.vehicles["capacity_in_teu"].tolist(),
+                self.vehicles["moved_capacity"].tolist(),
+                scheduled_arrivals,
+                scheduled_arrivals,
+                self.vehicles["schedule"].tolist(),
+                self.vehicles["capacity_exhausted_while_determining_onward_transportation"].tolist(),
+                self.vehicles["capacity_exhausted_while_allocating_space_for_export_containers"].tolist()
+            )),
+            fields=[
+                LargeScheduledVehicle.vehicle_name,
+                LargeScheduledVehicle.capacity_in_teu,
+                LargeScheduledVehicle.moved_capacity,
+                LargeScheduledVehicle.scheduled_arrival,
+                LargeScheduledVehicle.realized_arrival,
+                LargeScheduledVehicle.schedule,
+                LargeScheduledVehicle.capacity_exhausted_while_determining_onward_transportation,
+                LargeScheduledVehicle.capacity_exhausted_while_allocating_space_for_export_containers
+            ]
+        )
+        for vehicle_type, vehicles_of_type in self._get_vehicles_of_types().items():
+            large_scheduled_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
+                vehicle_type
+            )
+            insert_many_and_get_ids(
+                large_scheduled_vehicle_as_subtype,
+                [(large_scheduled_vehicle_ids[vehicle], ) for vehicle in vehicles_of_type],
+                fields=[large_scheduled_vehicle_as_subtype.large_scheduled_vehicle]
+            )
+        return large_scheduled_vehicle_ids
+
+    def _write_trucks(self) -> List[int]:
+        arrivals = self.trucks["arrival"].tolist()
+        delivers_container = self.trucks["delivers_container"].tolist()
+        truck_arrival_information_for_pickup_ids = iter(insert_many_and_get_ids(
+            TruckArrivalInformationForPickup,
+            [
+                (None, None, arrival)
+                for arrival, delivers in zip(arrivals, delivers_container) if not delivers
+            ],
+            fields=[
+                TruckArrivalInformationForPickup.planned_container_pickup_time_prior_berthing,
+                TruckArrivalInformationForPickup.planned_container_pickup_time_after_initial_storage,
+                TruckArrivalInformationForPickup.realized_container_pickup_time
+            ]
+        ))
+        truck_arrival_information_for_delivery_ids = iter(insert_many_and_get_ids(
+            TruckArrivalInformationForDelivery,
+            [
+                (arrival, arrival)
+                for arrival, delivers in zip(arrivals, delivers_container) if delivers
+            ],
+            fields=[
+                TruckArrivalInformationForDelivery.planned_container_delivery_time_at_window_start,
+                TruckArrivalInformationForDelivery.realized_container_delivery_time
+            ]
+        ))
+        return insert_many_and_get_ids(
+            Truck,
+            [
+                (
+                    delivers,
+                    not delivers,
+                    next(truck_arrival_information_for_delivery_ids) if delivers else None,
+                    None if delivers else next(truck_arrival_information_for_pickup_ids)
+                )
+                for delivers in delivers_container
+            ],
+            fields=[
+                Truck.delivers_container,
+                Truck.picks_up_container,
+                Truck.truck_arrival_information_for_delivery,
+                Truck.truck_arrival_information_for_pickup
+            ]
+        )
+
+    def _write_containers(self, large_scheduled_vehicle_ids: List[int], truck_ids: List[int]) -> None:
+        def get_ids(positions: np.ndarray, ids: List[Any]) -> List[Any]:
+            return [None if position == NO_ROW else ids[position] for position in positions.tolist()]
+
+        destinations = [
+            None if destination == NO_ROW else destination
+            for destination in self.containers["destination"].tolist()
+        ]
+        container_rows = list(zip(
+            self.containers["weight"].tolist(),
+            [CONTAINER_LENGTHS[code] for code in self.containers["length"].tolist()],
+            [STORAGE_REQUIREMENTS[code] for code in self.containers["storage_requirement"].tolist()],
+            [MODES_OF_TRANSPORT[code] for code in self.containers["delivered_by"].tolist()],
+            [MODES_OF_TRANSPORT[code] for code in self.containers["picked_up_by_initial"].tolist()],
+            [MODES_OF_TRANSPORT[code] for code in self.containers["picked_up_by"].tolist()],
+            get_ids(self.containers["delivered_by_large_scheduled_vehicle"], large_scheduled_vehicle_ids),
+            get_ids(self.containers["delivered_by_truck"], truck_ids),
+            get_ids(self.containers["picked_up_by_large_scheduled_vehicle"], large_scheduled_vehicle_ids),
+            get_ids(self.containers["picked_up_by_truck"], truck_ids),
+            destinations,
+            self.containers["emergency_pickup"].tolist()
+        ))
+        container_fields = [
+            Container.weight,
+            Container.length,
+            Container.storage_requirement,
+            Container.delivered_by,
+            Container.picked_up_by_initial,
+            Container.picked_up_by,
+            Container.delivered_by_large_scheduled_vehicle,
+            Container.delivered_by_truck,
+            Container.picked_up_by_large_scheduled_vehicle,
+            Container.picked_up_by_truck,
+            Container.destination,
+            Container.emergency_pickup
+        ]
+        insert_many(Container, container_rows, fields=container_fields)
@@ -1,15 +1,29 @@
+import contextlib
 import datetime
+import enum
+import functools
 import logging
+from typing import Callable, List
+
+from conflowgen.application.data_types.generation_engine import GenerationEngine
+from conflowgen.application.data_types.transaction_scope import TransactionScope
 
 from conflowgen.application.reports.container_flow_statistics_report import ContainerFlowStatisticsReport
 from conflowgen.application.repositories.container_flow_generation_properties_repository import \
     ContainerFlowGenerationPropertiesRepository
+from conflowgen.application.repositories.post_hoc_analysis_result_repository import PostHocAnalysisResultRepository
 from conflowgen.flow_generator.assign_destination_to_container_service import \
     AssignDestinationToContainerService
+from conflowgen.flow_generator.columnar_container_flow_generation_engine import \
+    ColumnarContainerFlowGenerationEngine
 from conflowgen.flow_generator.large_scheduled_vehicle_creation_service import \
     LargeScheduledVehicleCreationService
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForPickup, \
+    TruckArrivalInformationForDelivery
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck, Feeder, DeepSeaVessel, Train, Barge
 from conflowgen.flow_generator.allocate_space_for_containers_delivered_by_truck_service import \
     AllocateSpaceForContainersDeliveredByTruckService
 from conflowgen.flow_generator.large_scheduled_vehicle_for_onward_transportation_manager \
@@ -18,6 +32,17 @@ from conflowgen.flow_generator.truck_for_export_containers_manager import \
     TruckForExportContainersManager
 from conflowgen.flow_generator.truck_for_import_containers_manager import \
     TruckForImportContainersManager
+from conflowgen.tools.random_streams import RandomStreams
+
+
+class GenerationPhase(enum.IntEnum):
+    """Each phase draws from its own stream of random numbers, identified by these keys."""
+    create_fleet = 1
+    choose_departing_vehicles_for_containers = 2
+    generate_trucks_for_picking_up = 3
+    allocate_space_for_containers_delivered_by_truck = 4
+    generate_trucks_for_delivering = 5
+    assign_destinations = 6
 
 
 class ContainerFlowGenerationService:
@@ -66,6 +91,9 @@ class ContainerFlowGenerationService:
         self.transportation_buffer: float = container_flow_generation_properties.transportation_buffer
         assert -1 < self.transportation_buffer
 
+        random_streams = RandomStreams(container_flow_generation_properties.random_seed)
+        self.logger.info(f"Using the random seed {random_streams.seed}")
+
         self.large_scheduled_vehicle_for_onward_transportation_manager.reload_properties(
             minimum_dwell_time_of_import_containers_in_hours=
             self.minimum_dwell_time_of_import_containers_in_hours,
@@ -79,52 +107,189 @@ class ContainerFlowGenerationService:
             self.maximum_dwell_time_of_export_containers_in_hours,
             maximum_dwell_time_of_transshipment_containers_in_hours=
             self.maximum_dwell_time_of_transshipment_containers_in_hours,
-            transportation_buffer=self.transportation_buffer
+            transportation_buffer=self.transportation_buffer,
+            random_number_generator=random_streams.get_generator(
+                GenerationPhase.choose_departing_vehicles_for_containers
+            )
         )
         self.allocate_space_for_containers_delivered_by_truck_service.reload_distribution(
-            transportation_buffer=self.transportation_buffer
+            transportation_buffer=self.transportation_buffer,
+            random_number_generator=random_streams.get_generator(
+                GenerationPhase.allocate_space_for_containers_delivered_by_truck
+            )
         )
         self.truck_for_import_containers_manager.reload_distribution(
             minimum_dwell_time_in_hours=self.minimum_dwell_time_of_import_containers_in_hours,
-            maximum_dwell_time_in_hours=self.maximum_dwell_time_of_import_containers_in_hours
+            maximum_dwell_time_in_hours=self.maximum_dwell_time_of_import_containers_in_hours,
+            random_number_generator=random_streams.get_generator(GenerationPhase.generate_trucks_for_picking_up)
         )
         self.truck_for_export_containers_manager.reload_distribution(
             minimum_dwell_time_in_hours=self.minimum_dwell_time_of_export_containers_in_hours,
-            maximum_dwell_time_in_hours=self.maximum_dwell_time_of_export_containers_in_hours
+            maximum_dwell_time_in_hours=self.maximum_dwell_time_of_export_containers_in_hours,
+            random_number_generator=random_streams.get_generator(GenerationPhase.generate_trucks_for_delivering)
         )
         self.large_scheduled_vehicle_creation_service.reload_properties(
             container_flow_start_date=self.container_flow_start_date,
-            container_flow_end_date=self.container_flow_end_date
+            container_flow_end_date=self.container_flow_end_date,
+            seed_sequence=random_streams.get_seed_sequence(GenerationPhase.create_fleet)
+        )
+        self.assign_destination_to_container_service.reload_distribution(
+            random_number_generator=random_streams.get_generator(GenerationPhase.assign_destinations)
         )
-        self.assign_destination_to_container_service.reload_distribution()
 
     @staticmethod
     def clear_previous_container_flow():
-        Container.delete().execute()
+        """Removes all generated data within one transaction. The tables are emptied from the referencing to the
+        referenced ones. Thus, SQLite neither needs to cascade the deletions row by row nor finds any remaining rows
+        when checking the foreign keys. As each truck has its own arrival information, these rows are removed as well.
+        The stored results of the post-hoc analyses are removed, too, as a container flow generated without a random
+        seed differs even if the input data is the same.
+        """
+        with database_proxy.atomic():
+            PostHocAnalysisResultRepository.clear()
+            Container.delete().execute()
+            for large_scheduled_vehicle_as_subtype in (Feeder, DeepSeaVessel, Train, Barge):
+                large_scheduled_vehicle_as_subtype.delete().execute()
+            LargeScheduledVehicle.delete().execute()
+            Truck.delete().execute()
+            TruckArrivalInformationForPickup.delete().execute()
+            TruckArrivalInformationForDelivery.delete().execute()
 
-        # Due to cascading foreign keys, Train, Feeder etc. are also deleted
-        LargeScheduledVehicle.delete().execute()
-
-        Truck.delete().execute()
+    @staticmethod
+    def vacuum():
+        """Rebuilds the database file so that the space of removed rows is returned to the file system. This must not
+        be invoked within a transaction.
+        """
+        database_proxy.execute_sql("VACUUM")
 
     @staticmethod
     def container_flow_data_exists() -> bool:
         return len(Container.select().limit(1)) == 1
 
-    def generate(self):
-        self.logger.info("Remove previous data...")
-        self.clear_previous_container_flow()
+    def generate(
+            self,
+            transaction_scope: TransactionScope = TransactionScope.run,
+            phases_per_transaction: int = 1,
+            number_of_processes: int = 1,
+            engine: GenerationEngine = GenerationEngine.peewee,
+            vacuum: bool = False,
+            defer_index_creation: bool = False
+    ):
+        """
+        Args:
+            transaction_scope: Which phases are committed together, only considered by the peewee engine
+            phases_per_transaction: For the transaction scope 'phase', the number of phases committed together
+            number_of_processes: The number of processes which create the vehicles and their containers in parallel
+            engine: Whether the intermediate results are kept in the database or in memory
+            vacuum: Whether to shrink the database file after the generation
+            defer_index_creation: Whether to drop the secondary indexes of the containers during the generation and
+                to create them afterwards
+        """
+        assert phases_per_transaction >= 1, f"At least one phase must be committed at once, not " \
+                                            f"{phases_per_transaction}"
         self.logger.info("Reloading properties and distributions...")
         self._update_generation_properties_and_distributions()
 
-        self.logger.info("Create fleet including their delivered containers for given time range for each schedule...")
-        self.large_scheduled_vehicle_creation_service.create()
+        if defer_index_creation:
+            self.logger.info("Drop secondary indexes of containers until the generation is finished...")
+            Container.drop_secondary_indexes()
+        try:
+            if engine == GenerationEngine.columnar:
+                self._generate_in_memory(number_of_processes)
+            else:
+                self._generate_in_database(transaction_scope, phases_per_transaction, number_of_processes)
+        finally:
+            if defer_index_creation:
+                self.logger.info("Create secondary indexes of containers...")
+                Container.create_secondary_indexes()
+            # the facts which have been loaded for the analyses of the previous container flow are outdated now
+            ContainerFactsRepository.invalidate()
 
-        self.logger.info("Loading status of vehicles adhering to a schedule:")
+        self.logger.info("Container flow generation finished")
+
+        if vacuum:
+            self.logger.info("Vacuum database...")
+            self.vacuum()
+
+        self.logger.info("Final capacity status of vehicles adhering to a schedule:")
+        self._log_status_of_vehicles()
+
+    def _generate_in_database(
+            self,
+            transaction_scope: TransactionScope,
+            phases_per_transaction: int,
+            number_of_processes: int
+    ):
+        phases: List[Callable[[], None]] = [
+            functools.partial(self._remove_previous_data_and_create_fleet, number_of_processes),
+            self._choose_departing_vehicles_for_containers,
+            self._generate_trucks_for_picking_up,
+            self._allocate_space_for_containers_delivered_by_truck,
+            self._generate_trucks_for_delivering,
+            self._assign_destinations,
+        ]
+        if transaction_scope == TransactionScope.run:
+            phases_per_transaction = len(phases)
+        elif transaction_scope == TransactionScope.none:
+            phases_per_transaction = 1
+
+        for index_of_first_phase in range(0, len(phases), phases_per_transaction):
+            if transaction_scope == TransactionScope.none:
+                transaction = contextlib.nullcontext()
+            else:
+                transaction = database_proxy.atomic()
+            try:
+                with transaction:
+                    for phase in phases[index_of_first_phase:index_of_first_phase + phases_per_transaction]:
+                        phase()
+            except Exception:
+                if transaction_scope == TransactionScope.run:
+                    self.logger.error("Container flow generation failed, the previous container flow is kept.")
+                else:
+                    self.logger.error("Container flow generation failed, the database only contains a partial "
+                                      "container flow.")
+                raise
+
+    def _generate_in_memory(self, number_of_processes: int):
+        engine = ColumnarContainerFlowGenerationEngine(
+            large_scheduled_vehicle_creation_service=self.large_scheduled_vehicle_creation_service,
+            large_scheduled_vehicle_for_onward_transportation_manager=
+            self.large_scheduled_vehicle_for_onward_transportation_manager,
+            truck_for_import_containers_manager=self.truck_for_import_containers_manager,
+            allocate_space_for_containers_delivered_by_truck_service=
+            self.allocate_space_for_containers_delivered_by_truck_service,
+            truck_for_export_containers_manager=self.truck_for_export_containers_manager,
+            assign_destination_to_container_service=self.assign_destination_to_container_service
+        )
+        try:
+            engine.generate(number_of_processes=number_of_processes)
+            # The previous data is removed in the same transaction so that it is only gone once the new data exists
+            with database_proxy.atomic():
+                self.logger.info("Remove previous data...")
+                self.clear_previous_container_flow()
+                self.logger.info("Write the container flow generated in memory...")
+                engine.write()
+        except Exception:
+            self.logger.error("Container flow generation failed, the previous container flow is kept.")
+            raise
+
+    def _log_status_of_vehicles(self):
         report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
         report.generate()
         self.logger.info(report.get_text_representation())
 
+    def _remove_previous_data_and_create_fleet(self, number_of_processes: int):
+        # The previous data is removed in the same transaction so that it is only gone once the new fleet exists
+        self.logger.info("Remove previous data...")
+        self.clear_previous_container_flow()
+
+        self.logger.info("Create fleet including their delivered containers for given time range for each schedule...")
+        self.large_scheduled_vehicle_creation_service.create(number_of_processes=number_of_processes)
+
+        self.logger.info("Loading status of vehicles adhering to a schedule:")
+        self._log_status_of_vehicles()
+
+    def _choose_departing_vehicles_for_containers(self):
         self.logger.info("Assign containers arriving by vehicles adhering a schedule for onward transportation...")
         self.large_scheduled_vehicle_for_onward_transportation_manager.choose_departing_vehicle_for_containers()
         number_assigned_containers = (self.large_scheduled_vehicle_for_onward_transportation_manager
@@ -137,30 +302,23 @@ class ContainerFlowGenerationService:
             f"Containers for which no outgoing vehicle could be found: {(assigned_as_fraction * 100):.2f}%")
 
         self.logger.info("Loading status of vehicles adhering to a schedule:")
-        report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
-        report.generate()
-        self.logger.info(report.get_text_representation())
+        self._log_status_of_vehicles()
 
+    def _generate_trucks_for_picking_up(self):
         self.logger.info("Generate trucks that pick up containers...")
         self.truck_for_import_containers_manager.generate_trucks_for_picking_up()
 
+    def _allocate_space_for_containers_delivered_by_truck(self):
         self.logger.info("Generate containers that are delivered by trucks...")
         self.allocate_space_for_containers_delivered_by_truck_service.allocate()
 
         self.logger.info("Loading status of vehicles adhering to a schedule:")
-        report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
-        report.generate()
-        self.logger.info(report.get_text_representation())
+        self._log_status_of_vehicles()
 
+    def _generate_trucks_for_delivering(self):
         self.logger.info("Generate trucks that deliver containers...")
         self.truck_for_export_containers_manager.generate_trucks_for_delivering()
 
+    def _assign_destinations(self):
         self.logger.info("Assign containers to next destinations...")
         self.assign_destination_to_container_service.assign()
-
-        self.logger.info("Container flow generation finished")
-
-        self.logger.info("Final capacity status of vehicles adhering to a schedule:")
-        report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
-        report.generate()
-        self.logger.info(report.get_text_representation())
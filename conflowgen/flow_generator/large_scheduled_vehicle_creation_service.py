@@ -1,52 +1,225 @@
+from __future__ import annotations
+
+import concurrent.futures
 import datetime
-from typing import List
+from typing import List, NamedTuple, Iterable, Iterator
 import logging
 
+import numpy as np
+
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
-from conflowgen.domain_models.factories.container_factory import ContainerFactory
+from conflowgen.domain_models.factories.container_factory import ContainerFactory, ContainerDistributions, \
+    SampledContainers
 from conflowgen.domain_models.factories.fleet_factory import FleetFactory
+from conflowgen.domain_models.factories.vehicle_factory import VehicleFactory
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
-from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle
+from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle, LargeScheduledVehicle
+from conflowgen.tools.bulk_operations import insert_many_and_get_ids
+
+
+class ScheduleSamplingTask(NamedTuple):
+    """Everything required to draw the vehicles and containers of a schedule without accessing the database."""
+    schedule_id: int
+    service_name: str
+    vehicle_type: ModeOfTransport
+    vehicle_arrives_at: datetime.date
+    vehicle_arrives_every_k_days: int
+    vehicle_arrives_at_time: datetime.time
+    average_vehicle_capacity: int
+    average_moved_capacity: int
+    first_at: datetime.date
+    latest_at: datetime.date
+    distributions: ContainerDistributions
+    seed_sequence: np.random.SeedSequence
+
+
+class SampledVehicles(NamedTuple):
+    """The vehicles of a schedule and the containers they deliver, each attribute as a separate column."""
+    schedule_id: int
+    vehicle_type: ModeOfTransport
+    vehicle_names: List[str]
+    scheduled_arrivals: List[datetime.datetime]
+    capacity_in_teu: int
+    moved_capacity: int
+    containers_of_vehicles: List[SampledContainers]
+
+
+def sample_vehicles_and_containers_of_schedule(task: ScheduleSamplingTask) -> SampledVehicles:
+    """Draws the vehicles of a schedule and the containers they deliver. As no database is accessed, this can run in
+    a separate process. The result only depends on the task, including its seed.
+    """
+    VehicleFactory.check_capacities_of_large_vehicle(
+        capacity_in_teu=task.average_vehicle_capacity,
+        moved_capacity=task.average_moved_capacity
+    )
+    scheduled_vehicles = FleetFactory.get_scheduled_vehicles(
+        service_name=task.service_name,
+        vehicle_type=task.vehicle_type,
+        vehicle_arrives_at=task.vehicle_arrives_at,
+        vehicle_arrives_every_k_days=task.vehicle_arrives_every_k_days,
+        vehicle_arrives_at_time=task.vehicle_arrives_at_time,
+        first_at=task.first_at,
+        latest_at=task.latest_at
+    )
+    container_factory = ContainerFactory(random_number_generator=np.random.default_rng(task.seed_sequence))
+    container_factory.set_distributions(task.distributions)
+    containers_of_vehicles = [
+        container_factory.sample_containers_for_large_scheduled_vehicle(
+            delivered_by=task.vehicle_type,
+            free_capacity_in_teu=task.average_moved_capacity,  # a new vehicle has not loaded any containers yet
+            vehicle_name=scheduled_vehicle.vehicle_name
+        )
+        for scheduled_vehicle in scheduled_vehicles
+    ]
+    return SampledVehicles(
+        schedule_id=task.schedule_id,
+        vehicle_type=task.vehicle_type,
+        vehicle_names=[scheduled_vehicle.vehicle_name for scheduled_vehicle in scheduled_vehicles],
+        scheduled_arrivals=[scheduled_vehicle.scheduled_arrival for scheduled_vehicle in scheduled_vehicles],
+        capacity_in_teu=task.average_vehicle_capacity,
+        moved_capacity=task.average_moved_capacity,
+        containers_of_vehicles=containers_of_vehicles
+    )
 
 
 class LargeScheduledVehicleCreationService:
     def __init__(self):
         self.logger = logging.getLogger("conflowgen")
-        fleet_factory = FleetFactory()
-        self.vehicle_factory = fleet_factory.vehicle_factory
-        self.fleet_creator = {
-            ModeOfTransport.train: fleet_factory.create_train_fleet,
-            ModeOfTransport.feeder: fleet_factory.create_feeder_fleet,
-            ModeOfTransport.deep_sea_vessel: fleet_factory.create_deep_sea_vessel_fleet,
-            ModeOfTransport.barge: fleet_factory.create_barge_fleet
-        }
         self.container_factory = ContainerFactory()
         self.container_flow_start_date = None
         self.container_flow_end_date = None
+        self.seed_sequence = np.random.SeedSequence()
 
     def reload_properties(
             self,
             container_flow_start_date: datetime.date,
-            container_flow_end_date: datetime.date
+            container_flow_end_date: datetime.date,
+            seed_sequence: np.random.SeedSequence | None = None
     ):
+        """
+        Args:
+            container_flow_start_date: The first day of the container flow
+            container_flow_end_date: The last day of the container flow
+            seed_sequence: The seed sequence the seed sequence of each schedule is derived from
+        """
         assert container_flow_start_date < container_flow_end_date
         self.container_flow_start_date = container_flow_start_date
         self.container_flow_end_date = container_flow_end_date
         self.container_factory.reload_distributions()
+        self.seed_sequence = seed_sequence or np.random.SeedSequence()
+
+    def create(self, number_of_processes: int = 1) -> None:
+        """Creates the vehicles of each schedule together with the containers they deliver.
 
-    def create(self) -> None:
+        Args:
+            number_of_processes: The number of processes which draw the vehicles and containers of the schedules in
+                parallel. Independent of this number, all rows are written by this process and each schedule uses its
+                own seed, so the result is the same.
+        """
+        assert number_of_processes >= 1, f"At least one process is required, not {number_of_processes}"
+        tasks = self.get_sampling_tasks()
+        self._write_vehicles_and_containers(tasks, self.sample(tasks, number_of_processes=number_of_processes))
+
+    def get_sampling_tasks(self) -> List[ScheduleSamplingTask]:
+        """Returns one task for each schedule, ordered by the schedule id."""
         assert self.container_flow_start_date is not None
         assert self.container_flow_end_date is not None
-        schedules: List[Schedule] = Schedule.select().execute()
-        for i, schedule in enumerate(schedules):
-            self.logger.debug(f"Create vehicles and containers for service '{schedule.service_name}' of type "
-                              f"'{schedule.vehicle_type}', "
-                              f"progress: {i+1} / {len(schedules)} ({100*(i + 1)/len(schedules):.2f}%)")
-            # noinspection PyArgumentList
-            vehicles: List[AbstractLargeScheduledVehicle] = self.fleet_creator[schedule.vehicle_type](
-                schedule=schedule,
-                latest_at=self.container_flow_end_date,
-                first_at=self.container_flow_start_date
+        schedules: List[Schedule] = list(Schedule.select().order_by(Schedule.id))
+        return [self._get_sampling_task(schedule) for schedule in schedules]
+
+    @staticmethod
+    def sample(tasks: List[ScheduleSamplingTask], number_of_processes: int = 1) -> Iterator[SampledVehicles]:
+        """Draws the vehicles of each schedule together with the containers they deliver without accessing the
+        database.
+
+        Args:
+            tasks: The tasks of the schedules
+            number_of_processes: The number of processes which work on the tasks in parallel
+
+        Returns:
+            The results in the order of the tasks
+        """
+        if number_of_processes > 1 and len(tasks) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=number_of_processes) as executor:
+                # the results are returned in the order of the tasks
+                yield from executor.map(sample_vehicles_and_containers_of_schedule, tasks)
+        else:
+            yield from map(sample_vehicles_and_containers_of_schedule, tasks)
+
+    def _get_sampling_task(self, schedule: Schedule) -> ScheduleSamplingTask:
+        return ScheduleSamplingTask(
+            schedule_id=schedule.id,
+            service_name=schedule.service_name,
+            vehicle_type=schedule.vehicle_type,
+            vehicle_arrives_at=schedule.vehicle_arrives_at,
+            vehicle_arrives_every_k_days=schedule.vehicle_arrives_every_k_days,
+            vehicle_arrives_at_time=schedule.vehicle_arrives_at_time,
+            average_vehicle_capacity=schedule.average_vehicle_capacity,
+            average_moved_capacity=schedule.average_moved_capacity,
+            first_at=self.container_flow_start_date,
+            latest_at=self.container_flow_end_date,
+            distributions=self.container_factory.get_distributions(),
+            # the stream of each schedule only depends on the seed and the schedule, not on the order of processing
+            seed_sequence=np.random.SeedSequence(
+                self.seed_sequence.entropy,
+                spawn_key=self.seed_sequence.spawn_key + (schedule.id, )
             )
-            for vehicle in vehicles:
-                self.container_factory.create_containers_for_large_scheduled_vehicle(vehicle)
+        )
+
+    def _write_vehicles_and_containers(
+            self,
+            tasks: List[ScheduleSamplingTask],
+            results: Iterable[SampledVehicles]
+    ) -> None:
+        for i, (task, sampled_vehicles) in enumerate(zip(tasks, results)):
+            self.logger.debug(f"Create vehicles and containers for service '{task.service_name}' of type "
+                              f"'{task.vehicle_type}', "
+                              f"progress: {i+1} / {len(tasks)} ({100*(i + 1)/len(tasks):.2f}%)")
+            with database_proxy.atomic():
+                self._insert_vehicles_and_containers(sampled_vehicles)
+
+    @staticmethod
+    def _insert_vehicles_and_containers(sampled_vehicles: SampledVehicles) -> None:
+        large_scheduled_vehicle_ids = insert_many_and_get_ids(
+            LargeScheduledVehicle,
+            [
+                (
+                    vehicle_name,
+                    sampled_vehicles.capacity_in_teu,
+                    sampled_vehicles.moved_capacity,
+                    scheduled_arrival,
+                    scheduled_arrival,
+                    sampled_vehicles.schedule_id,
+                    containers.capacity_is_exhausted
+                )
+                for vehicle_name, scheduled_arrival, containers in zip(
+                    sampled_vehicles.vehicle_names,
+                    sampled_vehicles.scheduled_arrivals,
+                    sampled_vehicles.containers_of_vehicles
+                )
+            ],
+            fields=[
+                LargeScheduledVehicle.vehicle_name,
+                LargeScheduledVehicle.capacity_in_teu,
+                LargeScheduledVehicle.moved_capacity,
+                LargeScheduledVehicle.scheduled_arrival,
+                LargeScheduledVehicle.realized_arrival,
+                LargeScheduledVehicle.schedule,
+                LargeScheduledVehicle.capacity_exhausted_while_determining_onward_transportation
+            ]
+        )
+        large_scheduled_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
+            sampled_vehicles.vehicle_type
+        )
+        insert_many_and_get_ids(
+            large_scheduled_vehicle_as_subtype,
+            [(large_scheduled_vehicle_id, ) for large_scheduled_vehicle_id in large_scheduled_vehicle_ids],
+            fields=[large_scheduled_vehicle_as_subtype.large_scheduled_vehicle]
+        )
+
+        ContainerFactory.insert_containers_of_large_scheduled_vehicles(
+            delivered_by=sampled_vehicles.vehicle_type,
+            large_scheduled_vehicle_ids=large_scheduled_vehicle_ids,
+            containers_of_vehicles=sampled_vehicles.containers_of_vehicles
+        )
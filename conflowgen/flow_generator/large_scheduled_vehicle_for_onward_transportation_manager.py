@@ -1,15 +1,17 @@
 from __future__ import annotations
 import datetime
 import logging
-import random
-from typing import Collection, Tuple, List
+from typing import List, Tuple, Iterator, Dict, Set
 
-from peewee import fn
+import numpy as np
 
+from conflowgen.tools.bulk_operations import get_batch_size, update_fields_in_bulk
 from ..domain_models.arrival_information import TruckArrivalInformationForDelivery
+from ..domain_models.base_model import database_proxy
 from ..domain_models.container import Container
 from ..domain_models.distribution_repositories.mode_of_transport_distribution_repository import \
     ModeOfTransportDistributionRepository
+from ..domain_models.data_types.container_length import ContainerLength
 from ..domain_models.data_types.mode_of_transport import ModeOfTransport
 from ..domain_models.repositories.schedule_repository import ScheduleRepository
 from ..domain_models.vehicle import AbstractLargeScheduledVehicle, LargeScheduledVehicle, Truck
@@ -25,6 +27,13 @@ class LargeScheduledVehicleForOnwardTransportationManager:
         self.mode_of_transport_distribution = self.mode_of_transport_distribution_repository.get_distribution()
         self.number_assigned_containers = 0
         self.number_not_assignable_containers = 0
+        self.random_number_generator = np.random.default_rng()
+        self.arrival_time_of_large_scheduled_vehicle: Dict[int, datetime.datetime] | None = None
+        self.arrival_time_of_truck: Dict[int, datetime.datetime] | None = None
+
+        # The assignments are written back at the end instead of saving each container on its own
+        self.buffered_container_assignments: Dict[int, Tuple[ModeOfTransport, int | None, bool]] = {}
+        self.buffered_vehicles_with_exhausted_capacity: Set[int] = set()
 
         self.minimum_dwell_time_of_import_containers_in_hours = None
         self.minimum_dwell_time_of_export_containers_in_hours = None
@@ -41,7 +50,8 @@ class LargeScheduledVehicleForOnwardTransportationManager:
             maximum_dwell_time_of_import_containers_in_hours: int,
             maximum_dwell_time_of_transshipment_containers_in_hours: int,
             maximum_dwell_time_of_export_containers_in_hours: int,
-            transportation_buffer: float
+            transportation_buffer: float,
+            random_number_generator: np.random.Generator | None = None
     ):
         # Minimum for import, export, and transshipment
         self.minimum_dwell_time_of_import_containers_in_hours = minimum_dwell_time_of_import_containers_in_hours
@@ -71,7 +81,10 @@ class LargeScheduledVehicleForOnwardTransportationManager:
 
         self.mode_of_transport_distribution = self.mode_of_transport_distribution_repository.get_distribution()
 
-    def choose_departing_vehicle_for_containers(self) -> None:
+        self.random_number_generator = random_number_generator or np.random.default_rng()
+        self.schedule_repository.set_random_number_generator(self.random_number_generator)
+
+    def choose_departing_vehicle_for_containers(self, streaming: bool = True) -> None:
         """For all containers that are already in the database and that continue their journey with a vehicle that
         moves according to a schedule, a suiting vehicle is assigned here.
 
@@ -80,50 +93,63 @@ class LargeScheduledVehicleForOnwardTransportationManager:
 
         This method might be quite time-consuming because it repeatedly checks how many containers are already placed
         on a vehicle to obey the load restriction (maximum capacity of the vehicle available for the terminal).
+
+        Args:
+            streaming: Whether to shuffle only the container ids in memory and to load the containers chunk by chunk
+                instead of loading all containers at once.
         """
         self.number_assigned_containers = 0
         self.number_not_assignable_containers = 0
 
         self.large_scheduled_vehicle_repository.reset_cache()
+        self.schedule_repository.build_departure_index()
+        self._load_arrival_times()
 
         self.logger.info("Assign containers to departing vehicles that move according to a schedule...")
 
         # Get all containers in a random order which are picked up by a LargeScheduledVehicle
         # This way no vehicle has an advantage over another by its earlier arrival (getting better slots etc.)
-        containers: Collection[Container] = Container.select(
-        ).order_by(fn.Random()).where(
-            Container.picked_up_by << ModeOfTransport.get_scheduled_vehicles()
-        )
+        if streaming:
+            container_ids = self._get_shuffled_ids_of_containers_to_assign()
+            number_containers = len(container_ids)
+            containers_and_arrivals = self._stream_containers_and_arrivals(container_ids)
+        else:
+            containers: List[Container] = list(Container.select().where(
+                Container.picked_up_by << ModeOfTransport.get_scheduled_vehicles()
+            ).order_by(Container.id))
+            self.random_number_generator.shuffle(containers)
+            number_containers = len(containers)
+            containers_and_arrivals = (
+                (container, self._get_arrival_time_of_container(container)) for container in containers
+            )
 
-        self.logger.info(f"In total {len(containers)} containers continue their journey on a vehicle that adhere to a "
-                         f"schedule, assigning these containers to their respective vehicles...")
-        for i, container in enumerate(containers):
+        self.logger.info(f"In total {number_containers} containers continue their journey on a vehicle that adhere to "
+                         f"a schedule, assigning these containers to their respective vehicles...")
+        for i, (container, container_arrival) in enumerate(containers_and_arrivals):
             i += 1
             if i % 1000 == 0 and i > 0:
-                self.logger.info(f"Progress: {i} / {len(containers)} ({100 * i / len(containers):.2f}%) "
+                self.logger.info(f"Progress: {i} / {number_containers} ({100 * i / number_containers:.2f}%) "
                                  f"containers have been assigned to a scheduled vehicle to leave the terminal again.")
 
-            container_arrival = self._get_arrival_time_of_container(container)
-
             minimum_dwell_time_in_hours, maximum_dwell_time_in_hours = self._get_dwell_times(container)
 
             # this value has been randomly drawn during container generation for the inbound traffic
             # we try to adhere to that value as good as possible
             initial_departing_vehicle_type = container.picked_up_by
 
-            # Get all vehicles which could be used for the onward transportation of the container
-            available_vehicles = self.schedule_repository.get_departing_vehicles(
+            # Pick one of the vehicles which could be used for the onward transportation of the container
+            vehicle = self.schedule_repository.pick_departing_vehicle(
                 start=(container_arrival + datetime.timedelta(hours=minimum_dwell_time_in_hours)),
                 end=(container_arrival + datetime.timedelta(hours=maximum_dwell_time_in_hours)),
                 vehicle_type=initial_departing_vehicle_type,
                 required_capacity=container.length
             )
 
-            if len(available_vehicles) > 0:
+            if vehicle is not None:
                 # this is the case when there is a vehicle available, and we can assign the container to that vehicle
                 # which is the happy path
                 self.number_assigned_containers += 1
-                self._pick_vehicle_for_container(available_vehicles, container)
+                self._assign_vehicle_to_container(vehicle, container)
             else:
                 # maybe no possible vehicles are left of the required vehicle type, then we need to switch if we want to
                 # get the container out of the container yard before storage fees apply
@@ -132,64 +158,169 @@ class LargeScheduledVehicleForOnwardTransportationManager:
                     container, container_arrival, minimum_dwell_time_in_hours, maximum_dwell_time_in_hours
                 )
 
+        self._write_buffered_assignments()
+        self.schedule_repository.reset_departure_index()
+        self._reset_arrival_times()
+
         self.logger.info("All containers for which a departing vehicle that moves according to a schedule was "
                          "available have been assigned to one.")
 
-    def _pick_vehicle_for_container(
+    def _get_shuffled_ids_of_containers_to_assign(self) -> np.ndarray:
+        container_ids = np.array(
+            [
+                container_id for (container_id, ) in Container.select(Container.id).where(
+                    Container.picked_up_by << ModeOfTransport.get_scheduled_vehicles()
+                ).order_by(Container.id).tuples()
+            ],
+            dtype=np.int64
+        )
+        self.random_number_generator.shuffle(container_ids)
+        return container_ids
+
+    def _stream_containers_and_arrivals(
             self,
-            available_vehicles: List[AbstractLargeScheduledVehicle],
+            container_ids: np.ndarray
+    ) -> Iterator[Tuple[Container, datetime.datetime]]:
+        """Loads the containers chunk by chunk in the given order. Only the attributes required for choosing the
+        departing vehicle are loaded.
+        """
+        # each container id is one variable of the query
+        batch_size = get_batch_size(number_of_variables_per_row=1)
+        for chunk_start in range(0, len(container_ids), batch_size):
+            chunk_of_container_ids = container_ids[chunk_start:chunk_start + batch_size].tolist()
+            containers = Container.select(
+                Container.id,
+                Container.delivered_by,
+                Container.picked_up_by,
+                Container.length,
+                Container.delivered_by_large_scheduled_vehicle,
+                Container.delivered_by_truck,
+                Container.picked_up_by_large_scheduled_vehicle,
+                Container.emergency_pickup
+            ).where(
+                Container.id << chunk_of_container_ids
+            )
+            container_by_id = {container.id: container for container in containers}
+            for container_id in chunk_of_container_ids:
+                container = container_by_id[container_id]
+                yield container, self._get_arrival_time_of_container(container)
+
+    def _load_arrival_times(self) -> None:
+        """Loads the arrival times of all vehicles which deliver containers at once. This way, the arrival time of a
+        container is looked up by the id of the delivering vehicle instead of loading the vehicle for each container.
+        """
+        self.arrival_time_of_large_scheduled_vehicle = dict(
+            LargeScheduledVehicle.select(
+                LargeScheduledVehicle.id,
+                LargeScheduledVehicle.scheduled_arrival
+            ).tuples()
+        )
+        self.arrival_time_of_truck = dict(
+            Truck.select(
+                Truck.id,
+                TruckArrivalInformationForDelivery.realized_container_delivery_time
+            ).join(
+                TruckArrivalInformationForDelivery,
+                on=(Truck.truck_arrival_information_for_delivery == TruckArrivalInformationForDelivery.id)
+            ).tuples()
+        )
+
+    def _reset_arrival_times(self) -> None:
+        self.arrival_time_of_large_scheduled_vehicle = None
+        self.arrival_time_of_truck = None
+
+    def _buffer_assignment(self, container: Container) -> None:
+        """Remembers the vehicle a container is picked up by. A later assignment of the same container replaces the
+        earlier one.
+        """
+        self.buffered_container_assignments[container.id] = (
+            container.picked_up_by,
+            container.picked_up_by_large_scheduled_vehicle_id,
+            container.emergency_pickup
+        )
+
+    def _write_buffered_assignments(self) -> None:
+        """Writes all buffered assignments with a few bulk updates within one transaction.
+        """
+        with database_proxy.atomic():
+            update_fields_in_bulk(
+                Container,
+                [Container.picked_up_by, Container.picked_up_by_large_scheduled_vehicle, Container.emergency_pickup],
+                self.buffered_container_assignments
+            )
+            ids_of_vehicles = sorted(self.buffered_vehicles_with_exhausted_capacity)
+            batch_size = get_batch_size(number_of_variables_per_row=1)  # each vehicle id is one variable
+            for chunk_start in range(0, len(ids_of_vehicles), batch_size):
+                LargeScheduledVehicle.update(
+                    capacity_exhausted_while_determining_onward_transportation=True
+                ).where(
+                    LargeScheduledVehicle.id << ids_of_vehicles[chunk_start:chunk_start + batch_size]
+                ).execute()
+        self.logger.debug(f"Wrote the assignments of {len(self.buffered_container_assignments)} containers to the "
+                          f"database.")
+        self.buffered_container_assignments = {}
+        self.buffered_vehicles_with_exhausted_capacity = set()
+
+    def _assign_vehicle_to_container(
+            self,
+            vehicle: AbstractLargeScheduledVehicle,
             container: Container
     ) -> AbstractLargeScheduledVehicle:
-        """pick vehicle with the probability of its free capacity
+        """the vehicle has been picked with the probability of its free capacity
         """
-        vehicle_distribution = {
-            vehicle: self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
-            for vehicle in available_vehicles
-        }
-        vehicle: AbstractLargeScheduledVehicle = random.choices(
-            population=list(vehicle_distribution.keys()),
-            weights=list(vehicle_distribution.values())
-        )[0]
         large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
         vehicle_type = vehicle.get_mode_of_transport()
 
         container.picked_up_by_large_scheduled_vehicle = large_scheduled_vehicle
         container.picked_up_by = vehicle_type
-        container.save()
+        self._buffer_assignment(container)
         vehicle_capacity_is_exhausted = self.schedule_repository.block_capacity_for_outbound_journey(vehicle, container)
         if vehicle_capacity_is_exhausted:
             large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation = True
-            large_scheduled_vehicle.save()
+            self.buffered_vehicles_with_exhausted_capacity.add(large_scheduled_vehicle.id)
         return vehicle
 
     def _get_dwell_times(self, container: Container) -> Tuple[int, int]:
         """get correct dwell time depending on transportation mode.
         """
-        if (container.picked_up_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)
-                and container.delivered_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)):
+        return self.get_dwell_times(delivered_by=container.delivered_by, picked_up_by=container.picked_up_by)
+
+    def get_dwell_times(self, delivered_by: ModeOfTransport, picked_up_by: ModeOfTransport) -> Tuple[int, int]:
+        """Returns the minimum and maximum dwell time in hours of a container delivered and picked up by the given
+        vehicle types.
+        """
+        if (picked_up_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)
+                and delivered_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)):
             minimum_dwell_time_in_hours = self.minimum_dwell_time_of_transshipment_containers_in_hours
             maximum_dwell_time_in_hours = self.maximum_dwell_time_of_transshipment_containers_in_hours
-        elif (container.picked_up_by in (ModeOfTransport.train, ModeOfTransport.barge)
-              and container.delivered_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)):
+        elif (picked_up_by in (ModeOfTransport.train, ModeOfTransport.barge)
+              and delivered_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)):
             minimum_dwell_time_in_hours = self.minimum_dwell_time_of_import_containers_in_hours
             maximum_dwell_time_in_hours = self.maximum_dwell_time_of_import_containers_in_hours
-        elif (container.picked_up_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)
-              and container.delivered_by in (ModeOfTransport.train, ModeOfTransport.barge, ModeOfTransport.truck)):
+        elif (picked_up_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)
+              and delivered_by in (ModeOfTransport.train, ModeOfTransport.barge, ModeOfTransport.truck)):
             minimum_dwell_time_in_hours = self.minimum_dwell_time_of_export_containers_in_hours
             maximum_dwell_time_in_hours = self.maximum_dwell_time_of_export_containers_in_hours
         else:
             raise Exception(f"ModeOfTransport "
-                            f"picked_up_by: {container.picked_up_by} "
-                            f"delivered_by: {container.delivered_by} "
+                            f"picked_up_by: {picked_up_by} "
+                            f"delivered_by: {delivered_by} "
                             f"is not considered at this point.")
         return minimum_dwell_time_in_hours, maximum_dwell_time_in_hours
 
-    @staticmethod
-    def _get_arrival_time_of_container(container: Container) -> datetime.datetime:
+    def _get_arrival_time_of_container(self, container: Container) -> datetime.datetime:
         """get container arrival from correct source
         """
         container_arrival: datetime.datetime
-        if container.delivered_by == ModeOfTransport.truck:
+        if self.arrival_time_of_large_scheduled_vehicle is not None:
+            # use the foreign keys without loading the referenced vehicles
+            if container.delivered_by == ModeOfTransport.truck:
+                container_arrival = self.arrival_time_of_truck[container.delivered_by_truck_id]
+            else:
+                container_arrival = self.arrival_time_of_large_scheduled_vehicle[
+                    container.delivered_by_large_scheduled_vehicle_id
+                ]
+        elif container.delivered_by == ModeOfTransport.truck:
             truck: Truck = container.delivered_by_truck
             truck_arrival_information: TruckArrivalInformationForDelivery = truck.truck_arrival_information_for_delivery
             container_arrival = truck_arrival_information.realized_container_delivery_time
@@ -210,46 +341,69 @@ class LargeScheduledVehicleForOnwardTransportationManager:
 
         # These are the default values if no suitable vehicle could be found in the next lines
         container.picked_up_by = ModeOfTransport.truck
-        container.save()
+        self._buffer_assignment(container)
+
+        vehicle = self.pick_alternative_departing_vehicle(
+            delivered_by=container.delivered_by,
+            excluded_vehicle_type=container.picked_up_by,
+            start=(container_arrival + datetime.timedelta(hours=minimum_dwell_time_in_hours)),
+            end=(container_arrival + datetime.timedelta(hours=maximum_dwell_time_in_hours)),
+            required_capacity=container.length
+        )
+        if vehicle is not None:  # There is a vehicle of a new type available, so it is picked
+            self._assign_vehicle_to_container(vehicle, container)
 
+    def pick_alternative_departing_vehicle(
+            self,
+            delivered_by: ModeOfTransport,
+            excluded_vehicle_type: ModeOfTransport,
+            start: datetime.datetime,
+            end: datetime.datetime,
+            required_capacity: ContainerLength
+    ) -> AbstractLargeScheduledVehicle | None:
+        """Draws alternative vehicle types for picking up a container and picks a vehicle of the first type that has a
+        vehicle available.
+
+        Returns:
+            The picked vehicle or None if the container must be picked up by truck
+        """
         # get alternative vehicles
-        vehicle_types_and_frequencies = self.mode_of_transport_distribution[container.delivered_by].copy()
+        vehicle_types_and_frequencies = self.mode_of_transport_distribution[delivered_by].copy()
 
         # ignore the one vehicle type which has obviously failed, otherwise we wouldn't search for an alternative here
-        previous_failed_vehicle_type: ModeOfTransport = container.picked_up_by
-        del vehicle_types_and_frequencies[previous_failed_vehicle_type]
+        del vehicle_types_and_frequencies[excluded_vehicle_type]
 
         # try to pick a better vehicle for 5 times, otherwise the previously set default values are automatically used
         for _ in range(5):
             if len(vehicle_types_and_frequencies.keys()) == 0:
                 # this default value has been pre-selected anyway, nothing else to do
-                return
+                return None
 
-            all_frequencies = list(vehicle_types_and_frequencies.values())
-            if sum(all_frequencies) == 0:
+            all_frequencies = np.array(list(vehicle_types_and_frequencies.values()), dtype=np.float64)
+            if all_frequencies.sum() == 0:
                 # this default value has been pre-selected anyway, nothing else to do
-                return
+                return None
 
-            vehicle_type = random.choices(
-                population=list(vehicle_types_and_frequencies.keys()),
-                weights=all_frequencies
-            )[0]
+            vehicle_types = list(vehicle_types_and_frequencies.keys())
+            vehicle_type = vehicle_types[
+                self.random_number_generator.choice(len(vehicle_types), p=all_frequencies / all_frequencies.sum())
+            ]
 
             if vehicle_type == ModeOfTransport.truck:
                 # this default value has been pre-selected anyway, nothing else to do
-                return
+                return None
 
             if vehicle_type in ModeOfTransport.get_scheduled_vehicles():
-                available_vehicles = self.schedule_repository.get_departing_vehicles(
-                    start=(container_arrival + datetime.timedelta(hours=minimum_dwell_time_in_hours)),
-                    end=(container_arrival + datetime.timedelta(hours=maximum_dwell_time_in_hours)),
+                vehicle = self.schedule_repository.pick_departing_vehicle(
+                    start=start,
+                    end=end,
                     vehicle_type=vehicle_type,
-                    required_capacity=container.length
+                    required_capacity=required_capacity
                 )
-                if len(available_vehicles) > 0:  # There is a vehicle of a new type available, so it is picked
-                    self._pick_vehicle_for_container(available_vehicles, container)
-                    return
+                if vehicle is not None:  # There is a vehicle of a new type available, so it is picked
+                    return vehicle
 
                 # obviously no vehicles of this type are left either, so it should also be excluded from the random
                 # selection procedure in the beginning
                 del vehicle_types_and_frequencies[vehicle_type]
+        return None
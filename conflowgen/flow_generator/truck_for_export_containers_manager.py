@@ -1,17 +1,19 @@
 from __future__ import annotations
 import datetime
 import logging
-import random
-from typing import List, Tuple, Union, Optional
+from typing import List, Tuple, Union, Optional, Sequence, Dict
 
+import numpy as np
+
+from conflowgen.tools.bulk_operations import insert_many_and_get_ids, update_field_in_bulk
 from conflowgen.tools.weekly_distribution import WeeklyDistribution
 from ..domain_models.arrival_information import TruckArrivalInformationForDelivery
+from ..domain_models.base_model import database_proxy
 from ..domain_models.container import Container
 from ..domain_models.distribution_repositories.truck_arrival_distribution_repository import \
     TruckArrivalDistributionRepository
-from ..domain_models.factories.vehicle_factory import VehicleFactory
 from ..domain_models.data_types.mode_of_transport import ModeOfTransport
-from ..domain_models.vehicle import LargeScheduledVehicle
+from ..domain_models.vehicle import LargeScheduledVehicle, Truck
 
 
 class TruckForExportContainersManager:
@@ -23,7 +25,7 @@ class TruckForExportContainersManager:
         self.logger = logging.getLogger("conflowgen")
         self.truck_arrival_distribution_repository = TruckArrivalDistributionRepository()
         self.distribution: WeeklyDistribution | None = None
-        self.vehicle_factory = VehicleFactory()
+        self.random_number_generator = np.random.default_rng()
         self.minimum_dwell_time_in_hours: Optional[float] = None
         self.maximum_dwell_time_in_hours: Optional[float] = None
         self.time_window_length_in_hours: Optional[float] = None
@@ -31,7 +33,8 @@ class TruckForExportContainersManager:
     def reload_distribution(
             self,
             minimum_dwell_time_in_hours: float,
-            maximum_dwell_time_in_hours: float
+            maximum_dwell_time_in_hours: float,
+            random_number_generator: np.random.Generator | None = None
     ):
         # noinspection PyTypeChecker
         hour_of_the_week_fraction_pairs: List[Union[Tuple[int, float], Tuple[int, int]]] = \
@@ -44,69 +47,100 @@ class TruckForExportContainersManager:
             minimum_dwell_time_in_hours=self.minimum_dwell_time_in_hours
         )
         self.time_window_length_in_hours = self.distribution.time_window_length_in_hours
+        self.random_number_generator = random_number_generator or np.random.default_rng()
 
     def _get_container_delivery_time(
             self,
             container_departure_time: datetime.datetime
     ) -> datetime.datetime:
-        latest_slot = container_departure_time.replace(minute=0, second=0, microsecond=0) - datetime.timedelta(hours=1)
-        earliest_slot = (
-            latest_slot
-            - datetime.timedelta(hours=self.maximum_dwell_time_in_hours - 1)  # because the latest slot is reset
-        )
-        distribution_slice = self.distribution.get_distribution_slice(earliest_slot)
+        return self.get_container_delivery_times([container_departure_time])[0]
 
-        time_windows_for_truck_arrival = list(distribution_slice.keys())
-        delivery_time_window_start = random.choices(
-            population=time_windows_for_truck_arrival,
-            weights=list(distribution_slice.values())
-        )[0]
+    def get_container_delivery_times(
+            self,
+            container_departure_times: Sequence[datetime.datetime]
+    ) -> List[datetime.datetime]:
+        """Draws the truck arrival times for all containers at once, one vectorized draw per earliest slot."""
+        indices_per_earliest_slot: Dict[datetime.datetime, List[int]] = {}
+        for i, container_departure_time in enumerate(container_departure_times):
+            latest_slot = (
+                container_departure_time.replace(minute=0, second=0, microsecond=0) - datetime.timedelta(hours=1)
+            )
+            earliest_slot = (
+                latest_slot
+                - datetime.timedelta(hours=self.maximum_dwell_time_in_hours - 1)  # because the latest slot is reset
+            )
+            indices_per_earliest_slot.setdefault(earliest_slot, []).append(i)
 
-        # arrival within the last time slot
-        random_time_component = random.uniform(0, self.time_window_length_in_hours - (1 / 60))
-        assert 0 <= random_time_component < self.time_window_length_in_hours, \
-            "The random time component be less than the time slot"
+        truck_arrival_times: List[Optional[datetime.datetime]] = [None] * len(container_departure_times)
+        for earliest_slot, indices in indices_per_earliest_slot.items():
+            delivery_time_window_starts = self.distribution.sample(
+                earliest_slot,
+                size=len(indices),
+                random_number_generator=self.random_number_generator
+            )
 
-        # go back to the earliest possible day
-        truck_arrival_time = (
-            earliest_slot
-            + datetime.timedelta(hours=delivery_time_window_start)
-            + datetime.timedelta(hours=random_time_component)
-        )
-        return truck_arrival_time
+            # arrival within the last time slot
+            random_time_components = self.random_number_generator.uniform(
+                0, self.time_window_length_in_hours - (1 / 60), size=len(indices)
+            )
+            assert (0 <= random_time_components).all() \
+                   and (random_time_components < self.time_window_length_in_hours).all(), \
+                   "The random time component be less than the time slot"
+
+            # go back to the earliest possible day
+            hours_after_earliest_slot = delivery_time_window_starts + random_time_components
+            for i, hours in zip(indices, hours_after_earliest_slot):
+                truck_arrival_times[i] = earliest_slot + datetime.timedelta(hours=float(hours))
+        return truck_arrival_times
 
     def generate_trucks_for_delivering(self) -> None:
         """Looks for all containers that are supposed to be delivered by truck and creates the corresponding truck.
         """
-        containers = Container.select().where(
-            Container.delivered_by == ModeOfTransport.truck
-        ).execute()
-        self.logger.info(f"In total {len(containers)} containers are delivered by truck, creating these trucks now...")
-        for i, container in enumerate(containers):
-            i += 1
-            if i % 1000 == 0 and i > 0:
-                self.logger.info(
-                    f"Progress: {i} / {len(containers)} ({100 * i / len(containers):.2f}%) trucks generated "
-                    f"for export containers")
-            picked_up_with: LargeScheduledVehicle = container.picked_up_by_large_scheduled_vehicle
-
-            # assume that the vessel arrival time changes are not communicated on time so that the trucks which deliver
-            # a container for that vessel drop off the container too early
-            container_pickup_time: datetime.datetime = picked_up_with.scheduled_arrival
+        # assume that the vessel arrival time changes are not communicated on time so that the trucks which deliver
+        # a container for that vessel drop off the container too early
+        container_ids_and_pickup_times = list(
+            Container.select(
+                Container.id,
+                LargeScheduledVehicle.scheduled_arrival
+            ).join(
+                LargeScheduledVehicle, on=(Container.picked_up_by_large_scheduled_vehicle == LargeScheduledVehicle.id)
+            ).where(
+                Container.delivered_by == ModeOfTransport.truck
+            ).order_by(
+                Container.id
+            ).tuples()
+        )
+        self.logger.info(f"In total {len(container_ids_and_pickup_times)} containers are delivered by truck, "
+                         f"creating these trucks now...")
+        container_ids = [container_id for container_id, _ in container_ids_and_pickup_times]
+        truck_arrival_times = self.get_container_delivery_times([
+            container_pickup_time for _, container_pickup_time in container_ids_and_pickup_times
+        ])
 
-            truck_arrival_time = self._get_container_delivery_time(container_pickup_time)
-            truck_arrival_information_for_delivery = TruckArrivalInformationForDelivery.create(
-                planned_container_delivery_time_at_window_start=truck_arrival_time,
-                realized_container_delivery_time=truck_arrival_time
+        with database_proxy.atomic():
+            truck_arrival_information_ids = insert_many_and_get_ids(
+                TruckArrivalInformationForDelivery,
+                [
+                    (truck_arrival_time, truck_arrival_time)
+                    for truck_arrival_time in truck_arrival_times
+                ],
+                fields=[
+                    TruckArrivalInformationForDelivery.planned_container_delivery_time_at_window_start,
+                    TruckArrivalInformationForDelivery.realized_container_delivery_time
+                ]
             )
-            truck_arrival_information_for_delivery.save()
-            truck = self.vehicle_factory.create_truck(
-                delivers_container=True,
-                picks_up_container=False,
-                truck_arrival_information_for_delivery=truck_arrival_information_for_delivery,
-                truck_arrival_information_for_pickup=None
+            truck_ids = insert_many_and_get_ids(
+                Truck,
+                [
+                    (True, False, truck_arrival_information_id, None)
+                    for truck_arrival_information_id in truck_arrival_information_ids
+                ],
+                fields=[
+                    Truck.delivers_container,
+                    Truck.picks_up_container,
+                    Truck.truck_arrival_information_for_delivery,
+                    Truck.truck_arrival_information_for_pickup
+                ]
             )
-            truck.save()
-            container.delivered_by_truck = truck
-            container.save()
+            update_field_in_bulk(Container, Container.delivered_by_truck, dict(zip(container_ids, truck_ids)))
         self.logger.info("All trucks that deliver a container are created now.")
@@ -1,16 +1,18 @@
 import datetime
 import logging
-import random
-from typing import List, Tuple, Union
+from typing import List, Tuple, Union, Sequence, Dict, Optional
 
+import numpy as np
+
+from conflowgen.tools.bulk_operations import insert_many_and_get_ids, update_field_in_bulk
 from conflowgen.tools.weekly_distribution import WeeklyDistribution
 from ..domain_models.arrival_information import TruckArrivalInformationForPickup
+from ..domain_models.base_model import database_proxy
 from ..domain_models.container import Container
 from ..domain_models.distribution_repositories.truck_arrival_distribution_repository import \
     TruckArrivalDistributionRepository
-from ..domain_models.factories.vehicle_factory import VehicleFactory
 from ..domain_models.data_types.mode_of_transport import ModeOfTransport
-from ..domain_models.vehicle import LargeScheduledVehicle
+from ..domain_models.vehicle import LargeScheduledVehicle, Truck
 
 
 class TruckForImportContainersManager:
@@ -18,9 +20,14 @@ class TruckForImportContainersManager:
         self.logger = logging.getLogger("conflowgen")
         self.truck_arrival_distribution_repository = TruckArrivalDistributionRepository()
         self.distribution: Union[WeeklyDistribution, None] = None
-        self.vehicle_factory = VehicleFactory()
+        self.random_number_generator = np.random.default_rng()
 
-    def reload_distribution(self, minimum_dwell_time_in_hours: float, maximum_dwell_time_in_hours: float):
+    def reload_distribution(
+            self,
+            minimum_dwell_time_in_hours: float,
+            maximum_dwell_time_in_hours: float,
+            random_number_generator: Optional[np.random.Generator] = None
+    ):
         # noinspection PyTypeChecker
         hour_of_the_week_fraction_pairs: List[Union[Tuple[int, float], Tuple[int, int]]] = \
             list(self.truck_arrival_distribution_repository.get_distribution().items())
@@ -29,57 +36,96 @@ class TruckForImportContainersManager:
             considered_time_window_in_hours=maximum_dwell_time_in_hours - 1,  # because the earliest slot is reset
             minimum_dwell_time_in_hours=minimum_dwell_time_in_hours
         )
+        self.random_number_generator = random_number_generator or np.random.default_rng()
 
     def _get_container_pickup_time(
             self,
             container_arrival_time: datetime.datetime
     ) -> datetime.datetime:
-        earliest_slot = container_arrival_time.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
-        distribution_slice = self.distribution.get_distribution_slice(earliest_slot)
-        time_windows_for_truck_arrival = list(distribution_slice.keys())
-        pickup_time_window_start = random.choices(
-            population=time_windows_for_truck_arrival,
-            weights=list(distribution_slice.values()))[0]
-        time_window_length_in_hours = (time_windows_for_truck_arrival[1] - time_windows_for_truck_arrival[0])
-        random_time_component = random.uniform(0, time_window_length_in_hours)
-        truck_arrival_time = (
-            earliest_slot
-            + datetime.timedelta(hours=pickup_time_window_start)  # these are several days, comparable to time slot
-            + datetime.timedelta(hours=random_time_component)  # a small random component for the truck arrival time
-        )
-        return truck_arrival_time
+        return self.get_container_pickup_times([container_arrival_time])[0]
 
-    def generate_trucks_for_picking_up(self):
-        containers = Container.select().where(
-            Container.picked_up_by == ModeOfTransport.truck
-        ).execute()
-        self.logger.info(f"In total {len(containers)} containers are picked up by truck, creating these trucks now...")
-        for i, container in enumerate(containers):
-            i += 1
-            if i % 1000 == 0 and i > 0:
-                self.logger.info(f"Progress: {i} / {len(containers)} ({100 * i / len(containers):.2f}%) trucks "
-                                 f"generated for import containers")
-            delivered_by: LargeScheduledVehicle = container.delivered_by_large_scheduled_vehicle
+    def get_container_pickup_times(
+            self,
+            container_arrival_times: Sequence[datetime.datetime]
+    ) -> List[datetime.datetime]:
+        """Draws the truck arrival times for all containers at once, one vectorized draw per earliest slot."""
+        indices_per_earliest_slot: Dict[datetime.datetime, List[int]] = {}
+        for i, container_arrival_time in enumerate(container_arrival_times):
+            earliest_slot = (
+                container_arrival_time.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+            )
+            indices_per_earliest_slot.setdefault(earliest_slot, []).append(i)
 
-            # assume that the vessel arrival time changes are communicated early enough so that the trucks which pick
-            # up a container never try to go to the terminal before the vessel has arrived
-            container_arrival_time: datetime.datetime = \
-                delivered_by.realized_arrival or delivered_by.scheduled_arrival
+        truck_arrival_times: List[Optional[datetime.datetime]] = [None] * len(container_arrival_times)
+        for earliest_slot, indices in indices_per_earliest_slot.items():
+            pickup_time_window_starts = self.distribution.sample(
+                earliest_slot,
+                size=len(indices),
+                random_number_generator=self.random_number_generator
+            )
+            time_windows_for_truck_arrival = list(self.distribution.get_distribution_slice(earliest_slot).keys())
+            time_window_length_in_hours = (time_windows_for_truck_arrival[1] - time_windows_for_truck_arrival[0])
+            random_time_components = self.random_number_generator.uniform(
+                0, time_window_length_in_hours, size=len(indices)
+            )
+            hours_after_earliest_slot = pickup_time_window_starts + random_time_components
+            for i, hours in zip(indices, hours_after_earliest_slot):
+                truck_arrival_times[i] = earliest_slot + datetime.timedelta(hours=float(hours))
+        return truck_arrival_times
+
+    def generate_trucks_for_picking_up(self):
+        # assume that the vessel arrival time changes are communicated early enough so that the trucks which pick
+        # up a container never try to go to the terminal before the vessel has arrived
+        container_ids_and_arrival_times = list(
+            Container.select(
+                Container.id,
+                LargeScheduledVehicle.realized_arrival,
+                LargeScheduledVehicle.scheduled_arrival
+            ).join(
+                LargeScheduledVehicle, on=(Container.delivered_by_large_scheduled_vehicle == LargeScheduledVehicle.id)
+            ).where(
+                Container.picked_up_by == ModeOfTransport.truck
+            ).order_by(
+                Container.id
+            ).tuples()
+        )
+        self.logger.info(f"In total {len(container_ids_and_arrival_times)} containers are picked up by truck, "
+                         f"creating these trucks now...")
+        container_ids = [container_id for container_id, _, _ in container_ids_and_arrival_times]
+        truck_arrival_times = self.get_container_pickup_times([
+            realized_arrival or scheduled_arrival
+            for _, realized_arrival, scheduled_arrival in container_ids_and_arrival_times
+        ])
 
-            truck_arrival_time = self._get_container_pickup_time(container_arrival_time)
-            truck_arrival_information_for_pickup = TruckArrivalInformationForPickup.create(
-                planned_container_pickup_time_prior_berthing=None,  # TODO: set value if required
-                planned_container_pickup_time_after_initial_storage=None,  # TODO: set value if required
-                realized_container_pickup_time=truck_arrival_time
+        with database_proxy.atomic():
+            truck_arrival_information_ids = insert_many_and_get_ids(
+                TruckArrivalInformationForPickup,
+                [
+                    (
+                        None,  # planned_container_pickup_time_prior_berthing, TODO: set value if required
+                        None,  # planned_container_pickup_time_after_initial_storage, TODO: set value if required
+                        truck_arrival_time
+                    )
+                    for truck_arrival_time in truck_arrival_times
+                ],
+                fields=[
+                    TruckArrivalInformationForPickup.planned_container_pickup_time_prior_berthing,
+                    TruckArrivalInformationForPickup.planned_container_pickup_time_after_initial_storage,
+                    TruckArrivalInformationForPickup.realized_container_pickup_time
+                ]
             )
-            truck_arrival_information_for_pickup.save()
-            truck = self.vehicle_factory.create_truck(
-                delivers_container=False,
-                picks_up_container=True,
-                truck_arrival_information_for_delivery=None,
-                truck_arrival_information_for_pickup=truck_arrival_information_for_pickup
+            truck_ids = insert_many_and_get_ids(
+                Truck,
+                [
+                    (False, True, None, truck_arrival_information_id)
+                    for truck_arrival_information_id in truck_arrival_information_ids
+                ],
+                fields=[
+                    Truck.delivers_container,
+                    Truck.picks_up_container,
+                    Truck.truck_arrival_information_for_delivery,
+                    Truck.truck_arrival_information_for_pickup
+                ]
             )
-            truck.save()
-            container.picked_up_by_truck = truck
-            container.save()
+            update_field_in_bulk(Container, Container.picked_up_by_truck, dict(zip(container_ids, truck_ids)))
         self.logger.info("All trucks that pick up a container have been generated.")
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import abc
 import datetime
-from typing import NamedTuple, Dict, List, Optional
+import functools
+import inspect
+from typing import Any, Callable, NamedTuple, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
 
+import numpy as np
+
+from conflowgen.application.repositories.post_hoc_analysis_result_repository import PostHocAnalysisResultRepository
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 
 
@@ -45,6 +50,61 @@ def get_week_based_range(start: datetime.date, end: datetime.date) -> List[datet
     ] + [end]
 
 
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# This is a Monday so that weekly time windows start on Mondays, just like in get_week_based_time_window
+ORIGIN_OF_TIME_WINDOWS = datetime.datetime(1970, 1, 5)
+
+
+def count_per_time_window(
+        seconds_since_epoch: Sequence[int],
+        time_window: datetime.timedelta
+) -> Tuple[List[datetime.datetime], np.ndarray]:
+    """
+    Args:
+        seconds_since_epoch: The points in time to count
+        time_window: The length of each time window, e.g. an hour or a week
+
+    Returns:
+        The start of each time window and the number of points in time within that window. Before the first and after
+        the last point in time, one empty time window is added.
+    """
+    assert time_window.total_seconds() > 0, "The time window must have a positive length"
+    time_windows = (
+        (np.asarray(seconds_since_epoch, dtype=np.int64) - int((ORIGIN_OF_TIME_WINDOWS - EPOCH).total_seconds()))
+        // int(time_window.total_seconds())
+    )
+    first_time_window = int(time_windows.min()) - 1
+    last_time_window = int(time_windows.max()) + 1
+    number_of_time_windows = last_time_window - first_time_window + 1
+    counts = np.bincount(time_windows - first_time_window, minlength=number_of_time_windows)
+    start_of_time_windows = [
+        ORIGIN_OF_TIME_WINDOWS + (first_time_window + i) * time_window
+        for i in range(number_of_time_windows)
+    ]
+    return start_of_time_windows, counts
+
+
+def get_keys_of_time_windows(
+        count_by_start_of_time_window: Dict[datetime.datetime, int],
+        time_window: datetime.timedelta
+) -> Dict[Union[datetime.date, datetime.datetime], int]:
+    """
+    Args:
+        count_by_start_of_time_window: The count for each time window as returned by :func:`count_per_time_window`
+        time_window: The length of each time window
+
+    Returns:
+        The same counts, for time windows of whole days with dates as keys and otherwise with points in time
+    """
+    if time_window % datetime.timedelta(days=1) == datetime.timedelta(0):
+        return {
+            start_of_time_window.date(): count
+            for start_of_time_window, count in count_by_start_of_time_window.items()
+        }
+    return count_by_start_of_time_window
+
+
 class AbstractPostHocAnalysis(abc.ABC):
 
     def __init__(
@@ -78,3 +138,48 @@ class AbstractPostHocAnalysis(abc.ABC):
         if transportation_buffer is not None:
             assert transportation_buffer > -1
             self.transportation_buffer = transportation_buffer
+
+
+def _get_key_of_argument(argument: Any) -> Any:
+    if isinstance(argument, AbstractPostHocAnalysis):
+        # the transportation buffer is the only state an analysis depends on
+        return type(argument).__name__, argument.transportation_buffer
+    if isinstance(argument, type):
+        return argument.__name__
+    if isinstance(argument, (set, frozenset)):
+        # the order of iterating over a set can differ between sessions
+        return sorted(repr(_get_key_of_argument(element)) for element in argument)
+    if isinstance(argument, (list, tuple)):
+        return [_get_key_of_argument(element) for element in argument]
+    if isinstance(argument, dict):
+        return sorted(
+            (repr(_get_key_of_argument(key)), _get_key_of_argument(value)) for key, value in argument.items()
+        )
+    return argument
+
+
+AnalysisMethod = TypeVar("AnalysisMethod", bound=Callable[..., Any])
+
+
+def materialize_result(method: AnalysisMethod) -> AnalysisMethod:
+    """
+    Stores the result of the analysis in the database. As long as the container flow is not generated again, the
+    stored result is returned for the same arguments, see :class:`.PostHocAnalysisResultRepository`. For static and
+    class methods, this decorator must be applied first.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        bound_arguments = signature.bind(*args, **kwargs)
+        bound_arguments.apply_defaults()
+        analysis = f"{method.__module__}.{method.__qualname__}"
+        arguments = repr(_get_key_of_argument(list(bound_arguments.arguments.items())))
+        fingerprint = PostHocAnalysisResultRepository.get_fingerprint()
+        is_stored, result = PostHocAnalysisResultRepository.get_result(fingerprint, analysis, arguments)
+        if not is_stored:
+            result = method(*args, **kwargs)
+            PostHocAnalysisResultRepository.store_result(fingerprint, analysis, arguments, result)
+        return result
+
+    return wrapper
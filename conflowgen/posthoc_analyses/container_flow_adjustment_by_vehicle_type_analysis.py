@@ -1,11 +1,10 @@
 from __future__ import annotations
 from typing import Dict
 
-from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
 from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, \
-    ContainersAndTEUContainerFlowPair
+    ContainersAndTEUContainerFlowPair, materialize_result
 
 
 class ContainerFlowAdjustmentByVehicleTypeAnalysis(AbstractPostHocAnalysis):
@@ -16,6 +15,7 @@ class ContainerFlowAdjustmentByVehicleTypeAnalysis(AbstractPostHocAnalysis):
     """
 
     @staticmethod
+    @materialize_result
     def get_initial_to_adjusted_outbound_flow() -> ContainersAndTEUContainerFlowPair:
         """
         When containers are generated, in order to obey the maximum dwell time, the vehicle type that is used for
@@ -46,15 +46,15 @@ class ContainerFlowAdjustmentByVehicleTypeAnalysis(AbstractPostHocAnalysis):
             for vehicle_type_initial in ModeOfTransport
         }
 
-        # Iterate over all containers and count number of containers / used TEU capacity
-        container: Container
-        for container in Container.select():
-            vehicle_type_initial = container.picked_up_by_initial
-            vehicle_type_adjusted = container.picked_up_by
-            teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-            initial_to_adjusted_outbound_flow_in_containers[vehicle_type_initial][vehicle_type_adjusted] += 1
-            initial_to_adjusted_outbound_flow_in_teu[vehicle_type_initial][vehicle_type_adjusted] += \
-                teu_factor_of_container
+        # Count number of containers / used TEU capacity for each combination of vehicle types
+        container_facts = ContainerFactsRepository.get_container_facts()
+        containers_by_vehicle_types = container_facts.groupby(["picked_up_by_initial", "picked_up_by"], sort=False)
+        number_containers = containers_by_vehicle_types.size()
+        used_teu_capacities = containers_by_vehicle_types["teu"].sum().to_dict()
+        for (vehicle_type_initial, vehicle_type_adjusted), number in number_containers.items():
+            initial_to_adjusted_outbound_flow_in_containers[vehicle_type_initial][vehicle_type_adjusted] = number
+            initial_to_adjusted_outbound_flow_in_teu[vehicle_type_initial][vehicle_type_adjusted] = \
+                used_teu_capacities[(vehicle_type_initial, vehicle_type_adjusted)]
 
         return ContainersAndTEUContainerFlowPair(
             containers=initial_to_adjusted_outbound_flow_in_containers,
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import NamedTuple
 
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import materialize_result
 from conflowgen.posthoc_analyses.container_flow_adjustment_by_vehicle_type_analysis import \
     ContainerFlowAdjustmentByVehicleTypeAnalysis
 
@@ -26,6 +27,7 @@ class ContainerFlowAdjustmentByVehicleTypeAnalysisSummary(ContainerFlowAdjustmen
     as it is the case with :class:`.ContainerFlowAdjustmentByVehicleTypeAnalysisSummaryReport`.
     """
 
+    @materialize_result
     def get_summary(
             self
     ) -> ContainerFlowAdjustedToVehicleType:
@@ -1,10 +1,9 @@
 from __future__ import annotations
 from typing import Dict
 
-from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
-from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, materialize_result
 
 
 class ContainerFlowByVehicleTypeAnalysis(AbstractPostHocAnalysis):
@@ -14,6 +13,7 @@ class ContainerFlowByVehicleTypeAnalysis(AbstractPostHocAnalysis):
     as it is the case with :class:`.ContainerFlowByVehicleTypeAnalysisReport`.
     """
     @staticmethod
+    @materialize_result
     def get_inbound_to_outbound_flow(
             as_teu: bool = True
     ) -> Dict[ModeOfTransport, Dict[ModeOfTransport, float]]:
@@ -29,14 +29,13 @@ class ContainerFlowByVehicleTypeAnalysis(AbstractPostHocAnalysis):
             for vehicle_type_inbound in ModeOfTransport
         }
 
-        unit_steps = 1  # each container counts as one container, this is overwritten later in case of counting TEU
-
-        container: Container
-        for container in Container.select():
-            inbound_vehicle_type = container.delivered_by
-            outbound_vehicle_type = container.picked_up_by
-            if as_teu:  # in case it is counted as TEU, the TEU factor replaces the default constant '1'
-                unit_steps = ContainerLength.get_factor(container.length)
-            inbound_to_outbound_flow[inbound_vehicle_type][outbound_vehicle_type] += unit_steps
+        container_facts = ContainerFactsRepository.get_container_facts()
+        containers_by_vehicle_types = container_facts.groupby(["delivered_by", "picked_up_by"], sort=False)
+        if as_teu:  # in case it is counted as TEU, the TEU factor replaces the default constant '1'
+            transported_capacities = containers_by_vehicle_types["teu"].sum()
+        else:
+            transported_capacities = containers_by_vehicle_types.size()
+        for (inbound_vehicle_type, outbound_vehicle_type), capacity in transported_capacities.items():
+            inbound_to_outbound_flow[inbound_vehicle_type][outbound_vehicle_type] = capacity
 
         return inbound_to_outbound_flow
@@ -2,12 +2,12 @@ from __future__ import annotations
 
 from typing import Dict
 
-from conflowgen.domain_models.container import Container
 from conflowgen.descriptive_datatypes import OutboundUsedAndMaximumCapacity
-from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
 from conflowgen.domain_models.vehicle import LargeScheduledVehicle
-from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, materialize_result
 
 
 class InboundAndOutboundVehicleCapacityAnalysis(AbstractPostHocAnalysis):
@@ -23,6 +23,7 @@ class InboundAndOutboundVehicleCapacityAnalysis(AbstractPostHocAnalysis):
         )
 
     @staticmethod
+    @materialize_result
     def get_inbound_capacity_of_vehicles() -> Dict[ModeOfTransport, float]:
         """
         This is the used capacity of all vehicles separated by vehicle type on their inbound journey in TEU.
@@ -32,14 +33,13 @@ class InboundAndOutboundVehicleCapacityAnalysis(AbstractPostHocAnalysis):
             for vehicle_type in ModeOfTransport
         }
 
-        container: Container
-        for container in Container.select():
-            inbound_vehicle_type = container.delivered_by
-            teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-            inbound_capacity[inbound_vehicle_type] += teu_factor_of_container
+        container_facts = ContainerFactsRepository.get_container_facts()
+        for inbound_vehicle_type, capacity in container_facts.groupby("delivered_by", sort=False)["teu"].sum().items():
+            inbound_capacity[inbound_vehicle_type] = capacity
 
         return inbound_capacity
 
+    @materialize_result
     def get_outbound_capacity_of_vehicles(self) -> OutboundUsedAndMaximumCapacity:
         """
         This is the used and the maximum capacity of all vehicles separated by vehicle type on their outbound journey
@@ -58,19 +58,19 @@ class InboundAndOutboundVehicleCapacityAnalysis(AbstractPostHocAnalysis):
             for vehicle_type in ModeOfTransport
         }
 
-        container: Container
-        for container in Container.select():
-            outbound_vehicle_type: ModeOfTransport = container.picked_up_by
-            teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-            outbound_actual_capacity[outbound_vehicle_type] += teu_factor_of_container
+        container_facts = ContainerFactsRepository.get_container_facts()
+        for outbound_vehicle_type, capacity in container_facts.groupby("picked_up_by", sort=False)["teu"].sum().items():
+            outbound_actual_capacity[outbound_vehicle_type] = capacity
 
-        large_scheduled_vehicle: LargeScheduledVehicle
-        for large_scheduled_vehicle in LargeScheduledVehicle.select():
+        for vehicle_type, moved_capacity, capacity_in_teu in LargeScheduledVehicle.select(
+                Schedule.vehicle_type,
+                LargeScheduledVehicle.moved_capacity,
+                LargeScheduledVehicle.capacity_in_teu
+        ).join(Schedule).order_by(LargeScheduledVehicle.id).tuples():
             maximum_capacity_of_vehicle = min(
-                large_scheduled_vehicle.moved_capacity * (1 + self.transportation_buffer),
-                large_scheduled_vehicle.capacity_in_teu
+                moved_capacity * (1 + self.transportation_buffer),
+                capacity_in_teu
             )
-            vehicle_type: ModeOfTransport = large_scheduled_vehicle.schedule.vehicle_type
             outbound_maximum_capacity[vehicle_type] += maximum_capacity_of_vehicle
 
         outbound_maximum_capacity[ModeOfTransport.truck] = -1  # Not meaningful, trucks can always be added as required
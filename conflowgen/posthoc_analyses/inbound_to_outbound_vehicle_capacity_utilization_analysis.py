@@ -2,12 +2,11 @@ from __future__ import annotations
 
 from typing import Dict, NamedTuple, Tuple
 
-from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
 from conflowgen.domain_models.vehicle import LargeScheduledVehicle
-from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, materialize_result
 from conflowgen.tools import hashable
 
 
@@ -33,6 +32,7 @@ class InboundToOutboundVehicleCapacityUtilizationAnalysis(AbstractPostHocAnalysi
         )
 
     @staticmethod
+    @materialize_result
     def get_inbound_and_outbound_capacity_of_each_vehicle(
             vehicle_type="all"
     ) -> Dict[CompleteVehicleIdentifier, Tuple[float, float]]:
@@ -47,41 +47,45 @@ class InboundToOutboundVehicleCapacityUtilizationAnalysis(AbstractPostHocAnalysi
         """
         capacities: Dict[CompleteVehicleIdentifier, (float, float)] = {}
 
-        base_selection = LargeScheduledVehicle.select().join(Schedule)
+        container_facts = ContainerFactsRepository.get_container_facts()
+        used_capacity_on_outbound_journey_of_vehicles = container_facts.groupby(
+            "picked_up_by_large_scheduled_vehicle"
+        )["teu"].sum().to_dict()
+
+        base_selection = LargeScheduledVehicle.select(
+            LargeScheduledVehicle.id,
+            Schedule.vehicle_type,
+            Schedule.service_name,
+            LargeScheduledVehicle.vehicle_name,
+            LargeScheduledVehicle.moved_capacity
+        ).join(
+            Schedule
+        )
         if vehicle_type == "all":
             selected_large_scheduled_vehicles = base_selection
         else:
             if hashable(vehicle_type) and vehicle_type in set(ModeOfTransport):
                 selected_large_scheduled_vehicles = base_selection.where(
-                    LargeScheduledVehicle.schedule.vehicle_type == vehicle_type
+                    Schedule.vehicle_type == vehicle_type
                 )
             else:  # assume it is some kind of collection (list, set, ...)
                 selected_large_scheduled_vehicles = base_selection.where(
-                    LargeScheduledVehicle.schedule.vehicle_type << vehicle_type
+                    Schedule.vehicle_type << vehicle_type
                 )
 
-        vehicle: LargeScheduledVehicle
-        for vehicle in selected_large_scheduled_vehicles:
-            vehicle_schedule: Schedule = vehicle.schedule
-            mode_of_transport = vehicle_schedule.vehicle_type
-            service_name = vehicle_schedule.service_name
-            vehicle_name = vehicle.vehicle_name
-            used_capacity_on_inbound_journey = vehicle.moved_capacity
-
-            used_capacity_on_outbound_journey = 0
-            container: Container
-            for container in Container.select().where(
-                Container.picked_up_by_large_scheduled_vehicle == vehicle
-            ):
-                teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-                used_capacity_on_outbound_journey += teu_factor_of_container
-
+        for (large_scheduled_vehicle_id, mode_of_transport, service_name, vehicle_name,
+             used_capacity_on_inbound_journey) in selected_large_scheduled_vehicles.order_by(
+                LargeScheduledVehicle.id
+        ).tuples():
             vehicle_id = CompleteVehicleIdentifier(
                 mode_of_transport=mode_of_transport,
                 service_name=service_name,
                 vehicle_name=vehicle_name
             )
-
+            # vehicles which do not pick up any containers are not part of the grouped containers
+            used_capacity_on_outbound_journey = used_capacity_on_outbound_journey_of_vehicles.get(
+                large_scheduled_vehicle_id, 0
+            )
             capacities[vehicle_id] = (used_capacity_on_inbound_journey, used_capacity_on_outbound_journey)
 
         return capacities
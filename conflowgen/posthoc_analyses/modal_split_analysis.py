@@ -2,7 +2,7 @@ from __future__ import annotations
 from typing import Dict
 
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
-from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, materialize_result
 from conflowgen.posthoc_analyses.container_flow_by_vehicle_type_analysis import ContainerFlowByVehicleTypeAnalysis
 from conflowgen.descriptive_datatypes import TransshipmentAndHinterlandComparison
 from conflowgen.descriptive_datatypes import HinterlandModalSplit
@@ -30,6 +30,7 @@ class ModalSplitAnalysis(AbstractPostHocAnalysis):
         super().__init__()
         self.container_flow_by_vehicle_type_analysis = ContainerFlowByVehicleTypeAnalysis()
 
+    @materialize_result
     def get_transshipment_and_hinterland_fraction(self) -> TransshipmentAndHinterlandComparison:
         """
         Returns:
@@ -54,6 +55,7 @@ class ModalSplitAnalysis(AbstractPostHocAnalysis):
             hinterland_capacity=hinterland_capacity
         )
 
+    @materialize_result
     def get_modal_split_for_hinterland(
             self,
             inbound: bool,
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import datetime
-from typing import Dict, List
+from typing import Dict, List, Union
 
-from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.vehicle import LargeScheduledVehicle
-from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, get_week_based_time_window, \
-    get_week_based_range
+import numpy as np
+import pandas as pd
+
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, count_per_time_window, \
+    get_keys_of_time_windows, materialize_result
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 
 
@@ -24,11 +26,17 @@ class QuaySideThroughputAnalysis(AbstractPostHocAnalysis):
     }
 
     @classmethod
-    def get_throughput_over_time(cls, inbound: bool = True, outbound: bool = True) -> Dict[datetime.date, float]:
+    def get_throughput_over_time(
+            cls,
+            inbound: bool = True,
+            outbound: bool = True,
+            time_window: datetime.timedelta = datetime.timedelta(weeks=1),
+            as_series: bool = False
+    ) -> Union[Dict[Union[datetime.date, datetime.datetime], float], pd.Series]:
         """
-        For each week, the containers crossing the quay are checked. Based on this, the required quay capacity in boxes
-        can be deduced - it is the maximum of these values (based on all the assumptions, in reality an additional
-        buffer might be reasonable to add).
+        For each week (or any other time window), the containers crossing the quay are checked. Based on this, the
+        required quay capacity in boxes can be deduced - it is the maximum of these values (based on all the
+        assumptions, in reality an additional buffer might be reasonable to add).
 
         The rather coarse time window is due to the fact that the discharging and loading process are not modelled. At
         this stage, as a simplification all containers arriving with a vessel are discharged at once and all containers
@@ -37,43 +45,53 @@ class QuaySideThroughputAnalysis(AbstractPostHocAnalysis):
         Args:
             inbound: Whether to check for vessels which deliver a container on their inbound journey
             outbound: Whether to check for vessels which pick up a container on their outbound journey
+            time_window: The length of the time windows the containers are counted in, e.g. a week or an hour.
+                Time windows of a week start on Mondays.
+                For time windows of whole days, the dictionary uses dates as keys, otherwise points in time.
+            as_series: Whether to return a :class:`pandas.Series` indexed by the start of the time windows instead of
+                a dictionary
         """
 
-        assert (inbound or outbound), "At least one of the two must be checked for"
-
-        containers_that_pass_quay_side: List[datetime.datetime] = []
+        quay_side_throughput = cls._get_throughput_over_time(inbound, outbound, time_window)
+        if as_series:
+            return pd.Series(
+                list(quay_side_throughput.values()),
+                index=pd.DatetimeIndex(list(quay_side_throughput.keys())),
+                dtype=int
+            )
+        return get_keys_of_time_windows(quay_side_throughput, time_window)
 
-        for container in Container.select():
-            if inbound:
-                mode_of_transport_at_container_arrival: ModeOfTransport = container.delivered_by
-                if mode_of_transport_at_container_arrival in cls.QUAY_SIDE_VEHICLES:
-                    vehicle: LargeScheduledVehicle = container.delivered_by_large_scheduled_vehicle
-                    time_of_container_crossing_quay_side = vehicle.scheduled_arrival
-                    containers_that_pass_quay_side.append(time_of_container_crossing_quay_side)
+    @classmethod
+    @materialize_result
+    def _get_throughput_over_time(
+            cls,
+            inbound: bool,
+            outbound: bool,
+            time_window: datetime.timedelta
+    ) -> Dict[datetime.datetime, int]:
+        # Only the dictionary is stored because a stored pandas.Series could not be restored safely
+        assert (inbound or outbound), "At least one of the two must be checked for"
 
-            if outbound:
-                mode_of_transport_at_container_departure: ModeOfTransport = container.picked_up_by
-                if mode_of_transport_at_container_departure in cls.QUAY_SIDE_VEHICLES:
-                    vehicle: LargeScheduledVehicle = container.picked_up_by_large_scheduled_vehicle
-                    time_of_container_crossing_quay_side = vehicle.scheduled_arrival
-                    containers_that_pass_quay_side.append(time_of_container_crossing_quay_side)
+        container_facts = ContainerFactsRepository.get_container_facts()
+        seconds_since_epoch_by_direction: List[pd.Series] = []
 
-        if len(containers_that_pass_quay_side) == 0:
-            return {}
+        if inbound:
+            seconds_since_epoch_by_direction.append(container_facts.loc[
+                container_facts["delivered_by"].isin(list(cls.QUAY_SIDE_VEHICLES)), "enters_yard"
+            ].dropna())
 
-        first_arrival = min(containers_that_pass_quay_side)
-        last_pickup = max(containers_that_pass_quay_side)
+        if outbound:
+            seconds_since_epoch_by_direction.append(container_facts.loc[
+                container_facts["picked_up_by"].isin(list(cls.QUAY_SIDE_VEHICLES)), "leaves_yard"
+            ].dropna())
 
-        first_time_window = get_week_based_time_window(first_arrival) - datetime.timedelta(weeks=1)
-        last_time_window = get_week_based_time_window(last_pickup) + datetime.timedelta(weeks=1)
+        seconds_since_epoch = pd.concat(seconds_since_epoch_by_direction)
 
-        quay_side_throughput: Dict[datetime.date, float] = {
-            time_window: 0
-            for time_window in get_week_based_range(first_time_window, last_time_window)
-        }
+        if len(seconds_since_epoch) == 0:
+            return {}
 
-        for time_of_container_crossing_quay_side in containers_that_pass_quay_side:
-            time_window_of_container = get_week_based_time_window(time_of_container_crossing_quay_side)
-            quay_side_throughput[time_window_of_container] += 1  # counted in boxes
+        start_of_time_windows, quay_side_throughput = count_per_time_window(  # counted in boxes
+            seconds_since_epoch.to_numpy(dtype=np.int64), time_window
+        )
 
-        return quay_side_throughput
+        return dict(zip(start_of_time_windows, quay_side_throughput.tolist()))
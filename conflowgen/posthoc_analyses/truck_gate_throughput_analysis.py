@@ -1,14 +1,14 @@
 from __future__ import annotations
 
 import datetime
-from typing import Dict, List
-
-from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
-    TruckArrivalInformationForPickup
-from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.vehicle import Truck
-from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, get_hour_based_time_window,\
-    get_hour_based_range
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, count_per_time_window, \
+    get_keys_of_time_windows, materialize_result
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 
 
@@ -20,55 +20,67 @@ class TruckGateThroughputAnalysis(AbstractPostHocAnalysis):
     """
 
     @classmethod
-    def get_throughput_over_time(cls, inbound: bool = True, outbound: bool = True) -> Dict[datetime.datetime, float]:
+    def get_throughput_over_time(
+            cls,
+            inbound: bool = True,
+            outbound: bool = True,
+            time_window: datetime.timedelta = datetime.timedelta(hours=1),
+            as_series: bool = False
+    ) -> Union[Dict[Union[datetime.date, datetime.datetime], float], pd.Series]:
         """
-        For each hour, the trucks entering through the truck gate are checked. Based on this, the required truck gate
-        capacity in boxes can be deduced.
+        For each hour (or any other time window), the trucks entering through the truck gate are checked. Based on
+        this, the required truck gate capacity in boxes can be deduced.
 
         Args:
             inbound: Whether to check for trucks which deliver a container on their inbound journey
             outbound: Whether to check for trucks which pick up a container on their outbound journey
+            time_window: The length of the time windows the trucks are counted in, e.g. an hour or a week.
+                Time windows of a week start on Mondays.
+                For time windows of whole days, the dictionary uses dates as keys, otherwise points in time.
+            as_series: Whether to return a :class:`pandas.Series` indexed by the start of the time windows instead of
+                a dictionary
         """
 
+        truck_gate_throughput = cls._get_throughput_over_time(inbound, outbound, time_window)
+        if as_series:
+            return pd.Series(
+                list(truck_gate_throughput.values()),
+                index=pd.DatetimeIndex(list(truck_gate_throughput.keys())),
+                dtype=int
+            )
+        return get_keys_of_time_windows(truck_gate_throughput, time_window)
+
+    @classmethod
+    @materialize_result
+    def _get_throughput_over_time(
+            cls,
+            inbound: bool,
+            outbound: bool,
+            time_window: datetime.timedelta
+    ) -> Dict[datetime.datetime, int]:
+        # Only the dictionary is stored because a stored pandas.Series could not be restored safely
         assert (inbound or outbound), "At least one of the two must be checked for"
 
-        containers_that_pass_truck_gate: List[datetime.datetime] = []
-
-        for container in Container.select():
-            if inbound:
-                mode_of_transport_at_container_arrival: ModeOfTransport = container.delivered_by
-                if mode_of_transport_at_container_arrival == ModeOfTransport.truck:
-                    truck: Truck = container.delivered_by_truck
-                    arrival_time_information: TruckArrivalInformationForDelivery = \
-                        truck.truck_arrival_information_for_delivery
-                    time_of_entering = arrival_time_information.realized_container_delivery_time
-                    containers_that_pass_truck_gate.append(time_of_entering)
-
-            if outbound:
-                mode_of_transport_at_container_departure: ModeOfTransport = container.picked_up_by
-                if mode_of_transport_at_container_departure == ModeOfTransport.truck:
-                    truck: Truck = container.picked_up_by_truck
-                    arrival_time_information: TruckArrivalInformationForPickup = \
-                        truck.truck_arrival_information_for_pickup
-                    time_of_leaving = arrival_time_information.realized_container_pickup_time
-                    containers_that_pass_truck_gate.append(time_of_leaving)
-
-        if len(containers_that_pass_truck_gate) == 0:
-            return {}
+        container_facts = ContainerFactsRepository.get_container_facts()
+        seconds_since_epoch_by_direction: List[pd.Series] = []
+
+        if inbound:
+            seconds_since_epoch_by_direction.append(container_facts.loc[
+                container_facts["delivered_by"] == ModeOfTransport.truck, "enters_yard"
+            ].dropna())
 
-        first_arrival = min(containers_that_pass_truck_gate)
-        last_pickup = max(containers_that_pass_truck_gate)
+        if outbound:
+            seconds_since_epoch_by_direction.append(container_facts.loc[
+                container_facts["picked_up_by"] == ModeOfTransport.truck, "leaves_yard"
+            ].dropna())
 
-        first_time_window = get_hour_based_time_window(first_arrival) - datetime.timedelta(hours=1)
-        last_time_window = get_hour_based_time_window(last_pickup) + datetime.timedelta(hours=1)
+        seconds_since_epoch = pd.concat(seconds_since_epoch_by_direction)
 
-        truck_gate_throughput: Dict[datetime.datetime, float] = {
-            time_window: 0
-            for time_window in get_hour_based_range(first_time_window, last_time_window)
-        }
+        if len(seconds_since_epoch) == 0:
+            return {}
 
-        for time_of_container_crossing_quay_side in containers_that_pass_truck_gate:
-            time_window_of_container = get_hour_based_time_window(time_of_container_crossing_quay_side)
-            truck_gate_throughput[time_window_of_container] += 1  # counted in boxes
+        start_of_time_windows, truck_gate_throughput = count_per_time_window(  # counted in boxes
+            seconds_since_epoch.to_numpy(dtype=np.int64), time_window
+        )
 
-        return truck_gate_throughput
+        return dict(zip(start_of_time_windows, truck_gate_throughput.tolist()))
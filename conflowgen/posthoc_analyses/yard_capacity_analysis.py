@@ -1,16 +1,14 @@
 from __future__ import annotations
 
 import datetime
-from typing import Dict, Tuple, List, Collection, Union
+from typing import Dict, Collection, Union
+
+import numpy as np
 
 from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
-from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
-    TruckArrivalInformationForPickup
-from conflowgen.domain_models.container import Container
-from conflowgen.domain_models.data_types.container_length import ContainerLength
-from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
-from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, get_hour_based_time_window, \
-    get_hour_based_range
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.posthoc_analyses.abstract_posthoc_analysis import AbstractPostHocAnalysis, get_hour_based_range, \
+    EPOCH, materialize_result
 from conflowgen.tools import hashable
 
 
@@ -22,6 +20,7 @@ class YardCapacityAnalysis(AbstractPostHocAnalysis):
     """
 
     @staticmethod
+    @materialize_result
     def get_used_yard_capacity_over_time(
             storage_requirement: Union[str, Collection, StorageRequirement] = "all"
     ) -> Dict[datetime.datetime, float]:
@@ -47,67 +46,46 @@ class YardCapacityAnalysis(AbstractPostHocAnalysis):
         Returns:
             A series of the used yard capacity in TEU over the time.
         """
-        container_stays: List[Tuple[datetime.datetime, datetime.datetime, float]] = []
-
-        container: Container
-        if storage_requirement == "all":
-            selected_containers = Container.select()
-        else:
+        container_facts = ContainerFactsRepository.get_container_facts()
+        if storage_requirement != "all":
             if hashable(storage_requirement) and storage_requirement in set(StorageRequirement):
-                selected_containers = Container.select().where(
-                    Container.storage_requirement == storage_requirement
-                )
+                container_facts = container_facts[
+                    container_facts["storage_requirement"] == storage_requirement
+                ]
             else:  # assume it is some kind of collection (list, set, ...)
-                selected_containers = Container.select().where(
-                    Container.storage_requirement << storage_requirement
-                )
-        for container in selected_containers:
-            container_enters_yard: datetime.datetime
-            container_leaves_yard: datetime.datetime
-            if container.delivered_by_truck is not None:
-                truck: Truck = container.delivered_by_truck
-                arrival_time_information: TruckArrivalInformationForDelivery = \
-                    truck.truck_arrival_information_for_delivery
-                container_enters_yard = arrival_time_information.realized_container_delivery_time
-            elif container.delivered_by_large_scheduled_vehicle is not None:
-                vehicle: LargeScheduledVehicle = container.delivered_by_large_scheduled_vehicle
-                container_enters_yard = vehicle.scheduled_arrival
-            else:
-                raise Exception(f"Faulty data: {container}")
-
-            if container.picked_up_by_truck is not None:
-                truck: Truck = container.picked_up_by_truck
-                arrival_time_information: TruckArrivalInformationForPickup = \
-                    truck.truck_arrival_information_for_pickup
-                container_leaves_yard = arrival_time_information.realized_container_pickup_time
-            elif container.picked_up_by_large_scheduled_vehicle is not None:
-                vehicle: LargeScheduledVehicle = container.picked_up_by_large_scheduled_vehicle
-                container_leaves_yard = vehicle.scheduled_arrival
-            else:
-                raise Exception(f"Faulty data: {container}")
-
-            teu_factor_of_container = ContainerLength.get_factor(container.length)
-
-            container_stays.append((container_enters_yard, container_leaves_yard, teu_factor_of_container))
+                container_facts = container_facts[
+                    container_facts["storage_requirement"].isin(list(storage_requirement))
+                ]
 
-        if len(container_stays) == 0:
+        if len(container_facts) == 0:
             return {}
 
-        first_arrival, _, _ = min(container_stays, key=lambda x: x[0])
-        _, last_pickup, _ = max(container_stays, key=lambda x: x[1])
-
-        first_time_window = get_hour_based_time_window(first_arrival) - datetime.timedelta(hours=1)
-        last_time_window = get_hour_based_time_window(last_pickup) + datetime.timedelta(hours=1)
-
-        used_yard_capacity: Dict[datetime.datetime, float] = {
-            time_window: 0
-            for time_window in get_hour_based_range(first_time_window, last_time_window)
-        }
-
-        for (container_enters_yard, container_leaves_yard, teu_factor_of_container) in container_stays:
-            time_window_at_entering = get_hour_based_time_window(container_enters_yard)
-            time_window_at_leaving = get_hour_based_time_window(container_leaves_yard)
-            for time_window in get_hour_based_range(time_window_at_entering, time_window_at_leaving):
-                used_yard_capacity[time_window] += teu_factor_of_container
-
-        return used_yard_capacity
+        if container_facts["enters_yard"].isna().any() or container_facts["leaves_yard"].isna().any():
+            raise Exception("Faulty data: A container is either not delivered or not picked up by any vehicle")
+
+        # The time windows are counted in hours since the epoch
+        entering = container_facts["enters_yard"].to_numpy(dtype=np.int64) // 3600
+        leaving = container_facts["leaves_yard"].to_numpy(dtype=np.int64) // 3600
+        teu_of_containers = container_facts["teu"].to_numpy(dtype=np.float64)
+
+        # the first and the last time window are only added to have an empty yard at the beginning and the end
+        first_time_window = int(entering.min()) - 1
+        last_time_window = int(leaving.max()) + 1
+
+        # Each container occupies the yard from the time window it enters the yard until the time window it leaves the
+        # yard, both inclusive. Instead of adding its TEU to each of these time windows, only the changes are recorded.
+        number_of_time_windows = last_time_window - first_time_window + 1
+        changes_of_used_yard_capacity = (
+            np.bincount(entering - first_time_window, weights=teu_of_containers, minlength=number_of_time_windows)
+            - np.bincount(leaving - first_time_window + 1, weights=teu_of_containers, minlength=number_of_time_windows)
+        )
+        used_yard_capacity_over_time = np.cumsum(changes_of_used_yard_capacity)
+
+        first_time_window_as_datetime = EPOCH + datetime.timedelta(hours=first_time_window)
+        return dict(zip(
+            get_hour_based_range(
+                first_time_window_as_datetime,
+                first_time_window_as_datetime + datetime.timedelta(hours=last_time_window - first_time_window)
+            ),
+            used_yard_capacity_over_time.tolist()
+        ))
@@ -3,6 +3,7 @@ import unittest
 import unittest.mock
 
 from conflowgen.api.container_flow_generation_manager import ContainerFlowGenerationManager
+from conflowgen.application.data_types.generation_engine import GenerationEngine
 from conflowgen.application.models.container_flow_generation_properties import ContainerFlowGenerationProperties
 from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
 from conflowgen.domain_models.distribution_seeders import mode_of_transport_distribution_seeder
@@ -31,6 +32,14 @@ class TestContainerFlowGenerationManager(unittest.TestCase):
             self.container_flow_generation_manager.generate(overwrite=True)
         mock_method.assert_called_once()
 
+    def test_generate_with_engine_given_by_name(self):
+        with unittest.mock.patch.object(
+                self.container_flow_generation_manager.container_flow_generation_service,
+                'generate',
+                return_value=None) as mock_method:
+            self.container_flow_generation_manager.generate(engine="columnar")
+        self.assertEqual(mock_method.call_args.kwargs["engine"], GenerationEngine.columnar)
+
     def test_generate_without_overwrite_and_no_previous_data(self):
         with unittest.mock.patch.object(
                 self.container_flow_generation_manager.container_flow_generation_service,
@@ -70,6 +79,7 @@ class TestContainerFlowGenerationManager(unittest.TestCase):
             maximum_dwell_time_of_import_containers_in_hours = 40
             maximum_dwell_time_of_export_containers_in_hours = 50
             maximum_dwell_time_of_transshipment_containers_in_hours = 60
+            random_seed = 42
 
         dict_properties = {
             'name': "my test data",
@@ -81,7 +91,8 @@ class TestContainerFlowGenerationManager(unittest.TestCase):
             'minimum_dwell_time_of_transshipment_containers_in_hours': 5,
             'maximum_dwell_time_of_import_containers_in_hours': 40,
             'maximum_dwell_time_of_export_containers_in_hours': 50,
-            'maximum_dwell_time_of_transshipment_containers_in_hours': 60
+            'maximum_dwell_time_of_transshipment_containers_in_hours': 60,
+            'random_seed': 42
         }
 
         with unittest.mock.patch.object(
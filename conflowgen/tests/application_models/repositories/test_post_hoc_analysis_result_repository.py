@@ -0,0 +1,181 @@
+import datetime
+import pickle
+import unittest
+import unittest.mock
+
+from conflowgen.application.models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.application.models.post_hoc_analysis_result import PostHocAnalysisResult
+from conflowgen.application.repositories.post_hoc_analysis_result_repository import PostHocAnalysisResultRepository
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.large_vehicle_schedule import Schedule, Destination
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
+from conflowgen.posthoc_analyses.container_flow_by_vehicle_type_analysis import ContainerFlowByVehicleTypeAnalysis
+from conflowgen.posthoc_analyses.inbound_to_outbound_vehicle_capacity_utilization_analysis import \
+    InboundToOutboundVehicleCapacityUtilizationAnalysis
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+called_while_unpickling = []
+
+
+def call_while_unpickling() -> None:
+    called_while_unpickling.append(True)
+
+
+class CallWhileUnpickling:
+
+    def __reduce__(self):
+        return call_while_unpickling, ()
+
+
+class TestPostHocAnalysisResultRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            ContainerFlowGenerationProperties,
+            PostHocAnalysisResult,
+            Schedule,
+            Destination,
+            Container,
+            LargeScheduledVehicle,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup
+        ])
+        self.repository = PostHocAnalysisResultRepository()
+
+    @staticmethod
+    def _create_container() -> Container:
+        return Container.create(
+            weight=20,
+            length=ContainerLength.twenty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.truck,
+            picked_up_by=ModeOfTransport.train,
+            picked_up_by_initial=ModeOfTransport.train
+        )
+
+    def _get_inbound_to_outbound_flow_and_number_of_loads(self):
+        with unittest.mock.patch.object(
+                ContainerFactsRepository, "get_container_facts",
+                wraps=ContainerFactsRepository.get_container_facts) as get_container_facts:
+            inbound_to_outbound_flow = ContainerFlowByVehicleTypeAnalysis.get_inbound_to_outbound_flow()
+        return inbound_to_outbound_flow, get_container_facts.call_count
+
+    def test_store_and_get_result(self):
+        fingerprint = self.repository.get_fingerprint()
+        self.repository.store_result(fingerprint, "analysis", "()", {"result": 1})
+        self.assertTupleEqual(self.repository.get_result(fingerprint, "analysis", "()"), (True, {"result": 1}))
+        self.assertTupleEqual(self.repository.get_result(fingerprint, "analysis", "(1, )"), (False, None))
+        self.assertTupleEqual(self.repository.get_result("other", "analysis", "()"), (False, None))
+
+    def test_analysis_types_are_restored(self):
+        result = {
+            ModeOfTransport.truck: {StorageRequirement.reefer: [datetime.datetime(2021, 7, 9, 11), 1.5]},
+            ContainerLength.twenty_feet: {datetime.date(2021, 7, 9), datetime.timedelta(hours=1)},
+        }
+        self.repository.store_result("fingerprint", "analysis", "()", result)
+        self.assertTupleEqual(self.repository.get_result("fingerprint", "analysis", "()"), (True, result))
+
+    def test_tampered_result_is_rejected(self):
+        self.repository.store_result("fingerprint", "analysis", "()", 1)
+        PostHocAnalysisResult.update(result=pickle.dumps(CallWhileUnpickling())).execute()
+        with self.assertLogs("conflowgen", level="WARNING"):
+            self.assertTupleEqual(self.repository.get_result("fingerprint", "analysis", "()"), (False, None))
+        self.assertListEqual(called_while_unpickling, [])
+
+        PostHocAnalysisResult.update(result=b"no pickle").execute()
+        with self.assertLogs("conflowgen", level="WARNING"):
+            self.assertTupleEqual(self.repository.get_result("fingerprint", "analysis", "()"), (False, None))
+
+    def test_results_of_other_fingerprints_are_removed(self):
+        self.repository.store_result("old", "analysis", "()", 1)
+        self.repository.store_result("new", "other analysis", "()", 2)
+        self.assertListEqual(
+            list(PostHocAnalysisResult.select(PostHocAnalysisResult.analysis).tuples()),
+            [("other analysis", )]
+        )
+
+    def test_clear(self):
+        self.repository.store_result("fingerprint", "analysis", "()", 1)
+        self.repository.clear()
+        self.assertEqual(PostHocAnalysisResult.select().count(), 0)
+
+    def test_missing_table_is_created_when_storing(self):
+        PostHocAnalysisResult.drop_table()
+        self.assertTupleEqual(self.repository.get_result("fingerprint", "analysis", "()"), (False, None))
+        self.repository.store_result("fingerprint", "analysis", "()", 1)
+        self.assertTupleEqual(self.repository.get_result("fingerprint", "analysis", "()"), (True, 1))
+
+    def test_fingerprint_changes_with_input_data(self):
+        fingerprint = self.repository.get_fingerprint()
+        self.assertEqual(self.repository.get_fingerprint(), fingerprint)
+        ContainerFlowGenerationProperties.create(random_seed=1)
+        fingerprint_with_seed = self.repository.get_fingerprint()
+        self.assertNotEqual(fingerprint_with_seed, fingerprint)
+        ContainerFlowGenerationProperties.update(random_seed=2).execute()
+        self.assertNotEqual(self.repository.get_fingerprint(), fingerprint_with_seed)
+
+    def test_fingerprint_changes_with_number_of_containers(self):
+        fingerprint = self.repository.get_fingerprint()
+        self._create_container()
+        self.assertNotEqual(self.repository.get_fingerprint(), fingerprint)
+
+    def test_stored_result_is_returned_until_container_flow_changes(self):
+        self._create_container()
+        inbound_to_outbound_flow, number_of_loads = self._get_inbound_to_outbound_flow_and_number_of_loads()
+        self.assertEqual(number_of_loads, 1)
+        self.assertEqual(inbound_to_outbound_flow[ModeOfTransport.truck][ModeOfTransport.train], 1)
+
+        inbound_to_outbound_flow, number_of_loads = self._get_inbound_to_outbound_flow_and_number_of_loads()
+        self.assertEqual(number_of_loads, 0, "The stored result is returned")
+        self.assertEqual(inbound_to_outbound_flow[ModeOfTransport.truck][ModeOfTransport.train], 1)
+
+        self._create_container()
+        inbound_to_outbound_flow, number_of_loads = self._get_inbound_to_outbound_flow_and_number_of_loads()
+        self.assertEqual(number_of_loads, 1)
+        self.assertEqual(inbound_to_outbound_flow[ModeOfTransport.truck][ModeOfTransport.train], 2)
+
+    def test_results_are_stored_for_each_argument(self):
+        self._create_container()
+        in_containers = ContainerFlowByVehicleTypeAnalysis.get_inbound_to_outbound_flow(as_teu=False)
+        in_teu = ContainerFlowByVehicleTypeAnalysis.get_inbound_to_outbound_flow(as_teu=True)
+        self.assertEqual(in_containers[ModeOfTransport.truck][ModeOfTransport.train], 1)
+        self.assertEqual(in_teu[ModeOfTransport.truck][ModeOfTransport.train], 1)
+        self.assertEqual(PostHocAnalysisResult.select().count(), 2)
+
+        # the same arguments are recognized independent of how they are passed
+        ContainerFlowByVehicleTypeAnalysis.get_inbound_to_outbound_flow(False)
+        self.assertEqual(PostHocAnalysisResult.select().count(), 2)
+
+    def test_order_of_vehicle_types_in_set_is_ignored(self):
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 8, 5),
+            vehicle_arrives_at_time=datetime.time(13, 15),
+            average_vehicle_capacity=300,
+            average_moved_capacity=250
+        )
+        LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=250,
+            scheduled_arrival=datetime.datetime(2021, 8, 5, 13, 15),
+            schedule=schedule
+        )
+        analysis = InboundToOutboundVehicleCapacityUtilizationAnalysis(transportation_buffer=0.2)
+        analysis.get_inbound_and_outbound_capacity_of_each_vehicle(
+            vehicle_type={ModeOfTransport.feeder, ModeOfTransport.deep_sea_vessel}
+        )
+        analysis.get_inbound_and_outbound_capacity_of_each_vehicle(
+            vehicle_type={ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder}
+        )
+        self.assertEqual(PostHocAnalysisResult.select().count(), 1)
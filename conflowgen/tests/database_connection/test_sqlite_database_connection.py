@@ -1,5 +1,10 @@
+import datetime
 import unittest
 
+from playhouse.migrate import SqliteMigrator, migrate
+
+from conflowgen.api.container_flow_generation_manager import ContainerFlowGenerationManager
+from conflowgen.application.models.container_flow_generation_properties import ContainerFlowGenerationProperties
 from conflowgen.database_connection.sqlite_database_connection import SqliteDatabaseConnection, \
     SqliteDatabaseIsMissingException
 
@@ -70,3 +75,35 @@ class TestSqliteDatabaseConnection(unittest.TestCase):
         successfully_closed_2 = sqlite_db_connection_2.close()
         self.assertTrue(successfully_closed_2)
         self.sqlite_database_connection.delete_database(test_database_name)
+
+    def test_load_existent_database_with_missing_column(self):
+        test_database_name = "testing-existent--test_load_existent_database_with_missing_column.sqlite"
+        if test_database_name in self.sqlite_database_connection.list_all_sqlite_databases():
+            self.sqlite_database_connection.delete_database(test_database_name)
+        sqlite_db_connection_1 = self.sqlite_database_connection.choose_database(
+            test_database_name,
+            create=True,
+            reset=False
+        )
+        ContainerFlowGenerationProperties.create(name="scenario created by an older version")
+        # the database has been created before the random seed could be set
+        table_name = ContainerFlowGenerationProperties._meta.table_name  # pylint: disable=protected-access,no-member
+        migrate(SqliteMigrator(sqlite_db_connection_1).drop_column(table_name, "random_seed"))
+        sqlite_db_connection_1.close()
+
+        sqlite_db_connection_2 = self.sqlite_database_connection.choose_database(
+            test_database_name,
+            create=False,
+            reset=False
+        )
+        properties = ContainerFlowGenerationManager().get_properties()
+        self.assertEqual(properties["name"], "scenario created by an older version")
+        self.assertIsNone(properties["random_seed"])
+        ContainerFlowGenerationManager().set_properties(
+            start_date=datetime.date(2021, 7, 1),
+            end_date=datetime.date(2021, 7, 31),
+            random_seed=1
+        )
+        self.assertEqual(ContainerFlowGenerationManager().get_properties()["random_seed"], 1)
+        sqlite_db_connection_2.close()
+        self.sqlite_database_connection.delete_database(test_database_name)
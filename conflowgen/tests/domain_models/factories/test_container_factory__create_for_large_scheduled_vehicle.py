@@ -4,6 +4,7 @@ Check if containers can be stored in the database, i.e. the ORM model is working
 
 import datetime
 import unittest
+import unittest.mock
 
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_models.container_length_distribution import ContainerLengthDistribution
@@ -15,10 +16,12 @@ from conflowgen.domain_models.distribution_seeders import mode_of_transport_dist
     container_storage_requirement_distribution_seeder
 from conflowgen.domain_models.factories.container_factory import ContainerFactory
 from conflowgen.domain_models.factories.fleet_factory import FleetFactory
+from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.large_vehicle_schedule import Destination
 from conflowgen.domain_models.vehicle import Feeder, LargeScheduledVehicle, Schedule, Truck
 from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+from conflowgen.tools import bulk_operations
 
 
 class TestContainerFactory(unittest.TestCase):
@@ -80,3 +83,26 @@ class TestContainerFactory(unittest.TestCase):
             feeder_1.large_scheduled_vehicle
         )
         self.assertIsNone(containers[0].delivered_by_truck)
+
+    def test_create_many_containers_for_feeder_vessel(self) -> None:
+        feeder_1 = self.feeders[1]
+        feeder_1.large_scheduled_vehicle.moved_capacity = 1200
+        feeder_1.large_scheduled_vehicle.save()
+        # lower the limit so that the containers are inserted in several batches
+        with unittest.mock.patch.object(bulk_operations, "MAXIMUM_NUMBER_OF_VARIABLES_PER_STATEMENT", 99):
+            containers = self.container_factory.create_containers_for_large_scheduled_vehicle(feeder_1)
+            self.assertGreater(len(containers), bulk_operations.get_batch_size(number_of_variables_per_row=1))
+        self.assertEqual(len(containers), Container.select().count())
+        used_capacity_in_teu = 0
+        for container in containers:
+            container_in_database = Container.get_by_id(container.id)
+            self.assertEqual(container.length, container_in_database.length)
+            self.assertEqual(container.weight, container_in_database.weight)
+            self.assertEqual(container.picked_up_by, container_in_database.picked_up_by)
+            self.assertEqual(
+                container_in_database.delivered_by_large_scheduled_vehicle,
+                feeder_1.large_scheduled_vehicle
+            )
+            used_capacity_in_teu += ContainerLength.get_factor(container.length)
+        self.assertLessEqual(used_capacity_in_teu, 1200)
+        self.assertGreaterEqual(used_capacity_in_teu, 1200 - self.container_factory.ignored_capacity)
@@ -2,6 +2,7 @@
 Check if containers can be stored in the database, i.e. the ORM model is working.
 """
 
+import collections
 import datetime
 import unittest
 
@@ -107,3 +108,26 @@ class TestContainerFactory(unittest.TestCase):
             None,
             msg="Truck is assigned later"
         )
+
+    def test_create_containers_for_truck_within_session(self) -> None:
+        self.container_factory.start_session_for_containers_delivered_by_truck(100)
+        approximator = self.container_factory.length_approximator_for_containers_delivered_by_truck
+        expected_lengths = dict(zip(approximator.categories, approximator.target_distribution))
+
+        containers = [
+            self.container_factory.create_container_for_delivering_truck(
+                picked_up_by_large_scheduled_vehicle_subtype=self.feeder
+            )
+            for _ in range(100)
+        ]
+
+        counted_lengths = collections.Counter(container.length for container in containers)
+        for length, expected_number in expected_lengths.items():
+            self.assertEqual(counted_lengths[length], expected_number)
+
+        # once the session is exhausted, each container falls back to drawing its length on its own
+        container = self.container_factory.create_container_for_delivering_truck(
+            picked_up_by_large_scheduled_vehicle_subtype=self.feeder
+        )
+        self.assertIn(container.length, expected_lengths)
+        self.assertIsNone(self.container_factory.length_approximator_for_containers_delivered_by_truck)
@@ -0,0 +1,125 @@
+import datetime
+import unittest
+import unittest.mock
+
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.large_vehicle_schedule import Schedule, Destination
+from conflowgen.domain_models.repositories.container_facts_repository import ContainerFactsRepository
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck, Feeder
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestContainerFactsRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule,
+            Container,
+            LargeScheduledVehicle,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
+            Feeder,
+            Destination
+        ])
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+        self.feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=300,
+            scheduled_arrival=datetime.datetime(2021, 7, 9, 11),
+            schedule=schedule
+        )
+        Feeder.create(
+            large_scheduled_vehicle=self.feeder_lsv
+        )
+        truck_arrival_information_for_delivery = TruckArrivalInformationForDelivery.create(
+            planned_container_delivery_time_at_window_start=datetime.datetime(2021, 7, 7, 12),
+            realized_container_delivery_time=datetime.datetime(2021, 7, 7, 12, 30, 15)
+        )
+        self.truck = Truck.create(
+            delivers_container=True,
+            picks_up_container=False,
+            truck_arrival_information_for_delivery=truck_arrival_information_for_delivery,
+            truck_arrival_information_for_pickup=None
+        )
+
+    def _create_container(self) -> Container:
+        return Container.create(
+            weight=20,
+            length=ContainerLength.forty_feet,
+            storage_requirement=StorageRequirement.reefer,
+            delivered_by=ModeOfTransport.truck,
+            delivered_by_truck=self.truck,
+            picked_up_by=ModeOfTransport.feeder,
+            picked_up_by_initial=ModeOfTransport.truck,
+            picked_up_by_large_scheduled_vehicle=self.feeder_lsv
+        )
+
+    def test_with_no_data(self):
+        container_facts = ContainerFactsRepository.get_container_facts()
+        self.assertEqual(len(container_facts), 0)
+        self.assertIn("enters_yard", container_facts.columns)
+
+    def test_facts_of_container(self):
+        container = self._create_container()
+        container_facts = ContainerFactsRepository.get_container_facts()
+        self.assertEqual(len(container_facts), 1)
+        facts = container_facts.iloc[0]
+        self.assertEqual(facts["id"], container.id)
+        self.assertEqual(facts["length"], ContainerLength.forty_feet)
+        self.assertEqual(facts["teu"], 2)
+        self.assertEqual(facts["storage_requirement"], StorageRequirement.reefer)
+        self.assertEqual(facts["delivered_by"], ModeOfTransport.truck)
+        self.assertEqual(facts["picked_up_by_initial"], ModeOfTransport.truck)
+        self.assertEqual(facts["picked_up_by"], ModeOfTransport.feeder)
+        self.assertEqual(facts["delivered_by_truck"], self.truck.id)
+        self.assertEqual(facts["picked_up_by_large_scheduled_vehicle"], self.feeder_lsv.id)
+        self.assertTrue(container_facts["delivered_by_large_scheduled_vehicle"].isna().all())
+        self.assertTrue(container_facts["picked_up_by_truck"].isna().all())
+        self.assertEqual(
+            facts["enters_yard"],
+            (datetime.datetime(2021, 7, 7, 12, 30, 15) - datetime.datetime(1970, 1, 1)).total_seconds()
+        )
+        self.assertEqual(
+            facts["leaves_yard"],
+            (datetime.datetime(2021, 7, 9, 11) - datetime.datetime(1970, 1, 1)).total_seconds()
+        )
+
+    def test_facts_are_loaded_only_once(self):
+        self._create_container()
+        with unittest.mock.patch.object(
+                self.sqlite_db, "execute_sql", wraps=self.sqlite_db.execute_sql) as execute_sql:
+            container_facts = ContainerFactsRepository.get_container_facts()
+            self.assertIs(ContainerFactsRepository.get_container_facts(), container_facts)
+        self.assertEqual(execute_sql.call_count, 1)
+
+    def test_facts_are_loaded_again_after_change(self):
+        self._create_container()
+        self.assertEqual(len(ContainerFactsRepository.get_container_facts()), 1)
+        self._create_container()
+        self.assertEqual(len(ContainerFactsRepository.get_container_facts()), 2)
+        Container.update(storage_requirement=StorageRequirement.standard).execute()
+        self.assertListEqual(
+            ContainerFactsRepository.get_container_facts()["storage_requirement"].tolist(),
+            [StorageRequirement.standard] * 2
+        )
+
+    def test_facts_are_loaded_again_after_invalidation(self):
+        container_facts = ContainerFactsRepository.get_container_facts()
+        ContainerFactsRepository.invalidate()
+        self.assertIsNot(ContainerFactsRepository.get_container_facts(), container_facts)
@@ -102,3 +102,51 @@ class TestLargeScheduledVehicleRepository(unittest.TestCase):
 
         free_capacity_in_teu = self.lsv_repository.get_free_capacity_for_outbound_journey(self.train)
         self.assertEqual(free_capacity_in_teu, 0.5)
+
+    def test_load_free_capacities_for_inbound_and_outbound_journey(self):
+        Container.create(
+            weight=20,
+            length=ContainerLength.forty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.truck,
+            picked_up_by=ModeOfTransport.train,
+            picked_up_by_initial=ModeOfTransport.train,
+            picked_up_by_large_scheduled_vehicle=self.train_lsv,
+        )
+        Container.create(
+            weight=20,
+            length=ContainerLength.twenty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.train,
+            delivered_by_large_scheduled_vehicle=self.train_lsv,
+            picked_up_by=ModeOfTransport.truck,
+            picked_up_by_initial=ModeOfTransport.truck,
+        )
+
+        self.lsv_repository.load_free_capacities([self.train])
+
+        self.assertEqual(self.lsv_repository.free_capacity_for_outbound_journey_buffer[self.train], 1)
+        self.assertEqual(self.lsv_repository.free_capacity_for_inbound_journey_buffer[self.train], 2)
+
+    def test_load_free_capacities_matches_counting_per_vehicle(self):
+        for container_length in ContainerLength:
+            Container.create(
+                weight=20,
+                length=container_length,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=ModeOfTransport.train,
+                delivered_by_large_scheduled_vehicle=self.train_lsv,
+                picked_up_by=ModeOfTransport.truck,
+                picked_up_by_initial=ModeOfTransport.truck,
+            )
+        self.train_lsv.moved_capacity = 10
+        self.train_lsv.save()
+        train = Train.get_by_id(self.train.id)
+
+        self.lsv_repository.load_free_capacities([train])
+        bulk_loaded_free_capacity = self.lsv_repository.free_capacity_for_inbound_journey_buffer[train]
+        self.lsv_repository.reset_cache()
+        counted_free_capacity = self.lsv_repository.get_free_capacity_for_inbound_journey(train)
+
+        self.assertEqual(bulk_loaded_free_capacity, counted_free_capacity)
+        self.assertEqual(bulk_loaded_free_capacity, 10 - 1 - 2 - 2.25 - 2.5)
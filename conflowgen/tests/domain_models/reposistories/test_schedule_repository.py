@@ -298,3 +298,93 @@ class TestScheduleRepository(unittest.TestCase):
                 required_capacity=ContainerLength.twenty_feet
             )
         mock_method.assert_called_once_with(train)
+
+    def _create_train(self, vehicle_name: str, scheduled_arrival: datetime.datetime, moved_capacity: int) -> Train:
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.train,
+            service_name="TestService" + vehicle_name,
+            vehicle_arrives_at=scheduled_arrival.date(),
+            vehicle_arrives_at_time=scheduled_arrival.time(),
+            average_vehicle_capacity=90,
+            average_moved_capacity=moved_capacity,
+        )
+        train_lsv = LargeScheduledVehicle.create(
+            vehicle_name=vehicle_name,
+            capacity_in_teu=90,
+            moved_capacity=moved_capacity,
+            scheduled_arrival=scheduled_arrival,
+            schedule=schedule
+        )
+        return Train.create(
+            large_scheduled_vehicle=train_lsv
+        )
+
+    def test_departure_index_finds_vehicles_in_time_range(self):
+        train_1 = self._create_train("TestTrain1", datetime.datetime(2021, 8, 7, 13, 15), moved_capacity=7)
+        train_2 = self._create_train("TestTrain2", datetime.datetime(2021, 8, 9, 13, 15), moved_capacity=7)
+        self._create_train("TestTrain3", datetime.datetime(2021, 8, 12, 13, 15), moved_capacity=7)
+
+        self.schedule_repository.build_departure_index()
+        with unittest.mock.patch.object(Train, 'select') as mock_select:
+            vehicles = self.schedule_repository.get_departing_vehicles(
+                start=datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15),
+                end=datetime.datetime(year=2021, month=8, day=10, hour=23, minute=59),
+                vehicle_type=ModeOfTransport.train,
+                required_capacity=ContainerLength.twenty_feet
+            )
+        mock_select.assert_not_called()
+        self.assertListEqual(vehicles, [train_1, train_2])
+
+    def test_departure_index_drops_vehicle_without_free_capacity(self):
+        train = self._create_train("TestTrain1", datetime.datetime(2021, 8, 7, 13, 15), moved_capacity=2)
+        self.schedule_repository.build_departure_index()
+        start = datetime.datetime(year=2021, month=8, day=5)
+        end = datetime.datetime(year=2021, month=8, day=10)
+
+        container = Container.create(
+            weight=20,
+            length=ContainerLength.twenty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.truck,
+            picked_up_by=ModeOfTransport.train,
+            picked_up_by_initial=ModeOfTransport.train
+        )
+        self.schedule_repository.block_capacity_for_outbound_journey(train, container)
+        self.assertEqual(len(self.schedule_repository.departing_vehicle_indices[ModeOfTransport.train]), 1)
+        vehicles = self.schedule_repository.get_departing_vehicles(
+            start, end, vehicle_type=ModeOfTransport.train, required_capacity=ContainerLength.forty_feet
+        )
+        self.assertListEqual(vehicles, [])
+
+        self.schedule_repository.block_capacity_for_outbound_journey(train, container)
+        self.assertEqual(len(self.schedule_repository.departing_vehicle_indices[ModeOfTransport.train]), 0)
+        vehicles = self.schedule_repository.get_departing_vehicles(
+            start, end, vehicle_type=ModeOfTransport.train, required_capacity=ContainerLength.twenty_feet
+        )
+        self.assertListEqual(vehicles, [])
+
+    def test_pick_departing_vehicle_with_sufficient_capacity(self):
+        train_1 = self._create_train("TestTrain1", datetime.datetime(2021, 8, 7, 13, 15), moved_capacity=1)
+        train_2 = self._create_train("TestTrain2", datetime.datetime(2021, 8, 8, 13, 15), moved_capacity=2)
+        self._create_train("TestTrain3", datetime.datetime(2021, 8, 20, 13, 15), moved_capacity=2)
+        start = datetime.datetime(year=2021, month=8, day=5)
+        end = datetime.datetime(year=2021, month=8, day=10)
+
+        for build_departure_index in (False, True):
+            if build_departure_index:
+                self.schedule_repository.build_departure_index()
+            picked_vehicles_for_twenty_feet = {
+                self.schedule_repository.pick_departing_vehicle(
+                    start, end, vehicle_type=ModeOfTransport.train, required_capacity=ContainerLength.twenty_feet
+                )
+                for _ in range(100)
+            }
+            self.assertSetEqual(picked_vehicles_for_twenty_feet, {train_1, train_2})
+            picked_vehicle_for_forty_feet = self.schedule_repository.pick_departing_vehicle(
+                start, end, vehicle_type=ModeOfTransport.train, required_capacity=ContainerLength.forty_feet
+            )
+            self.assertEqual(picked_vehicle_for_forty_feet, train_2)
+            picked_vehicle_for_forty_five_feet = self.schedule_repository.pick_departing_vehicle(
+                start, end, vehicle_type=ModeOfTransport.train, required_capacity=ContainerLength.forty_five_feet
+            )
+            self.assertIsNone(picked_vehicle_for_forty_five_feet)
@@ -22,8 +22,8 @@ class TestContainer(unittest.TestCase):
 
     def setUp(self) -> None:
         """Create container database in memory"""
-        sqlite_db = setup_sqlite_in_memory_db()
-        sqlite_db.create_tables([
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
             Container,
             Truck,
             LargeScheduledVehicle,
@@ -81,3 +81,22 @@ class TestContainer(unittest.TestCase):
                 length=ContainerLength.forty_feet,
                 storage_requirement=None
             ).save()
+
+    def _get_names_of_indexes(self):
+        return {row[1] for row in self.sqlite_db.execute_sql("PRAGMA index_list('container')").fetchall()}
+
+    def test_secondary_indexes_are_created_together_with_table(self) -> None:
+        self.assertIn("container_picked_up_by_large_scheduled_vehicle_id_length", self._get_names_of_indexes())
+        self.assertIn("container_picked_up_by_delivered_by", self._get_names_of_indexes())
+
+    def test_drop_and_create_secondary_indexes(self) -> None:
+        names_of_all_indexes = self._get_names_of_indexes()
+        Container.drop_secondary_indexes()
+        self.assertSetEqual(
+            names_of_all_indexes - self._get_names_of_indexes(),
+            {index._name for index in Container.get_secondary_indexes()}  # pylint: disable=protected-access
+        )
+        self.assertIn("container_delivered_by_truck_id", self._get_names_of_indexes(), "foreign keys keep their index")
+        Container.create_secondary_indexes()
+        Container.create_secondary_indexes()
+        self.assertSetEqual(names_of_all_indexes, self._get_names_of_indexes())
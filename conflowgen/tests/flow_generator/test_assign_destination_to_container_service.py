@@ -1,5 +1,6 @@
 import datetime
 import unittest
+import unittest.mock
 
 from conflowgen.flow_generator.assign_destination_to_container_service import \
     AssignDestinationToContainerService
@@ -22,8 +23,8 @@ class TestAssignDestinationToContainerService(unittest.TestCase):
 
     def setUp(self) -> None:
         """Create container database in memory"""
-        sqlite_db = setup_sqlite_in_memory_db()
-        sqlite_db.create_tables([
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
             Schedule,
             LargeScheduledVehicle,
             Container,
@@ -203,3 +204,51 @@ class TestAssignDestinationToContainerService(unittest.TestCase):
         container_update: Container = Container.get_by_id(container.id)
 
         self.assertIsNone(container_update.destination)
+
+    def _count_update_statements_for_assigning_destinations(self, number_containers: int) -> int:
+        truck = self._create_truck(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        for _ in range(number_containers):
+            container = self._create_container_for_truck(truck)
+            container.picked_up_by_large_scheduled_vehicle = feeder.large_scheduled_vehicle
+            container.save()
+
+        schedule = feeder.large_scheduled_vehicle.schedule
+        destination_1 = Destination.create(
+            belongs_to_schedule=schedule,
+            sequence_id=1,
+            destination_name="TestDestination1",
+        )
+        destination_2 = Destination.create(
+            belongs_to_schedule=schedule,
+            sequence_id=2,
+            destination_name="TestDestination2",
+        )
+        self.repository.set_distribution({
+            schedule: {
+                destination_1: 0.4,
+                destination_2: 0.6
+            }
+        })
+        self.service.reload_distribution()
+
+        with unittest.mock.patch.object(
+                self.sqlite_db, "execute_sql", wraps=self.sqlite_db.execute_sql) as execute_sql:
+            self.service.assign()
+
+        self.assertEqual(Container.select().where(Container.destination.is_null()).count(), 0)
+        return len([
+            call for call in execute_sql.call_args_list
+            if call.args[0].startswith("UPDATE")
+        ])
+
+    def test_destinations_of_schedule_are_updated_with_one_statement(self):
+        self.assertEqual(self._count_update_statements_for_assigning_destinations(500), 1)
+
+    def test_destinations_are_assigned_according_to_distribution(self):
+        self._count_update_statements_for_assigning_destinations(500)
+        number_containers_for_destination_2 = Container.select().join(
+            Destination, on=Container.destination
+        ).where(Destination.sequence_id == 2).count()
+        self.assertGreater(number_containers_for_destination_2, 500 * 0.5)
+        self.assertLess(number_containers_for_destination_2, 500 * 0.7)
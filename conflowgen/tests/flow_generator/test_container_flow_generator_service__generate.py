@@ -1,10 +1,15 @@
 import datetime
 import unittest
+import unittest.mock
 
 from conflowgen import PortCallManager
+from conflowgen.application.data_types.generation_engine import GenerationEngine
+from conflowgen.application.data_types.transaction_scope import TransactionScope
 from conflowgen.application.models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.application.models.post_hoc_analysis_result import PostHocAnalysisResult
 from conflowgen.application.repositories.container_flow_generation_properties_repository import \
     ContainerFlowGenerationPropertiesRepository
+from conflowgen.application.repositories.post_hoc_analysis_result_repository import PostHocAnalysisResultRepository
 from conflowgen.database_connection.create_tables import create_tables
 from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
 from conflowgen.domain_models.distribution_models.storage_requirement_distribution import StorageRequirementDistribution
@@ -13,6 +18,10 @@ from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTranspor
 from conflowgen.flow_generator.container_flow_generation_service import \
     ContainerFlowGenerationService
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForPickup, \
+    TruckArrivalInformationForDelivery
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.vehicle import Truck, LargeScheduledVehicle, Feeder, DeepSeaVessel, Train
 from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
 
 
@@ -38,7 +47,7 @@ class TestContainerFlowGeneratorService__generate(unittest.TestCase):
 
         self.container_Flow_generator_service = ContainerFlowGenerationService()
 
-    def test_happy_path_no_mocking(self):
+    def _add_schedules(self):
         create_tables(self.sqlite_db)
         seed_all_distributions()
         port_call_manager = PortCallManager()
@@ -60,4 +69,163 @@ class TestContainerFlowGeneratorService__generate(unittest.TestCase):
             average_moved_capacity=100,
             next_destinations=None
         )
+
+    def test_happy_path_no_mocking(self):
+        self._add_schedules()
         self.container_Flow_generator_service.generate()
+
+    def test_happy_path_for_all_transaction_scopes(self):
+        self._add_schedules()
+        for transaction_scope in TransactionScope:
+            self.container_Flow_generator_service.generate(transaction_scope=transaction_scope)
+            self.assertGreater(Container.select().count(), 0)
+
+    def test_failed_generation_keeps_previous_container_flow(self):
+        self._add_schedules()
+        self.container_Flow_generator_service.generate()
+        ids_of_previous_containers = [container.id for container in Container.select().order_by(Container.id)]
+        self.assertGreater(len(ids_of_previous_containers), 0)
+
+        with unittest.mock.patch.object(
+                self.container_Flow_generator_service.assign_destination_to_container_service,
+                'assign',
+                side_effect=RuntimeError("Failure in last phase")):
+            with self.assertRaises(RuntimeError):
+                self.container_Flow_generator_service.generate(transaction_scope=TransactionScope.run)
+
+        self.assertListEqual(
+            ids_of_previous_containers,
+            [container.id for container in Container.select().order_by(Container.id)]
+        )
+
+    def test_failed_generation_with_transaction_per_phase_keeps_committed_phases(self):
+        self._add_schedules()
+        with unittest.mock.patch.object(
+                self.container_Flow_generator_service.truck_for_import_containers_manager,
+                'generate_trucks_for_picking_up',
+                side_effect=RuntimeError("Failure in third phase")):
+            with self.assertRaises(RuntimeError):
+                self.container_Flow_generator_service.generate(
+                    transaction_scope=TransactionScope.phase,
+                    phases_per_transaction=2
+                )
+        self.assertGreater(Container.select().count(), 0, "The first two phases have been committed")
+        self.assertEqual(Truck.select().count(), 0, "Trucks are only generated in later phases")
+
+    def test_previous_container_flow_is_removed_completely(self):
+        self._add_schedules()
+        self.container_Flow_generator_service.generate()
+        self.assertGreater(Truck.select().count(), 0)
+
+        self.container_Flow_generator_service.generate(vacuum=True)
+        self.assertEqual(
+            TruckArrivalInformationForPickup.select().count() + TruckArrivalInformationForDelivery.select().count(),
+            Truck.select().count(),
+            "Each truck has exactly one arrival information, no arrival information is left from the first run"
+        )
+
+        PostHocAnalysisResultRepository.store_result("fingerprint", "analysis", "()", 1)
+        self.container_Flow_generator_service.clear_previous_container_flow()
+        for model in (Container, LargeScheduledVehicle, Feeder, DeepSeaVessel, Truck, TruckArrivalInformationForPickup,
+                      TruckArrivalInformationForDelivery, PostHocAnalysisResult):
+            self.assertEqual(model.select().count(), 0, f"{model.__name__} is empty")
+
+    def test_deferred_index_creation_generates_same_container_flow(self):
+        self._add_schedules()
+        self._set_random_seed(1357)
+        container_flow_with_indexes = self._generate_and_dump_container_flow()
+        container_flow_with_deferred_indexes = self._generate_and_dump_container_flow(defer_index_creation=True)
+        self.assertEqual(container_flow_with_indexes, container_flow_with_deferred_indexes)
+        self.assertIn("container_picked_up_by_delivered_by", [
+            row[1] for row in self.sqlite_db.execute_sql("PRAGMA index_list('container')").fetchall()
+        ])
+
+    def _set_random_seed(self, random_seed: int):
+        properties_repository = ContainerFlowGenerationPropertiesRepository()
+        properties = properties_repository.get_container_flow_generation_properties()
+        properties.random_seed = random_seed
+        properties_repository.set_container_flow_generation_properties(properties)
+
+    def _generate_and_dump_container_flow(self, **kwargs):
+        self.container_Flow_generator_service.generate(**kwargs)
+        return [
+            container.__data__ for container in Container.select().order_by(Container.id)
+        ], list(Container.select(
+            Container.id,
+            TruckArrivalInformationForPickup.realized_container_pickup_time
+        ).join(
+            Truck, on=(Container.picked_up_by_truck == Truck.id)
+        ).join(
+            TruckArrivalInformationForPickup,
+            on=(Truck.truck_arrival_information_for_pickup == TruckArrivalInformationForPickup.id)
+        ).order_by(Container.id).tuples())
+
+    def test_same_seed_generates_same_container_flow(self):
+        self._add_schedules()
+        self._set_random_seed(12345)
+
+        first_run = self._generate_and_dump_container_flow()
+        self.assertGreater(len(first_run[0]), 0)
+        second_run = self._generate_and_dump_container_flow()
+        self.assertEqual(first_run, second_run)
+        parallel_run = self._generate_and_dump_container_flow(number_of_processes=2)
+        self.assertEqual(first_run, parallel_run)
+
+        self._set_random_seed(54321)
+        run_with_other_seed = self._generate_and_dump_container_flow()
+        self.assertNotEqual(first_run, run_with_other_seed)
+
+    def _dump_vehicles_and_trucks(self):
+        return [
+            vehicle.__data__ for vehicle in LargeScheduledVehicle.select().order_by(LargeScheduledVehicle.id)
+        ], [
+            [row.__data__ for row in subtype.select().order_by(subtype.id)]
+            for subtype in (Feeder, DeepSeaVessel, Train)
+        ], [
+            [row.__data__ for row in model.select().order_by(model.id)]
+            for model in (Truck, TruckArrivalInformationForPickup, TruckArrivalInformationForDelivery)
+        ]
+
+    def test_columnar_engine_generates_same_container_flow(self):
+        self._add_schedules()
+        port_call_manager = PortCallManager()
+        port_call_manager.add_large_scheduled_vehicle(
+            vehicle_type=ModeOfTransport.train,
+            service_name="TestTrain",
+            vehicle_arrives_at=datetime.date(2021, 7, 10),
+            vehicle_arrives_at_time=datetime.time(8),
+            average_vehicle_capacity=90,
+            average_moved_capacity=90,
+            next_destinations=[("StationA", 0.3), ("StationB", 0.7)],
+            vehicle_arrives_every_k_days=2
+        )
+        self._set_random_seed(2468)
+
+        container_flow_of_peewee_engine = self._generate_and_dump_container_flow(engine=GenerationEngine.peewee)
+        vehicles_and_trucks_of_peewee_engine = self._dump_vehicles_and_trucks()
+        self.assertGreater(len(container_flow_of_peewee_engine[0]), 0)
+        self.assertTrue(any(
+            container["destination"] is not None for container in container_flow_of_peewee_engine[0]
+        ))
+
+        container_flow_of_columnar_engine = self._generate_and_dump_container_flow(engine=GenerationEngine.columnar)
+        self.assertEqual(container_flow_of_peewee_engine, container_flow_of_columnar_engine)
+        self.assertEqual(vehicles_and_trucks_of_peewee_engine, self._dump_vehicles_and_trucks())
+
+    def test_failed_generation_with_columnar_engine_keeps_previous_container_flow(self):
+        self._add_schedules()
+        self.container_Flow_generator_service.generate(engine=GenerationEngine.columnar)
+        ids_of_previous_containers = [container.id for container in Container.select().order_by(Container.id)]
+        self.assertGreater(len(ids_of_previous_containers), 0)
+
+        with unittest.mock.patch.object(
+                self.container_Flow_generator_service.assign_destination_to_container_service,
+                'get_schedules_with_destinations',
+                side_effect=RuntimeError("Failure in last phase")):
+            with self.assertRaises(RuntimeError):
+                self.container_Flow_generator_service.generate(engine=GenerationEngine.columnar)
+
+        self.assertListEqual(
+            ids_of_previous_containers,
+            [container.id for container in Container.select().order_by(Container.id)]
+        )
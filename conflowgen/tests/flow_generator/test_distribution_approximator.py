@@ -84,3 +84,45 @@ class TestDistributionApproximator(unittest.TestCase):
         self.assertGreaterEqual(counted_samples["a"], 1)
         self.assertGreaterEqual(counted_samples["b"], 1)
         self.assertEqual(counted_samples["a"] + counted_samples["b"], 3)
+
+    def test_precomputed_sequence(self) -> None:
+        """Check if the precomputed sequence draws exactly the given elements."""
+        da = DistributionApproximator({
+            "a": 4,
+            "b": 2,
+            "c": 10
+        }, precompute_sequence=True)
+        all_samples = []
+        for _ in range(16):  # 4 + 2 + 10
+            all_samples.append(da.sample())
+        counted_samples = collections.Counter(all_samples)
+
+        self.assertDictEqual(counted_samples, {
+            "a": 4,
+            "b": 2,
+            "c": 10
+        })
+        with self.assertRaises(SamplerExhaustedException):
+            da.sample()
+
+    def test_sample_many(self) -> None:
+        """Check if drawing several elements at once draws exactly the given elements."""
+        for precompute_sequence in (False, True):
+            da = DistributionApproximator({
+                "a": 4,
+                "b": 2,
+                "c": 10
+            }, precompute_sequence=precompute_sequence)
+            first_samples = da.sample_many(6)
+            last_samples = da.sample_many(10)
+            counted_samples = collections.Counter(
+                da.categories[i] for i in list(first_samples) + list(last_samples)
+            )
+
+            self.assertDictEqual(counted_samples, {
+                "a": 4,
+                "b": 2,
+                "c": 10
+            })
+            with self.assertRaises(SamplerExhaustedException):
+                da.sample_many(1)
@@ -0,0 +1,171 @@
+import datetime
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+import pandas as pd
+
+from conflowgen.application.data_types.export_file_format import ExportFileFormat
+from conflowgen.application.services.export_container_flow_service import ExportContainerFlowService, \
+    OptionalDependencyMissingException
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck, Feeder, DeepSeaVessel, Barge, Train
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+PYARROW_IS_INSTALLED = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestExportContainerFlowService__Arrow(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule,
+            Destination,
+            Container,
+            LargeScheduledVehicle,
+            Feeder,
+            DeepSeaVessel,
+            Barge,
+            Train,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup
+        ])
+        self.service = ExportContainerFlowService()
+        self.temporary_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temporary_directory.cleanup)
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+        self.destination = Destination.create(
+            belongs_to_schedule=schedule,
+            sequence_id=1,
+            destination_name="TestDestination1",
+            fraction=0.4
+        )
+        self.feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=300,
+            scheduled_arrival=datetime.datetime(2021, 7, 9, 11),
+            realized_arrival=datetime.datetime(2021, 7, 9, 11),
+            schedule=schedule
+        )
+        Feeder.create(
+            large_scheduled_vehicle=self.feeder_lsv
+        )
+
+    def _create_containers(self, number_of_containers: int) -> None:
+        for i in range(number_of_containers):
+            truck = Truck.create(
+                delivers_container=False,
+                picks_up_container=True,
+                truck_arrival_information_for_delivery=None,
+                truck_arrival_information_for_pickup=TruckArrivalInformationForPickup.create(
+                    realized_container_pickup_time=datetime.datetime(2021, 7, 12, 8, 15, 30, 123456)
+                )
+            )
+            Container.create(
+                weight=20,
+                length=ContainerLength.forty_feet,
+                storage_requirement=StorageRequirement.reefer,
+                delivered_by=ModeOfTransport.feeder,
+                delivered_by_large_scheduled_vehicle=self.feeder_lsv,
+                picked_up_by=ModeOfTransport.truck,
+                picked_up_by_initial=ModeOfTransport.truck,
+                picked_up_by_truck=truck,
+                destination=(self.destination if i % 2 else None)
+            )
+
+    def _export(self, file_format: ExportFileFormat) -> str:
+        return self.service.export(
+            folder_name=file_format.value,
+            path_to_export_folder=self.temporary_directory.name,
+            file_format=file_format,
+            overwrite=False
+        )
+
+    @staticmethod
+    def _get_values(column: pd.Series) -> list:
+        return [None if pd.isna(value) else value for value in column.astype(object)]
+
+    @unittest.skipUnless(PYARROW_IS_INSTALLED, "pyarrow is an optional dependency")
+    def test_parquet_columns_are_typed(self):
+        import pyarrow  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        self._create_containers(2)
+        path_to_folder = self._export(ExportFileFormat.parquet)
+        schema = pyarrow.parquet.read_schema(os.path.join(path_to_folder, "containers.parquet"))
+        self.assertEqual(schema.field("storage_requirement").type, pyarrow.dictionary(pyarrow.int8(), pyarrow.string()))
+        self.assertEqual(schema.field("delivered_by_vehicle").type, pyarrow.int64())
+        schema = pyarrow.parquet.read_schema(os.path.join(path_to_folder, "trucks.parquet"))
+        self.assertEqual(schema.field("realized_container_pickup_time").type, pyarrow.timestamp("us"))
+
+        df_container = pd.read_parquet(os.path.join(path_to_folder, "containers.parquet"))
+        self.assertIsInstance(df_container["picked_up_by"].dtype, pd.CategoricalDtype)
+        self.assertListEqual(
+            list(df_container["picked_up_by"].cat.categories),
+            [mode_of_transport.value for mode_of_transport in ModeOfTransport]
+        )
+        self.assertEqual(df_container["destination_sequence_id"].dtype, pd.Int64Dtype())
+        self.assertListEqual(list(df_container["destination_sequence_id"].isna()), [True, False])
+
+    @unittest.skipUnless(PYARROW_IS_INSTALLED, "pyarrow is an optional dependency")
+    def test_parquet_and_feather_contain_the_same_values_as_data_frames(self):
+        self._create_containers(3)
+        tables = self.service._convert_sql_database_to_pandas_dataframe()
+        path_to_parquet_folder = self._export(ExportFileFormat.parquet)
+        path_to_feather_folder = self._export(ExportFileFormat.feather)
+        for table_name, df_table in tables.items():
+            df_parquet = pd.read_parquet(os.path.join(path_to_parquet_folder, table_name + ".parquet"))
+            df_feather = pd.read_feather(os.path.join(path_to_feather_folder, table_name + ".feather"))
+            with self.subTest(table_name=table_name):
+                self.assertListEqual(list(df_parquet.columns), list(df_table.columns))
+                self.assertListEqual(list(df_parquet.index), list(df_table.index))
+                self.assertListEqual(list(df_feather.columns), list(df_table.columns))
+                for column in df_table.columns:
+                    values = self._get_values(df_table[column])
+                    self.assertListEqual(self._get_values(df_parquet[column]), values)
+                    self.assertListEqual(self._get_values(df_feather[column]), values)
+
+    @unittest.skipUnless(PYARROW_IS_INSTALLED, "pyarrow is an optional dependency")
+    def test_each_batch_is_written_as_row_group(self):
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        self._create_containers(5)
+        with unittest.mock.patch.object(ExportContainerFlowService, "rows_per_batch", 2):
+            path_to_folder = self._export(ExportFileFormat.parquet)
+        parquet_file = pyarrow.parquet.ParquetFile(os.path.join(path_to_folder, "containers.parquet"))
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        self.assertEqual(parquet_file.metadata.num_rows, 5)
+
+    @unittest.skipUnless(PYARROW_IS_INSTALLED, "pyarrow is an optional dependency")
+    def test_empty_table_keeps_column_types(self):
+        import pyarrow  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+        path_to_folder = self._export(ExportFileFormat.parquet)
+        table = pyarrow.parquet.read_table(os.path.join(path_to_folder, "containers.parquet"))
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.schema.field("delivered_by").type, pyarrow.dictionary(pyarrow.int8(), pyarrow.string()))
+        self.assertEqual(table.schema.field("picked_up_by_truck").type, pyarrow.int64())
+
+    def test_missing_pyarrow_is_reported_before_exporting(self):
+        with unittest.mock.patch.dict(sys.modules, {"pyarrow": None}):
+            with self.assertRaises(OptionalDependencyMissingException):
+                self._export(ExportFileFormat.parquet)
+        self.assertListEqual(os.listdir(self.temporary_directory.name), [])
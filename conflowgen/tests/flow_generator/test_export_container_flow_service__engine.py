@@ -0,0 +1,150 @@
+import datetime
+import unittest
+import unittest.mock
+
+import pandas as pd
+
+from conflowgen.application.data_types.export_engine import ExportEngine
+from conflowgen.application.services.export_container_flow_service import ExportContainerFlowService
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck, Feeder, DeepSeaVessel, Barge, Train
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestExportContainerFlowService__Engine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule,
+            Destination,
+            Container,
+            LargeScheduledVehicle,
+            Feeder,
+            DeepSeaVessel,
+            Barge,
+            Train,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup
+        ])
+        self.service = ExportContainerFlowService()
+        self.schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+        self.feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=300,
+            scheduled_arrival=datetime.datetime(2021, 7, 9, 11),
+            realized_arrival=datetime.datetime(2021, 7, 9, 11),
+            schedule=self.schedule
+        )
+        Feeder.create(
+            large_scheduled_vehicle=self.feeder_lsv
+        )
+
+    def _create_truck_picking_up_container(self) -> Truck:
+        return Truck.create(
+            delivers_container=False,
+            picks_up_container=True,
+            truck_arrival_information_for_delivery=None,
+            truck_arrival_information_for_pickup=TruckArrivalInformationForPickup.create(
+                realized_container_pickup_time=datetime.datetime(2021, 7, 12, 8, 15, 30, 123456)
+            )
+        )
+
+    def _create_truck_delivering_container(self) -> Truck:
+        return Truck.create(
+            delivers_container=True,
+            picks_up_container=False,
+            truck_arrival_information_for_delivery=TruckArrivalInformationForDelivery.create(
+                realized_container_delivery_time=datetime.datetime(2021, 7, 7, 12)
+            ),
+            truck_arrival_information_for_pickup=None
+        )
+
+    def _create_container(self, **kwargs) -> Container:
+        return Container.create(**{
+            "weight": 20,
+            "length": ContainerLength.forty_feet,
+            "storage_requirement": StorageRequirement.reefer,
+            "delivered_by": ModeOfTransport.feeder,
+            "delivered_by_large_scheduled_vehicle": self.feeder_lsv,
+            "picked_up_by": ModeOfTransport.truck,
+            "picked_up_by_initial": ModeOfTransport.truck,
+            **kwargs
+        })
+
+    def _assert_engines_export_same_tables(self):
+        tables_exported_with_peewee = self.service._convert_sql_database_to_pandas_dataframe(
+            engine=ExportEngine.peewee
+        )
+        tables_exported_with_joins = self.service._convert_sql_database_to_pandas_dataframe(
+            engine=ExportEngine.joined
+        )
+        self.assertListEqual(list(tables_exported_with_peewee.keys()), list(tables_exported_with_joins.keys()))
+        for table_name, df_table in tables_exported_with_peewee.items():
+            with self.subTest(table_name=table_name):
+                pd.testing.assert_frame_equal(df_table, tables_exported_with_joins[table_name])
+        return tables_exported_with_joins
+
+    def test_with_no_containers(self):
+        tables = self._assert_engines_export_same_tables()
+        self.assertEqual(len(tables["containers"]), 0)
+        self.assertEqual(len(tables["feeders"]), 1)
+
+    def test_with_containers_with_and_without_destination(self):
+        destination = Destination.create(
+            belongs_to_schedule=self.schedule,
+            sequence_id=1,
+            destination_name="TestDestination1",
+            fraction=0.4
+        )
+        self._create_container(picked_up_by_truck=self._create_truck_picking_up_container())
+        self._create_container(
+            picked_up_by=ModeOfTransport.feeder,
+            picked_up_by_initial=ModeOfTransport.feeder,
+            picked_up_by_large_scheduled_vehicle=self.feeder_lsv,
+            destination=destination
+        )
+        tables = self._assert_engines_export_same_tables()
+        df_container = tables["containers"]
+        self.assertListEqual(list(df_container["destination_name"].isna()), [True, False])
+        self.assertListEqual(list(df_container["length"]), [40, 40])
+        self.assertListEqual(list(df_container["storage_requirement"]), ["reefer", "reefer"])
+        self.assertListEqual(list(df_container["picked_up_by"]), ["truck", "feeder"])
+
+    def test_columns_of_trucks_are_ordered_by_first_use(self):
+        self._create_container(picked_up_by_truck=self._create_truck_picking_up_container())
+        self._create_container(
+            delivered_by=ModeOfTransport.truck,
+            delivered_by_large_scheduled_vehicle=None,
+            delivered_by_truck=self._create_truck_delivering_container()
+        )
+        tables = self._assert_engines_export_same_tables()
+        self.assertListEqual(
+            list(tables["trucks"].columns),
+            ["delivers_container", "picks_up_container", "realized_container_pickup_time",
+             "realized_container_delivery_time"]
+        )
+
+    def test_each_table_is_read_with_one_query(self):
+        for _ in range(3):
+            self._create_container(picked_up_by_truck=self._create_truck_picking_up_container())
+        with unittest.mock.patch.object(
+                self.sqlite_db, "execute_sql", wraps=self.sqlite_db.execute_sql) as execute_sql:
+            tables = self.service._convert_sql_database_to_pandas_dataframe(engine=ExportEngine.joined)
+        self.assertEqual(execute_sql.call_count, len(tables))
@@ -0,0 +1,143 @@
+import datetime
+import unittest
+
+import numpy as np
+
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.distribution_models.container_length_distribution import ContainerLengthDistribution
+from conflowgen.domain_models.distribution_models.container_weight_distribution import ContainerWeightDistribution
+from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
+from conflowgen.domain_models.distribution_models.storage_requirement_distribution import StorageRequirementDistribution
+from conflowgen.domain_models.factories.fleet_factory import FleetFactory
+from conflowgen.domain_models.distribution_seeders import mode_of_transport_distribution_seeder, \
+    container_weight_distribution_seeder, container_length_distribution_seeder, \
+    container_storage_requirement_distribution_seeder
+from conflowgen.domain_models.large_vehicle_schedule import Schedule, Destination
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Feeder, Train, DeepSeaVessel, Barge, Truck
+from conflowgen.flow_generator.large_scheduled_vehicle_creation_service import LargeScheduledVehicleCreationService
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestLargeScheduledVehicleCreationService(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        sqlite_db = setup_sqlite_in_memory_db()
+        sqlite_db.create_tables([
+            Schedule,
+            Destination,
+            LargeScheduledVehicle,
+            Feeder,
+            Train,
+            DeepSeaVessel,
+            Barge,
+            Truck,
+            Container,
+            ModeOfTransportDistribution,
+            ContainerWeightDistribution,
+            ContainerLengthDistribution,
+            StorageRequirementDistribution
+        ])
+        mode_of_transport_distribution_seeder.seed()
+        container_weight_distribution_seeder.seed()
+        container_length_distribution_seeder.seed()
+        container_storage_requirement_distribution_seeder.seed()
+
+        Schedule.create(
+            service_name="TestFeederService",
+            vehicle_type=ModeOfTransport.feeder,
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=800,
+            average_moved_capacity=300
+        )
+        Schedule.create(
+            service_name="TestTrainService",
+            vehicle_type=ModeOfTransport.train,
+            vehicle_arrives_at=datetime.date(2021, 7, 8),
+            vehicle_arrives_every_k_days=3,
+            vehicle_arrives_at_time=datetime.time(8),
+            average_vehicle_capacity=90,
+            average_moved_capacity=90
+        )
+        self.service = LargeScheduledVehicleCreationService()
+
+    def _create_with_seed(self, seed: int, number_of_processes: int):
+        Container.delete().execute()
+        LargeScheduledVehicle.delete().execute()
+        self.service.reload_properties(
+            container_flow_start_date=datetime.date(2021, 7, 7),
+            container_flow_end_date=datetime.date(2021, 7, 28),
+            seed_sequence=np.random.SeedSequence(seed)
+        )
+        self.service.create(number_of_processes=number_of_processes)
+        vehicles = list(LargeScheduledVehicle.select(
+            LargeScheduledVehicle.vehicle_name,
+            LargeScheduledVehicle.scheduled_arrival,
+            LargeScheduledVehicle.moved_capacity
+        ).order_by(LargeScheduledVehicle.id).tuples())
+        containers = list(Container.select(
+            Container.length,
+            Container.weight,
+            Container.storage_requirement,
+            Container.picked_up_by,
+            LargeScheduledVehicle.vehicle_name
+        ).join(
+            LargeScheduledVehicle, on=(Container.delivered_by_large_scheduled_vehicle == LargeScheduledVehicle.id)
+        ).order_by(Container.id).tuples())
+        return vehicles, containers
+
+    def test_create_vehicles_and_containers(self):
+        vehicles, containers = self._create_with_seed(1, number_of_processes=1)
+        self.assertEqual(Feeder.select().count(), 3)
+        self.assertEqual(Train.select().count(), 7)
+        self.assertEqual(len(vehicles), 10)
+        for vehicle_name, _, moved_capacity in vehicles:
+            used_capacity_in_teu = sum(
+                ContainerLength.get_factor(length)
+                for (length, _, _, _, name_of_delivering_vehicle) in containers
+                if name_of_delivering_vehicle == vehicle_name
+            )
+            self.assertLessEqual(used_capacity_in_teu, moved_capacity)
+            self.assertGreater(used_capacity_in_teu, moved_capacity - 3)
+        self.assertEqual(Container.select().where(Container.picked_up_by_initial.is_null()).count(), 0)
+
+    def test_same_seed_creates_same_vehicles_and_containers(self):
+        first_run = self._create_with_seed(2, number_of_processes=1)
+        second_run = self._create_with_seed(2, number_of_processes=1)
+        self.assertEqual(first_run, second_run)
+
+        third_run = self._create_with_seed(3, number_of_processes=1)
+        self.assertNotEqual(first_run[1], third_run[1])
+
+    def test_parallel_creation_creates_same_vehicles_and_containers(self):
+        serial_run = self._create_with_seed(4, number_of_processes=1)
+        parallel_run = self._create_with_seed(4, number_of_processes=2)
+        self.assertEqual(serial_run, parallel_run)
+
+    def test_vehicles_are_the_same_as_created_by_fleet_factory(self):
+        service_vehicles, _ = self._create_with_seed(5, number_of_processes=1)
+        for model in (Container, Feeder, Train, LargeScheduledVehicle):
+            model.delete().execute()
+        fleet_factory = FleetFactory()
+        fleet_factory_vehicles = []
+        for schedule in Schedule.select().order_by(Schedule.id):
+            create_fleet = {
+                ModeOfTransport.feeder: fleet_factory.create_feeder_fleet,
+                ModeOfTransport.train: fleet_factory.create_train_fleet,
+            }[schedule.vehicle_type]
+            fleet_factory_vehicles.extend(
+                (
+                    vehicle.large_scheduled_vehicle.vehicle_name,
+                    vehicle.large_scheduled_vehicle.scheduled_arrival,
+                    vehicle.large_scheduled_vehicle.moved_capacity
+                )
+                for vehicle in create_fleet(
+                    schedule=schedule,
+                    first_at=datetime.date(2021, 7, 7),
+                    latest_at=datetime.date(2021, 7, 28)
+                )
+            )
+        self.assertListEqual(service_vehicles, fleet_factory_vehicles)
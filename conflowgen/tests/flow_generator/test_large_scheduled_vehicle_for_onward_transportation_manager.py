@@ -1,5 +1,6 @@
 import datetime
 import unittest
+from unittest import mock
 
 from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
     TruckArrivalInformationForPickup
@@ -22,6 +23,7 @@ class TestLargeScheduledVehicleForExportContainersManager(unittest.TestCase):
     def setUp(self) -> None:
         """Create container database in memory"""
         sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db = sqlite_db
         sqlite_db.create_tables([
             Schedule,
             LargeScheduledVehicle,
@@ -286,3 +288,79 @@ class TestLargeScheduledVehicleForExportContainersManager(unittest.TestCase):
             self.assertEqual(container.picked_up_by_large_scheduled_vehicle, feeder.large_scheduled_vehicle)
             teu_loaded += ContainerLength.get_factor(container.length)
         self.assertLessEqual(teu_loaded, 80, "Feeder must not be loaded with more than what it can carry")
+
+    def test_load_containers_from_truck_on_feeder_with_and_without_streaming(self):
+        truck = self._create_truck(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        feeder.large_scheduled_vehicle.capacity_in_teu = 1000
+        feeder.large_scheduled_vehicle.moved_capacity = 1000  # in TEU
+        feeder.large_scheduled_vehicle.save()
+
+        for streaming in (True, False):
+            containers = [self._create_container_for_truck(truck) for _ in range(600)]
+
+            self.manager.choose_departing_vehicle_for_containers(streaming=streaming)
+
+            for container in containers:
+                container_reloaded = Container.get_by_id(container.id)
+                self.assertEqual(
+                    feeder.large_scheduled_vehicle, container_reloaded.picked_up_by_large_scheduled_vehicle
+                )
+                self.assertEqual(container.weight, container_reloaded.weight, "Attributes must stay untouched")
+                self.assertEqual(container.delivered_by_truck, container_reloaded.delivered_by_truck)
+            Container.delete().execute()
+
+    def _count_statements_for_choosing_vehicles(
+            self, number_containers: int, streaming: bool, statement_type: str = "SELECT"
+    ) -> int:
+        Container.delete().execute()
+        truck = self._create_truck(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        train = self._create_train(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        for _ in range(number_containers):
+            self._create_container_for_truck(truck)
+            self._create_container_for_large_scheduled_vehicle(train)
+        with mock.patch.object(self.sqlite_db, "execute_sql", wraps=self.sqlite_db.execute_sql) as execute_sql:
+            self.manager.choose_departing_vehicle_for_containers(streaming=streaming)
+        return len([
+            call for call in execute_sql.call_args_list
+            if call.args[0].lstrip().upper().startswith(statement_type)
+        ])
+
+    def test_number_of_reads_does_not_depend_on_number_of_containers(self):
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        feeder.large_scheduled_vehicle.capacity_in_teu = 1000
+        feeder.large_scheduled_vehicle.moved_capacity = 1000  # in TEU
+        feeder.large_scheduled_vehicle.save()
+
+        for streaming in (True, False):
+            number_reads_for_few_containers = self._count_statements_for_choosing_vehicles(5, streaming)
+            number_reads_for_more_containers = self._count_statements_for_choosing_vehicles(50, streaming)
+            self.assertEqual(number_reads_for_few_containers, number_reads_for_more_containers)
+
+    def test_number_of_writes_does_not_depend_on_number_of_containers(self):
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        feeder.large_scheduled_vehicle.capacity_in_teu = 1000
+        feeder.large_scheduled_vehicle.moved_capacity = 1000  # in TEU
+        feeder.large_scheduled_vehicle.save()
+
+        for streaming in (True, False):
+            number_writes_for_few_containers = self._count_statements_for_choosing_vehicles(5, streaming, "UPDATE")
+            number_writes_for_more_containers = self._count_statements_for_choosing_vehicles(50, streaming, "UPDATE")
+            self.assertEqual(number_writes_for_few_containers, number_writes_for_more_containers)
+
+    def test_exhausted_capacity_is_written_back(self):
+        truck = self._create_truck(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        feeder.large_scheduled_vehicle.moved_capacity = 10  # in TEU
+        feeder.large_scheduled_vehicle.save()
+        for _ in range(20):
+            self._create_container_for_truck(truck)
+
+        self.manager.choose_departing_vehicle_for_containers()
+
+        feeder_reloaded = LargeScheduledVehicle.get_by_id(feeder.large_scheduled_vehicle.id)
+        self.assertTrue(feeder_reloaded.capacity_exhausted_while_determining_onward_transportation)
+        self.assertGreater(
+            Container.select().where(Container.emergency_pickup).count(), 0,
+            "Not all containers fit on the feeder, so some must be picked up differently"
+        )
@@ -4,10 +4,18 @@ from collections import Counter
 
 import matplotlib.pyplot as plt
 
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
 from conflowgen.domain_models.distribution_models.truck_arrival_distribution import TruckArrivalDistribution
 from conflowgen.domain_models.distribution_seeders import truck_arrival_distribution_seeder
 from conflowgen.flow_generator.truck_for_import_containers_manager import \
     TruckForImportContainersManager
+from conflowgen.domain_models.large_vehicle_schedule import Schedule, Destination
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
 from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
 
 
@@ -17,7 +25,14 @@ class TestTruckForImportContainersManager(unittest.TestCase):
         """Create container database in memory"""
         sqlite_db = setup_sqlite_in_memory_db()
         sqlite_db.create_tables([
-            TruckArrivalDistribution
+            TruckArrivalDistribution,
+            Schedule,
+            LargeScheduledVehicle,
+            Container,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
+            Destination
         ])
         truck_arrival_distribution_seeder.seed()
 
@@ -111,3 +126,52 @@ class TestTruckForImportContainersManager(unittest.TestCase):
             import seaborn as sns  # pylint: disable=import-outside-toplevel
             sns.kdeplot(pickup_times, bw=0.01)
             plt.show(block=True)
+
+    def test_generate_trucks_for_picking_up(self):
+        manager = TruckForImportContainersManager()
+        manager.reload_distribution(
+            minimum_dwell_time_in_hours=3,
+            maximum_dwell_time_in_hours=(5 * 24)
+        )
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(year=2021, month=8, day=2),
+            vehicle_arrives_at_time=datetime.time(hour=11, minute=30),
+            average_vehicle_capacity=1200,
+            average_moved_capacity=1200
+        )
+        feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=1200,
+            moved_capacity=1200,
+            scheduled_arrival=datetime.datetime(year=2021, month=8, day=2, hour=11, minute=30),
+            realized_arrival=datetime.datetime(year=2021, month=8, day=2, hour=12, minute=30),
+            schedule=schedule
+        )
+        for _ in range(600):
+            Container.create(
+                weight=20,
+                length=ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=ModeOfTransport.feeder,
+                delivered_by_large_scheduled_vehicle=feeder_lsv,
+                picked_up_by=ModeOfTransport.truck,
+                picked_up_by_initial=ModeOfTransport.truck
+            )
+
+        manager.generate_trucks_for_picking_up()
+
+        self.assertEqual(Truck.select().count(), 600)
+        trucks = set()
+        for container in Container.select():
+            truck: Truck = container.picked_up_by_truck
+            self.assertIsNotNone(truck)
+            self.assertTrue(truck.picks_up_container)
+            self.assertFalse(truck.delivers_container)
+            pickup_time = truck.truck_arrival_information_for_pickup.realized_container_pickup_time
+            self.assertGreaterEqual(pickup_time, feeder_lsv.realized_arrival)
+            # the time windows start at full hours, so the last window can reach a bit beyond the maximum dwell time
+            self.assertLessEqual(pickup_time, feeder_lsv.realized_arrival + datetime.timedelta(hours=5 * 24 + 1))
+            trucks.add(truck)
+        self.assertEqual(len(trucks), 600, "Each container is picked up by its own truck")
@@ -1,6 +1,8 @@
 import datetime
 import unittest
 
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
 from conflowgen.application.models.container_flow_generation_properties import ContainerFlowGenerationProperties
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
@@ -24,6 +26,8 @@ class TestContainerFlowAdjustmentByVehicleTypeAnalysisReport(unittest.TestCase):
             Container,
             LargeScheduledVehicle,
             Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
             Feeder,
             ModeOfTransportDistribution,
             Destination,
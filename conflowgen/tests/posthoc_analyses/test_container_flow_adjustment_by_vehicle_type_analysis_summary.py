@@ -1,5 +1,7 @@
 import unittest
 
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
@@ -22,6 +24,8 @@ class TestContainerFlowAdjustmentByVehicleTypeAnalysisSummary(unittest.TestCase)
             Container,
             LargeScheduledVehicle,
             Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
             Feeder,
             ModeOfTransportDistribution,
             Destination
@@ -1,6 +1,8 @@
 import datetime
 import unittest
 
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
@@ -22,6 +24,8 @@ class TestContainerFlowByVehicleTypeAnalysis(unittest.TestCase):
             Container,
             LargeScheduledVehicle,
             Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
             Feeder,
             ModeOfTransportDistribution,
             Destination
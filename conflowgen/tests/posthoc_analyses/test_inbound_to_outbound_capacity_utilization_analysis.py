@@ -1,6 +1,9 @@
 import datetime
 import unittest
+import unittest.mock
 
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
@@ -23,6 +26,8 @@ class TestInboundToOutboundCapacityUtilizationAnalysis(unittest.TestCase):
             Container,
             LargeScheduledVehicle,
             Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
             Feeder,
             ModeOfTransportDistribution,
             Destination
@@ -87,3 +92,57 @@ class TestInboundToOutboundCapacityUtilizationAnalysis(unittest.TestCase):
         (used_capacity_on_inbound_journey, used_capacity_on_outbound_journey) = value_of_entry
         self.assertEqual(used_capacity_on_inbound_journey, 250)
         self.assertEqual(used_capacity_on_outbound_journey, 1, "One 20' is loaded")
+
+    def test_several_vehicles_are_analyzed_with_two_queries(self):
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 8, 5),
+            vehicle_arrives_at_time=datetime.time(13, 15),
+            average_vehicle_capacity=300,
+            average_moved_capacity=250,
+            vehicle_arrives_every_k_days=7
+        )
+        container_lengths_of_vehicles = [
+            [ContainerLength.twenty_feet, ContainerLength.forty_feet, ContainerLength.forty_feet],
+            [],
+            [ContainerLength.forty_five_feet]
+        ]
+        for i, container_lengths in enumerate(container_lengths_of_vehicles):
+            feeder_lsv = LargeScheduledVehicle.create(
+                vehicle_name=f"TestFeeder{i + 1}",
+                capacity_in_teu=schedule.average_vehicle_capacity,
+                moved_capacity=schedule.average_moved_capacity - i,
+                scheduled_arrival=datetime.datetime(2021, 8, 5 + 7 * i, 13, 15),
+                schedule=schedule
+            )
+            Feeder.create(
+                large_scheduled_vehicle=feeder_lsv
+            )
+            for container_length in container_lengths:
+                Container.create(
+                    weight=20,
+                    length=container_length,
+                    storage_requirement=StorageRequirement.standard,
+                    delivered_by=ModeOfTransport.truck,
+                    picked_up_by_large_scheduled_vehicle=feeder_lsv,
+                    picked_up_by=ModeOfTransport.feeder,
+                    picked_up_by_initial=ModeOfTransport.truck
+                )
+
+        with unittest.mock.patch.object(
+                self.sqlite_db, "execute_sql", wraps=self.sqlite_db.execute_sql) as execute_sql:
+            # the analysis is run without looking up a stored result first
+            capacities = self.analysis.get_inbound_and_outbound_capacity_of_each_vehicle.__wrapped__(
+                vehicle_type=[ModeOfTransport.feeder]
+            )
+        self.assertEqual(execute_sql.call_count, 2, "One query for the containers and one for the vehicles")
+
+        self.assertListEqual(
+            [(vehicle_id.vehicle_name, capacity) for vehicle_id, capacity in capacities.items()],
+            [
+                ("TestFeeder1", (250, 5)),
+                ("TestFeeder2", (249, 0)),
+                ("TestFeeder3", (248, ContainerLength.get_factor(ContainerLength.forty_five_feet))),
+            ]
+        )
@@ -146,3 +146,54 @@ class TestQuaySideThroughputAnalysis(unittest.TestCase):
         used_quay_side_capacity_over_time = self.analysis.get_throughput_over_time()
         self.assertEqual(len(used_quay_side_capacity_over_time), 3)
         self.assertSetEqual(set(used_quay_side_capacity_over_time.values()), {0, 2})
+
+    def test_with_other_time_windows(self):
+        scheduled_arrival = datetime.datetime(2021, 8, 5, 13, 15)  # a Thursday
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=scheduled_arrival.date(),
+            vehicle_arrives_at_time=scheduled_arrival.time(),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300,
+        )
+        feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=schedule.average_moved_capacity,
+            scheduled_arrival=scheduled_arrival,
+            schedule=schedule
+        )
+        Feeder.create(
+            large_scheduled_vehicle=feeder_lsv
+        )
+        for _ in range(2):
+            Container.create(
+                weight=20,
+                length=ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=ModeOfTransport.feeder,
+                delivered_by_large_scheduled_vehicle=feeder_lsv,
+                picked_up_by=ModeOfTransport.deep_sea_vessel,
+                picked_up_by_initial=ModeOfTransport.deep_sea_vessel
+            )
+
+        self.assertDictEqual(
+            self.analysis.get_throughput_over_time(),
+            {
+                datetime.date(2021, 7, 26): 0,
+                datetime.date(2021, 8, 2): 2,
+                datetime.date(2021, 8, 9): 0,
+            }
+        )
+        self.assertDictEqual(
+            self.analysis.get_throughput_over_time(time_window=datetime.timedelta(hours=1)),
+            {
+                datetime.datetime(2021, 8, 5, 12): 0,
+                datetime.datetime(2021, 8, 5, 13): 2,
+                datetime.datetime(2021, 8, 5, 14): 0,
+            }
+        )
+        quay_side_throughput = self.analysis.get_throughput_over_time(as_series=True)
+        self.assertListEqual(quay_side_throughput.tolist(), [0, 2, 0])
+        self.assertEqual(quay_side_throughput.index[1], datetime.datetime(2021, 8, 2))
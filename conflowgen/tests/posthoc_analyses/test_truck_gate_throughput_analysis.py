@@ -1,6 +1,8 @@
 import datetime
 import unittest
 
+import pandas as pd
+
 from conflowgen.domain_models.arrival_information import TruckArrivalInformationForPickup, \
     TruckArrivalInformationForDelivery
 from conflowgen.domain_models.container import Container
@@ -144,3 +146,125 @@ class TestTruckGateThroughputAnalysis(unittest.TestCase):
         truck_gate_throughput = self.analysis.get_throughput_over_time()
         self.assertEqual(16, len(truck_gate_throughput))
         self.assertSetEqual({0, 1}, set(truck_gate_throughput.values()))
+
+    def test_with_other_time_windows(self):
+        scheduled_arrival = datetime.datetime(2021, 8, 5, 13, 15)
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=scheduled_arrival.date(),
+            vehicle_arrives_at_time=scheduled_arrival.time(),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300,
+        )
+        feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=schedule.average_moved_capacity,
+            scheduled_arrival=scheduled_arrival,
+            schedule=schedule
+        )
+        Feeder.create(
+            large_scheduled_vehicle=feeder_lsv
+        )
+        for hours in (3, 5, 30):
+            aip = TruckArrivalInformationForPickup.create(
+                realized_container_pickup_time=scheduled_arrival + datetime.timedelta(hours=hours)
+            )
+            truck = Truck.create(
+                delivers_container=False,
+                picks_up_container=True,
+                truck_arrival_information_for_delivery=None,
+                truck_arrival_information_for_pickup=aip
+            )
+            Container.create(
+                weight=20,
+                length=ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=ModeOfTransport.feeder,
+                delivered_by_large_scheduled_vehicle=feeder_lsv,
+                picked_up_by=ModeOfTransport.truck,
+                picked_up_by_initial=ModeOfTransport.truck,
+                picked_up_by_truck=truck
+            )
+
+        self.assertDictEqual(
+            self.analysis.get_throughput_over_time(time_window=datetime.timedelta(days=1)),
+            {
+                datetime.date(2021, 8, 4): 0,
+                datetime.date(2021, 8, 5): 2,
+                datetime.date(2021, 8, 6): 1,
+                datetime.date(2021, 8, 7): 0,
+            }
+        )
+        # just like for the quay side, weekly time windows start on Mondays and use dates as keys
+        self.assertDictEqual(
+            self.analysis.get_throughput_over_time(time_window=datetime.timedelta(weeks=1)),
+            {
+                datetime.date(2021, 7, 26): 0,
+                datetime.date(2021, 8, 2): 3,
+                datetime.date(2021, 8, 9): 0,
+            }
+        )
+        self.assertDictEqual(
+            self.analysis.get_throughput_over_time(time_window=datetime.timedelta(hours=12)),
+            {
+                datetime.datetime(2021, 8, 5, 0): 0,
+                datetime.datetime(2021, 8, 5, 12): 2,
+                datetime.datetime(2021, 8, 6, 0): 0,
+                datetime.datetime(2021, 8, 6, 12): 1,
+                datetime.datetime(2021, 8, 7, 0): 0,
+            }
+        )
+        truck_gate_throughput = self.analysis.get_throughput_over_time(as_series=True)
+        self.assertEqual(len(truck_gate_throughput), 30)
+        self.assertEqual(truck_gate_throughput.sum(), 3)
+        self.assertEqual(truck_gate_throughput[datetime.datetime(2021, 8, 5, 16)], 1)
+        self.assertTrue(self.analysis.get_throughput_over_time(inbound=True, outbound=False, as_series=True).empty)
+
+    def test_series_is_restored_from_stored_result(self):
+        now = datetime.datetime.now()
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=now.date(),
+            vehicle_arrives_at_time=now.time(),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300,
+        )
+        feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=schedule.average_moved_capacity,
+            scheduled_arrival=now,
+            schedule=schedule
+        )
+        Feeder.create(
+            large_scheduled_vehicle=feeder_lsv
+        )
+        aip = TruckArrivalInformationForPickup.create(
+            realized_container_pickup_time=now + datetime.timedelta(hours=25)
+        )
+        truck = Truck.create(
+            delivers_container=False,
+            picks_up_container=True,
+            truck_arrival_information_for_delivery=None,
+            truck_arrival_information_for_pickup=aip
+        )
+        Container.create(
+            weight=20,
+            length=ContainerLength.twenty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.feeder,
+            delivered_by_large_scheduled_vehicle=feeder_lsv,
+            picked_up_by=ModeOfTransport.truck,
+            picked_up_by_initial=ModeOfTransport.truck,
+            picked_up_by_truck=truck
+        )
+
+        with self.assertNoLogs("conflowgen", level="WARNING"):
+            computed_truck_gate_throughput = self.analysis.get_throughput_over_time(as_series=True)
+            stored_truck_gate_throughput = self.analysis.get_throughput_over_time(as_series=True)
+        self.assertIsInstance(stored_truck_gate_throughput, pd.Series)
+        self.assertListEqual(stored_truck_gate_throughput.tolist(), [0, 1, 0])
+        pd.testing.assert_series_equal(stored_truck_gate_throughput, computed_truck_gate_throughput)
@@ -146,3 +146,70 @@ class TestYardCapacityAnalysis(unittest.TestCase):
         used_yard_over_time = self.analysis.get_used_yard_capacity_over_time()
         self.assertEqual(len(used_yard_over_time), 28)
         self.assertSetEqual(set(used_yard_over_time.values()), {0, 1, 3})
+
+    def test_with_containers_delivered_by_truck_and_filtered_by_storage_requirement(self):
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 8, 7),
+            vehicle_arrives_at_time=datetime.time(13, 15),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300,
+        )
+        feeder_lsv = LargeScheduledVehicle.create(
+            vehicle_name="TestFeeder1",
+            capacity_in_teu=300,
+            moved_capacity=schedule.average_moved_capacity,
+            scheduled_arrival=datetime.datetime(2021, 8, 7, 13, 15),
+            schedule=schedule
+        )
+        Feeder.create(
+            large_scheduled_vehicle=feeder_lsv
+        )
+        for storage_requirement, delivery_time in (
+                (StorageRequirement.reefer, datetime.datetime(2021, 8, 7, 10, 30, 12, 345)),
+                (StorageRequirement.standard, datetime.datetime(2021, 8, 7, 11, 59, 59)),
+        ):
+            aid = TruckArrivalInformationForDelivery.create(
+                realized_container_delivery_time=delivery_time,
+                planned_container_delivery_time_at_window_start=None
+            )
+            truck = Truck.create(
+                delivers_container=True,
+                picks_up_container=False,
+                truck_arrival_information_for_delivery=aid,
+                truck_arrival_information_for_pickup=None
+            )
+            Container.create(
+                weight=20,
+                length=ContainerLength.forty_feet,
+                storage_requirement=storage_requirement,
+                delivered_by=ModeOfTransport.truck,
+                delivered_by_truck=truck,
+                picked_up_by=ModeOfTransport.feeder,
+                picked_up_by_initial=ModeOfTransport.feeder,
+                picked_up_by_large_scheduled_vehicle=feeder_lsv
+            )
+
+        self.assertDictEqual(
+            self.analysis.get_used_yard_capacity_over_time(),
+            {
+                datetime.datetime(2021, 8, 7, 9): 0,
+                datetime.datetime(2021, 8, 7, 10): 2,
+                datetime.datetime(2021, 8, 7, 11): 4,
+                datetime.datetime(2021, 8, 7, 12): 4,
+                datetime.datetime(2021, 8, 7, 13): 4,
+                datetime.datetime(2021, 8, 7, 14): 0,
+            }
+        )
+        self.assertDictEqual(
+            self.analysis.get_used_yard_capacity_over_time(storage_requirement=[StorageRequirement.reefer]),
+            {
+                datetime.datetime(2021, 8, 7, 9): 0,
+                datetime.datetime(2021, 8, 7, 10): 2,
+                datetime.datetime(2021, 8, 7, 11): 2,
+                datetime.datetime(2021, 8, 7, 12): 2,
+                datetime.datetime(2021, 8, 7, 13): 2,
+                datetime.datetime(2021, 8, 7, 14): 0,
+            }
+        )
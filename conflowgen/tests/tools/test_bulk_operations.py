@@ -0,0 +1,89 @@
+import datetime
+import unittest
+import unittest.mock
+
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+from conflowgen.tools import bulk_operations
+from conflowgen.tools.bulk_operations import insert_many, insert_many_and_get_ids, update_fields_in_bulk
+
+
+class TestBulkOperations(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule,
+            LargeScheduledVehicle
+        ])
+        self.schedule = Schedule.create(
+            service_name="TestFeederService",
+            vehicle_type=ModeOfTransport.feeder,
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+        self.fields = [
+            LargeScheduledVehicle.vehicle_name,
+            LargeScheduledVehicle.capacity_in_teu,
+            LargeScheduledVehicle.moved_capacity,
+            LargeScheduledVehicle.scheduled_arrival,
+            LargeScheduledVehicle.schedule
+        ]
+
+    def _get_rows(self, number_rows: int):
+        return [
+            (f"feeder_{i}", 300, 200, datetime.datetime(2021, 7, 9, 11, 30, 15, 123456), self.schedule)
+            for i in range(number_rows)
+        ]
+
+    def test_insert_many_and_get_ids_in_several_batches(self):
+        rows = self._get_rows(7)
+        ids = insert_many_and_get_ids(LargeScheduledVehicle, rows, fields=self.fields, batch_size=3)
+        self.assertEqual(len(ids), 7)
+        for vehicle_id, (vehicle_name, _, _, scheduled_arrival, _) in zip(ids, rows):
+            vehicle = LargeScheduledVehicle.get_by_id(vehicle_id)
+            self.assertEqual(vehicle.vehicle_name, vehicle_name)
+            self.assertEqual(vehicle.scheduled_arrival, scheduled_arrival)
+            self.assertEqual(vehicle.schedule, self.schedule)
+
+    def test_fields_which_are_not_provided_are_set_to_their_defaults(self):
+        insert_many(LargeScheduledVehicle, self._get_rows(2), fields=self.fields)
+        for vehicle in LargeScheduledVehicle.select():
+            self.assertIsNone(vehicle.realized_arrival)
+            self.assertFalse(vehicle.port_call_cancelled)
+            self.assertFalse(vehicle.capacity_exhausted_while_determining_onward_transportation)
+
+    def test_insert_nothing(self):
+        self.assertListEqual(insert_many_and_get_ids(LargeScheduledVehicle, [], fields=self.fields), [])
+        self.assertEqual(LargeScheduledVehicle.select().count(), 0)
+
+    def _get_number_of_variables_per_statement(self, bulk_operation) -> list:
+        with unittest.mock.patch.object(self.sqlite_db, "execute_sql", wraps=self.sqlite_db.execute_sql) as execute_sql:
+            bulk_operation()
+        return [len(call.args[1]) for call in execute_sql.call_args_list]
+
+    def test_statements_do_not_exceed_the_maximum_number_of_variables(self):
+        rows = self._get_rows(20)
+        with unittest.mock.patch.object(bulk_operations, "MAXIMUM_NUMBER_OF_VARIABLES_PER_STATEMENT", 30):
+            number_of_variables_per_insert = self._get_number_of_variables_per_statement(
+                lambda: insert_many(LargeScheduledVehicle, rows, fields=self.fields)
+            )
+            values_by_id = {vehicle.id: (100, vehicle.scheduled_arrival) for vehicle in LargeScheduledVehicle.select()}
+            number_of_variables_per_update = self._get_number_of_variables_per_statement(
+                lambda: update_fields_in_bulk(
+                    LargeScheduledVehicle,
+                    [LargeScheduledVehicle.moved_capacity, LargeScheduledVehicle.realized_arrival],
+                    values_by_id
+                )
+            )
+        # eight columns are inserted per row and five variables are required per updated row
+        self.assertListEqual(number_of_variables_per_insert, [24] * 6 + [16])
+        self.assertListEqual(number_of_variables_per_update, [30] * 3 + [10])
+        for vehicle in LargeScheduledVehicle.select():
+            self.assertEqual(vehicle.moved_capacity, 100)
+            self.assertEqual(vehicle.realized_arrival, vehicle.scheduled_arrival)
@@ -0,0 +1,60 @@
+import datetime
+import unittest
+import unittest.mock
+
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+from conflowgen.tools.database_state_cache import DatabaseStateCache
+
+
+class TestDatabaseStateCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        sqlite_db = setup_sqlite_in_memory_db()
+        sqlite_db.create_tables([
+            Schedule
+        ])
+        self.cache = DatabaseStateCache()
+        self.load_value = unittest.mock.Mock(side_effect=lambda: Schedule.select().count())
+
+    @staticmethod
+    def _create_schedule() -> None:
+        Schedule.create(
+            service_name="TestFeederService",
+            vehicle_type=ModeOfTransport.feeder,
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+
+    def test_value_is_kept_while_database_is_unchanged(self):
+        self.assertEqual(self.cache.get(self.load_value), 0)
+        self.assertEqual(self.cache.get(self.load_value), 0)
+        self.assertEqual(self.load_value.call_count, 1)
+
+    def test_value_is_loaded_again_after_change(self):
+        self.cache.get(self.load_value)
+        self._create_schedule()
+        self.assertEqual(self.cache.get(self.load_value), 1)
+        self.assertEqual(self.load_value.call_count, 2)
+
+    def test_value_is_loaded_again_for_other_database(self):
+        self.cache.get(self.load_value)
+        setup_sqlite_in_memory_db().create_tables([Schedule])
+        self.cache.get(self.load_value)
+        self.assertEqual(self.load_value.call_count, 2)
+
+    def test_value_is_loaded_again_after_invalidation(self):
+        self.cache.get(self.load_value)
+        self.cache.invalidate()
+        self.cache.get(self.load_value)
+        self.assertEqual(self.load_value.call_count, 2)
+
+    def test_changes_not_affecting_value(self):
+        self.cache.get(self.load_value)
+        with self.cache.changes_not_affecting_value():
+            self._create_schedule()
+        self.assertEqual(self.cache.get(self.load_value), 0)
+        self.assertEqual(self.load_value.call_count, 1)
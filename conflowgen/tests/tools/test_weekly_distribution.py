@@ -160,3 +160,46 @@ class TestWeeklyDistribution(unittest.TestCase):
                                    "Assert arrivals on other days")
         self.assertTrue(visited_sunday)
         self.assertTrue(visited_working_day)
+
+    def test_sample_only_returns_time_windows_of_slice(self):
+        weekly_distribution = WeeklyDistribution([
+            (0, .5),
+            (24, .2),
+            (48, .2),
+            (72, .1),
+            (96, 0),
+            (120, 0),
+            (144, 0)
+        ],
+            considered_time_window_in_hours=24,
+            minimum_dwell_time_in_hours=3
+        )
+        _datetime = datetime.datetime(
+            year=2021, month=8, day=1
+        )
+        self.assertEqual(_datetime.weekday(), 6)  # assert is Sunday
+        time_window_starts = weekly_distribution.sample(_datetime, size=1000)
+        self.assertEqual(len(time_window_starts), 1000)
+        # Sunday has a fraction of 0, so all trucks arrive on Monday
+        self.assertSetEqual(set(time_window_starts), {24})
+
+    def test_sample_approximates_distribution_slice(self):
+        weekly_distribution = WeeklyDistribution([
+            (0, .5),
+            (24, .2),
+            (48, .2),
+            (72, .1),
+            (96, 0),
+            (120, 0),
+            (144, 0)
+        ],
+            considered_time_window_in_hours=72,
+            minimum_dwell_time_in_hours=3
+        )
+        _datetime = datetime.datetime(
+            year=2021, month=8, day=2, hour=3
+        )
+        distribution_slice = weekly_distribution.get_distribution_slice(_datetime)
+        time_window_starts = weekly_distribution.sample(_datetime, size=10000)
+        for time_window_start, fraction in distribution_slice.items():
+            self.assertAlmostEqual((time_window_starts == time_window_start).mean(), fraction, delta=0.05)
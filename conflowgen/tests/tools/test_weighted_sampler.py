@@ -0,0 +1,41 @@
+import collections
+import unittest
+
+from conflowgen.tools.weighted_sampler import WeightedSampler
+
+
+class TestWeightedSampler(unittest.TestCase):
+
+    def test_sample_approximates_weights(self):
+        sampler = WeightedSampler(["a", "b", "c"], [1, 3, 6])
+        counted_samples = collections.Counter(sampler.sample() for _ in range(10000))
+        self.assertAlmostEqual(counted_samples["a"] / 10000, 0.1, delta=0.02)
+        self.assertAlmostEqual(counted_samples["b"] / 10000, 0.3, delta=0.02)
+        self.assertAlmostEqual(counted_samples["c"] / 10000, 0.6, delta=0.02)
+
+    def test_sample_within_range(self):
+        sampler = WeightedSampler(["a", "b", "c", "d", "e"], [5, 1, 0, 1, 5])
+        samples = {sampler.sample(1, 4) for _ in range(1000)}
+        self.assertSetEqual(samples, {"b", "d"})
+        self.assertEqual(sampler.count_items_with_weight(1, 4), 2)
+        self.assertEqual(sampler.get_total_weight(1, 4), 2)
+
+    def test_update_weight(self):
+        sampler = WeightedSampler(["a", "b", "c"], [1, 1, 1])
+        sampler.update("a", 0)
+        sampler.remove("b")
+        self.assertEqual(len(sampler), 1)
+        self.assertEqual(sampler.get_total_weight(), 1)
+        self.assertSetEqual({sampler.sample() for _ in range(100)}, {"c"})
+        sampler.update("a", 2.5)
+        self.assertEqual(len(sampler), 2)
+        self.assertEqual(sampler.get_weight("a"), 2.5)
+        self.assertEqual(sampler.get_total_weight(), 3.5)
+
+    def test_nothing_to_sample(self):
+        sampler = WeightedSampler(["a", "b"], [0, 1])
+        self.assertIsNone(sampler.sample(0, 1))
+        self.assertIsNone(sampler.sample(1, 1))
+        sampler.remove("b")
+        self.assertIsNone(sampler.sample())
+        self.assertIsNone(WeightedSampler([], []).sample())
@@ -0,0 +1,135 @@
+"""
+Writes many rows with a few statements instead of issuing one statement per model instance.
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from peewee import Case, Field, Model
+
+# SQLite limits the number of variables in a single statement. Since SQLite 3.32.0 the default limit is 32766, before
+# it was 999. All batch sizes are derived from this limit so that no statement exceeds it.
+MAXIMUM_NUMBER_OF_VARIABLES_PER_STATEMENT = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+def get_batch_size(number_of_variables_per_row: int) -> int:
+    """
+    Args:
+        number_of_variables_per_row: The number of variables each row requires in the statement
+
+    Returns:
+        The number of rows which fit into a single statement
+    """
+    return max(1, MAXIMUM_NUMBER_OF_VARIABLES_PER_STATEMENT // number_of_variables_per_row)
+
+
+def insert_many(
+        model: Type[Model],
+        rows: Sequence[Sequence[Any]],
+        fields: Sequence[Field],
+        batch_size: Optional[int] = None
+) -> None:
+    """Inserts the rows in batches with one multi-row ``INSERT`` statement per batch.
+    By default, each batch contains as many rows as fit into a single statement.
+    """
+    for _ in _insert_batches(model, rows, fields, batch_size):
+        pass
+
+
+def insert_many_and_get_ids(
+        model: Type[Model],
+        rows: Sequence[Sequence[Any]],
+        fields: Sequence[Field],
+        batch_size: Optional[int] = None
+) -> List[int]:
+    """Inserts the rows in batches and returns the ids of the inserted rows in the same order.
+    This must run within a transaction so that no other connection inserts rows in between.
+    """
+    ids: List[int] = []
+    for number_rows, last_id in _insert_batches(model, rows, fields, batch_size):
+        # SQLite assigns consecutive row ids within a single insert statement
+        ids.extend(range(last_id - number_rows + 1, last_id + 1))
+    return ids
+
+
+def _insert_batches(
+        model: Type[Model],
+        rows: Sequence[Sequence[Any]],
+        fields: Sequence[Field],
+        batch_size: Optional[int]
+) -> Iterator[Tuple[int, int]]:
+    """Yields the number of rows and the id of the last row for each inserted batch.
+
+    The statement is assembled here because for many rows, the query builder of peewee takes much longer than executing
+    the statement. Like for ``Model.insert_many``, the values are converted by their fields and the fields which are not
+    provided are set to their defaults.
+    """
+    database = model._meta.database  # pylint: disable=protected-access
+    names_of_provided_fields = {field.name for field in fields}
+    fields_with_defaults = [
+        (field, default)
+        for field, default in model._meta.defaults.items()  # pylint: disable=protected-access
+        if field.name not in names_of_provided_fields
+    ]
+    columns = [field.column_name for field in fields] + [field.column_name for field, _ in fields_with_defaults]
+    opening_quote, closing_quote = database.quote
+    statement_prefix = (
+        f"INSERT INTO {opening_quote}{model._meta.table_name}{closing_quote} "  # pylint: disable=protected-access
+        f"({', '.join(opening_quote + column + closing_quote for column in columns)}) VALUES "
+    )
+    placeholders_of_row = "(" + ", ".join([database.param] * len(columns)) + ")"
+    if batch_size is None:
+        batch_size = get_batch_size(number_of_variables_per_row=len(columns))
+    for batch_start in range(0, len(rows), batch_size):
+        batch = rows[batch_start:batch_start + batch_size]
+        parameters = []
+        for row in batch:
+            parameters.extend(field.db_value(value) for field, value in zip(fields, row))
+            parameters.extend(
+                field.db_value(default() if callable(default) else default)
+                for field, default in fields_with_defaults
+            )
+        cursor = database.execute_sql(statement_prefix + ", ".join([placeholders_of_row] * len(batch)), parameters)
+        yield len(batch), cursor.lastrowid
+
+
+def update_field_in_bulk(
+        model: Type[Model],
+        field: Field,
+        values_by_id: Dict[int, Any],
+        batch_size: Optional[int] = None
+) -> None:
+    """Sets the field of many rows to individual values with one ``UPDATE ... CASE`` statement per batch.
+    """
+    update_fields_in_bulk(
+        model,
+        [field],
+        {_id: (value, ) for _id, value in values_by_id.items()},
+        batch_size=batch_size
+    )
+
+
+def update_fields_in_bulk(
+        model: Type[Model],
+        fields: Sequence[Field],
+        values_by_id: Dict[int, Sequence[Any]],
+        batch_size: Optional[int] = None
+) -> None:
+    """Sets several fields of many rows to individual values with one ``UPDATE ... CASE`` statement per batch.
+    The values of each row are given in the same order as the fields.
+    By default, each batch contains as many rows as fit into a single statement.
+    """
+    primary_key = model._meta.primary_key  # pylint: disable=protected-access
+    id_values_pairs = list(values_by_id.items())
+    if batch_size is None:
+        # each row requires two variables per field (WHEN id THEN value) and one for the primary key (IN)
+        batch_size = get_batch_size(number_of_variables_per_row=2 * len(fields) + 1)
+    for batch_start in range(0, len(id_values_pairs), batch_size):
+        batch = id_values_pairs[batch_start:batch_start + batch_size]
+        model.update({
+            field: Case(primary_key, [(_id, field.db_value(values[i])) for _id, values in batch])
+            for i, field in enumerate(fields)
+        }).where(
+            primary_key.in_([_id for _id, _ in batch])
+        ).execute()
@@ -0,0 +1,73 @@
+"""
+Keeps values derived from the database as long as the database has not been changed.
+"""
+from __future__ import annotations
+
+import contextlib
+from typing import Any, Callable, Generic, Iterator, Optional, Tuple, TypeVar
+
+from conflowgen.domain_models.base_model import database_proxy
+
+CachedValue = TypeVar("CachedValue")
+
+StateOfDatabase = Tuple[Any, Optional[int]]
+
+
+def get_state_of_database() -> StateOfDatabase:
+    database = database_proxy.obj
+    # SQLite counts the rows which have been inserted, updated, or deleted since the connection has been opened
+    total_changes = getattr(database.connection(), "total_changes", None)
+    return database, total_changes
+
+
+def is_same_state_of_database(
+        state_of_database: Optional[StateOfDatabase],
+        other_state_of_database: StateOfDatabase
+) -> bool:
+    if state_of_database is None:
+        return False
+    database, total_changes = state_of_database
+    other_database, other_total_changes = other_state_of_database
+    return database is other_database and total_changes is not None and total_changes == other_total_changes
+
+
+class DatabaseStateCache(Generic[CachedValue]):
+    """
+    Keeps a value until another database is chosen or any row is changed through the connection. Changes made by
+    another connection are not noticed, in that case the cache must be invalidated explicitly.
+    """
+
+    def __init__(self):
+        self._value: Optional[CachedValue] = None
+        self._state_of_database: Optional[StateOfDatabase] = None
+
+    def get(self, load_value: Callable[[], CachedValue]) -> CachedValue:
+        """
+        Args:
+            load_value: Derives the value from the database in case the database has been changed
+
+        Returns:
+            The value for the current state of the database
+        """
+        state_of_database = get_state_of_database()
+        if not self.is_up_to_date(state_of_database):
+            self._value = load_value()
+            self._state_of_database = state_of_database
+        return self._value
+
+    def is_up_to_date(self, state_of_database: Optional[StateOfDatabase] = None) -> bool:
+        if state_of_database is None:
+            state_of_database = get_state_of_database()
+        return is_same_state_of_database(self._state_of_database, state_of_database)
+
+    def invalidate(self) -> None:
+        self._value = None
+        self._state_of_database = None
+
+    @contextlib.contextmanager
+    def changes_not_affecting_value(self) -> Iterator[None]:
+        """Keeps the value while rows are changed which the value does not depend on."""
+        is_up_to_date = self.is_up_to_date()
+        yield
+        if is_up_to_date:
+            self._state_of_database = get_state_of_database()
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import math
-import random
 from typing import Dict
 
 import numpy as np
@@ -14,10 +13,19 @@ class SamplerExhaustedException(Exception):
 
 class DistributionApproximator:
 
-    def __init__(self, number_instances_per_category: Dict[any, int]) -> None:
+    def __init__(
+            self,
+            number_instances_per_category: Dict[any, int],
+            precompute_sequence: bool = False,
+            random_number_generator: np.random.Generator | None = None
+    ) -> None:
         """
         Args:
             number_instances_per_category: For each key (category) the number of instances to draw is given
+            precompute_sequence: Whether to shuffle all instances once upfront and then hand them out one by one
+                instead of weighting each draw by the remaining instances. Both result in a random order of exactly the
+                given instances but the former avoids the overhead of each single draw.
+            random_number_generator: The random number generator to use for drawing
         """
         self.target_distribution = np.array(
             list(number_instances_per_category.values()),
@@ -26,11 +34,19 @@ class DistributionApproximator:
         self.number_categories = len(self.target_distribution)
         self.already_sampled = np.array([0 for _ in range(self.number_categories)])
         self.categories = list(number_instances_per_category.keys())
+        self.random_number_generator = random_number_generator or np.random.default_rng()
+        self.sequence: np.ndarray | None = None
+        self.position_in_sequence = 0
+        if precompute_sequence:
+            self.sequence = np.repeat(np.arange(self.number_categories), self.target_distribution)
+            self.random_number_generator.shuffle(self.sequence)
 
     @staticmethod
     def from_distribution(
             distribution: Dict[any, float],
-            number_items: int
+            number_items: int,
+            precompute_sequence: bool = False,
+            random_number_generator: np.random.Generator | None = None
     ) -> DistributionApproximator:
         assert math.isclose(sum(distribution.values()), 1, abs_tol=.001), \
             f"All probabilities must sum to 1, but you only achieved {sum(distribution.values())}"
@@ -46,15 +62,20 @@ class DistributionApproximator:
         number_items_in_category_estimation = sum(probability_based_instance_estimation.values())
         if number_items_in_category_estimation < number_items:
             items_lost_to_rounding = number_items - number_items_in_category_estimation
-            randomly_chosen_categories = random.choices(
-                population=list(distribution.keys()),
-                weights=list(distribution.values()),
-                k=items_lost_to_rounding
+            random_number_generator = random_number_generator or np.random.default_rng()
+            categories = list(distribution.keys())
+            probabilities = np.array(list(distribution.values()), dtype=np.float64)
+            randomly_chosen_category_indices = random_number_generator.choice(
+                len(categories),
+                size=items_lost_to_rounding,
+                p=probabilities / probabilities.sum()
             )
-            for category in randomly_chosen_categories:
-                probability_based_instance_estimation[category] += 1
+            for category_index in randomly_chosen_category_indices:
+                probability_based_instance_estimation[categories[category_index]] += 1
         distribution_approximator = DistributionApproximator(
-            probability_based_instance_estimation
+            probability_based_instance_estimation,
+            precompute_sequence=precompute_sequence,
+            random_number_generator=random_number_generator
         )
         return distribution_approximator
 
@@ -62,16 +83,47 @@ class DistributionApproximator:
         """
         Draws pseudo-random element so that the target distribution is approximated best
         """
+        if self.sequence is not None:
+            if self.position_in_sequence >= len(self.sequence):
+                raise SamplerExhaustedException(
+                    f"Only {len(self.sequence)} draws are possible, "
+                    "you invoked `.sample()` too often")
+            selected_category_index = self.sequence[self.position_in_sequence]
+            self.position_in_sequence += 1
+            self.already_sampled[selected_category_index] += 1
+            return self.categories[selected_category_index]
         if self.already_sampled.sum() >= self.target_distribution.sum():
             raise SamplerExhaustedException(
                 f"Only {self.target_distribution.sum()} draws are possible, "
                 "you invoked `.sample()` too often")
         current_gap = self.target_distribution - self.already_sampled
-        selected_category = random.choices(
-            population=self.categories,
-            weights=current_gap,
-            k=1
-        )[0]
-        selected_category_index = self.categories.index(selected_category)
+        selected_category_index = self.random_number_generator.choice(
+            self.number_categories,
+            p=current_gap / current_gap.sum()
+        )
         self.already_sampled[selected_category_index] += 1
-        return selected_category
+        return self.categories[selected_category_index]
+
+    def sample_many(self, k: int) -> np.ndarray:
+        """
+        Draws k pseudo-random elements at once so that the target distribution is approximated best
+
+        Returns:
+            The indices of the drawn categories, the categories are listed in the attribute `categories`
+        """
+        number_remaining_draws = self.target_distribution.sum() - self.already_sampled.sum()
+        if k > number_remaining_draws:
+            raise SamplerExhaustedException(
+                f"Only {number_remaining_draws} more draws are possible, "
+                f"but {k} were requested with `.sample_many()`")
+        if self.sequence is not None:
+            selected_category_indices = self.sequence[self.position_in_sequence:self.position_in_sequence + k]
+            self.position_in_sequence += k
+        else:
+            # drawing proportionally to the current gap each time is the same as drawing without replacement
+            current_gap = self.target_distribution - self.already_sampled
+            number_instances_per_category = self.random_number_generator.multivariate_hypergeometric(current_gap, k)
+            selected_category_indices = np.repeat(np.arange(self.number_categories), number_instances_per_category)
+            self.random_number_generator.shuffle(selected_category_indices)
+        self.already_sampled += np.bincount(selected_category_indices, minlength=self.number_categories)
+        return selected_category_indices
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class RandomStreams:
+    """
+    Derives independent streams of random numbers from a single seed. The stream of a step only depends on the seed
+    and the key of that step. Thus, adding or removing draws in one step does not change the draws of any other step,
+    no matter in which order or in which process the steps are executed.
+    """
+
+    def __init__(self, seed: int | None = None):
+        """
+        Args:
+            seed: The seed all streams are derived from. If no seed is provided, a fresh one is drawn.
+        """
+        if seed is None:
+            # the drawn seed must fit into an integer column of the database so that it can be reported and reused
+            seed = int(np.random.SeedSequence().generate_state(1, dtype=np.uint32)[0])
+        self.seed: int = seed
+
+    def get_seed_sequence(self, *key: int) -> np.random.SeedSequence:
+        return np.random.SeedSequence(self.seed, spawn_key=key)
+
+    def get_generator(self, *key: int) -> np.random.Generator:
+        return np.random.default_rng(self.get_seed_sequence(*key))
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import datetime
-from typing import List, Tuple, Union, Dict
+from typing import List, Tuple, Union, Dict, Optional
+
+import numpy as np
 
 
 class InvalidDistributionSliceException(Exception):
@@ -34,6 +36,31 @@ class WeeklyDistribution:
                 self.hour_of_the_week_fraction_pairs[1][0]
                 - self.hour_of_the_week_fraction_pairs[0][0]
         )
+        self.random_number_generator = np.random.default_rng()
+
+        # The slice only depends on the hour of the week it starts at, so all of them are prepared once
+        self._distribution_slices: List[Optional[Dict[int, float]]] = []
+        self._hours_after_start: List[Optional[np.ndarray]] = []
+        self._cumulative_probabilities: List[Optional[np.ndarray]] = []
+        if 0 < self.considered_time_window_in_hours and \
+                self.minimum_dwell_time_in_hours <= self.considered_time_window_in_hours:
+            for start_hour in range(self.HOURS_IN_WEEK):
+                self._prepare_distribution_slice(start_hour)
+
+    def _prepare_distribution_slice(self, start_hour: int) -> None:
+        try:
+            distribution_slice = self._compute_distribution_slice(start_hour)
+        except ZeroDivisionError:
+            # no truck arrives in this slice at all - only fail once this slice is actually requested
+            self._distribution_slices.append(None)
+            self._hours_after_start.append(None)
+            self._cumulative_probabilities.append(None)
+            return
+        cumulative_probabilities = np.cumsum(np.array(list(distribution_slice.values()), dtype=np.float64))
+        cumulative_probabilities[-1] = 1  # avoid rounding errors at the upper end
+        self._distribution_slices.append(distribution_slice)
+        self._hours_after_start.append(np.array(list(distribution_slice.keys()), dtype=np.float64))
+        self._cumulative_probabilities.append(cumulative_probabilities)
 
     @classmethod
     def _get_hour_of_the_week_from_datetime(cls, point_in_time: datetime.datetime) -> int:
@@ -52,6 +79,40 @@ class WeeklyDistribution:
 
     def get_distribution_slice(self, _datetime: datetime.datetime) -> Dict[int, float]:
         start_hour = self._get_hour_of_the_week_from_datetime(_datetime)
+        if self._distribution_slices and self._distribution_slices[start_hour] is not None:
+            return dict(self._distribution_slices[start_hour])
+        return self._compute_distribution_slice(start_hour)
+
+    def sample(
+            self,
+            start_datetime: datetime.datetime,
+            size: int = 1,
+            random_number_generator: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Draws the start of the time windows in hours after the start of the slice for ``size`` arrivals at once.
+
+        Args:
+            start_datetime: The point in time the slice starts at
+            size: The number of arrivals to draw
+            random_number_generator: The random number generator to use, defaults to the one of this instance
+
+        Returns:
+            The start of the time window of each arrival, measured in hours after the start of the slice
+        """
+        start_hour = self._get_hour_of_the_week_from_datetime(start_datetime)
+        if not self._distribution_slices or self._distribution_slices[start_hour] is None:
+            self._compute_distribution_slice(start_hour)  # raises the reason why this slice is unavailable
+        if random_number_generator is None:
+            random_number_generator = self.random_number_generator
+        cumulative_probabilities = self._cumulative_probabilities[start_hour]
+        chosen_indices = np.searchsorted(
+            cumulative_probabilities,
+            random_number_generator.random(size),
+            side="right"
+        )
+        return self._hours_after_start[start_hour][chosen_indices]
+
+    def _compute_distribution_slice(self, start_hour: int) -> Dict[int, float]:
         end_hour = start_hour + self.considered_time_window_in_hours
         assert 0 <= start_hour <= self.HOURS_IN_WEEK, "Start hour must be in first week"
         assert start_hour < end_hour, "Start hour must be before end hour"
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class WeightedSampler:
+    """
+    Draws items with a probability proportional to their weight. Both drawing an item and changing the weight of an
+    item take O(log n) time because the weights are kept in a Fenwick tree (also known as binary indexed tree).
+    Draws can be restricted to a range of positions, e.g., all vehicles arriving within a time window if the items are
+    sorted by their arrival.
+    """
+
+    def __init__(
+            self,
+            items: Sequence[Any],
+            weights: Sequence[float],
+            random_number_generator: Optional[np.random.Generator] = None
+    ) -> None:
+        """
+        Args:
+            items: The items to draw from, they must be hashable
+            weights: The non-negative weight of each item
+            random_number_generator: The random number generator to use for drawing
+        """
+        assert len(items) == len(weights), "Each item requires exactly one weight"
+        self.items: List[Any] = list(items)
+        self.position_of_item: Dict[Any, int] = {item: position for position, item in enumerate(self.items)}
+        self.weights: List[float] = [float(weight) for weight in weights]
+        assert all(weight >= 0 for weight in self.weights), "Weights must not be negative"
+        self.random_number_generator = random_number_generator or np.random.default_rng()
+
+        number_items = len(self.items)
+        self._highest_power_of_two = 1 << (number_items.bit_length() - 1) if number_items > 0 else 0
+        self._weight_tree: List[float] = [0.] + self.weights
+        self._count_tree: List[int] = [0] + [int(weight > 0) for weight in self.weights]
+        for i in range(1, number_items + 1):
+            parent = i + (i & -i)
+            if parent <= number_items:
+                self._weight_tree[parent] += self._weight_tree[i]
+                self._count_tree[parent] += self._count_tree[i]
+
+    def __len__(self) -> int:
+        """The number of items which can still be drawn, i.e. have a positive weight."""
+        return self.count_items_with_weight()
+
+    def get_weight(self, item: Any) -> float:
+        return self.weights[self.position_of_item[item]]
+
+    def update(self, item: Any, weight: float) -> None:
+        assert weight >= 0, "Weights must not be negative"
+        position = self.position_of_item[item]
+        weight_difference = weight - self.weights[position]
+        count_difference = int(weight > 0) - int(self.weights[position] > 0)
+        self.weights[position] = weight
+        i = position + 1
+        while i < len(self._weight_tree):
+            self._weight_tree[i] += weight_difference
+            self._count_tree[i] += count_difference
+            i += i & -i
+
+    def remove(self, item: Any) -> None:
+        """The item is never drawn again unless its weight is updated again."""
+        self.update(item, 0)
+
+    def count_items_with_weight(self, start: int = 0, end: Optional[int] = None) -> int:
+        """Counts the items with a positive weight between the positions start (inclusive) and end (exclusive)."""
+        if end is None:
+            end = len(self.items)
+        if end <= start:
+            return 0
+        return self._prefix_sum(self._count_tree, end) - self._prefix_sum(self._count_tree, start)
+
+    def get_total_weight(self, start: int = 0, end: Optional[int] = None) -> float:
+        """Sums up the weights between the positions start (inclusive) and end (exclusive)."""
+        if end is None:
+            end = len(self.items)
+        if end <= start:
+            return 0
+        return self._prefix_sum(self._weight_tree, end) - self._prefix_sum(self._weight_tree, start)
+
+    def sample(self, start: int = 0, end: Optional[int] = None) -> Any | None:
+        """Draws an item between the positions start (inclusive) and end (exclusive).
+
+        Returns:
+            The drawn item or None if no item with a positive weight exists in that range
+        """
+        if end is None:
+            end = len(self.items)
+        if self.count_items_with_weight(start, end) == 0:
+            return None
+        weight_before_start = self._prefix_sum(self._weight_tree, start)
+        total_weight = self._prefix_sum(self._weight_tree, end) - weight_before_start
+        target = weight_before_start + self.random_number_generator.random() * total_weight
+        position = self._find_position(target)
+        if not start <= position < end or self.weights[position] <= 0:
+            # The sums in the tree are subject to rounding errors, so in rare cases the target is just off
+            return self._sample_without_tree(start, end)
+        return self.items[position]
+
+    def _sample_without_tree(self, start: int, end: int) -> Any:
+        weights = np.array(self.weights[start:end], dtype=np.float64)
+        position = start + self.random_number_generator.choice(len(weights), p=weights / weights.sum())
+        return self.items[position]
+
+    @staticmethod
+    def _prefix_sum(tree: List, end: int) -> Any:
+        """Sums up the values of the first `end` items."""
+        total = 0
+        i = end
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _find_position(self, target: float) -> int:
+        """Finds the first position at which the cumulated weights exceed the target."""
+        position = 0
+        remaining_target = target
+        step = self._highest_power_of_two
+        while step > 0:
+            next_position = position + step
+            if next_position < len(self._weight_tree) and self._weight_tree[next_position] <= remaining_target:
+                position = next_position
+                remaining_target -= self._weight_tree[next_position]
+            step >>= 1
+        return position
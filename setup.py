@@ -40,12 +40,18 @@ setup(
         'seaborn',  # exchanges matplotlib color palletes
     ],
     extras_require={
+        # Only needed to export the container flow to the parquet and feather file formats
+        'arrow': [
+            'pyarrow',  # write the typed columns batch by batch
+        ],
+
         # Only needed to run the unittests and generate the documentation
         'dev': [
             # testing
             'pytest',  # running the unit tests
             'pytest-cov',  # create coverage report
             'pytest-github-actions-annotate-failures',  # turns pytest failures into action annotations
+            'pyarrow',  # test the export to the parquet and feather file formats
 
             # build documentation
             'sphinx',  # build the documentation